@@ -123,7 +123,7 @@ async def confirm_email(uuid: VerificationOut, db: TransactionSessionDep):
 
 @auth_router.post("/password-recovery/{email}", response_model=Msg)
 @sentry_capture_exceptions
-async def recover_password(email: str, db: SessionDep):
+async def recover_password(email: str, db: TransactionSessionDep):
     """
     Запрос на восстановление пароля.
 
@@ -1,16 +1,14 @@
-import stripe
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, Query
 from backend.app.dependencies.auth_dep import CurrentUser
 from backend.app.dependencies.service_factory import service_factory
 from backend.app.models.auth import Msg
-from backend.app.models.bookings import BookingCreate, BookingRead, BookingReadGet, PaginatedBookingsResponse
+from backend.app.models.bookings import BookingCreate, BookingRead, BookingReadGet, PaginatedBookingsResponse, \
+    BookingQuoteRequest, BookingQuoteResponse
 from backend.app.services.decorators import sentry_capture_exceptions
-from backend.core.config import settings
 from backend.core.db import SessionDep, TransactionSessionDep
 from datetime import date
 
-stripe.api_key = settings.STRIPE_SECRET_KEY
 booking_router = APIRouter()
 
 
@@ -28,6 +26,19 @@ async def create_booking(schema: BookingCreate, db: TransactionSessionDep, user:
     return await service_factory.booking_service.create_booking(db=db, schema=schema, user=user)
 
 
+@booking_router.post('/quote', response_model=BookingQuoteResponse)
+@sentry_capture_exceptions
+async def quote_prices(schema: BookingQuoteRequest, db: SessionDep):
+    """
+    Расчет стоимости нескольких интервалов стадиона одним запросом.
+
+    :param db: Сессия базы данных
+    :param schema: Стадион и список интервалов (start_time, end_time)
+    :return: Цены интервалов в том же порядке
+    """
+    return await service_factory.booking_service.quote_prices(db=db, schema=schema)
+
+
 @booking_router.post('/pay/{booking_id}', response_model=dict)
 @sentry_capture_exceptions
 async def create_payment_session(booking_id: int, db: SessionDep, user: CurrentUser):
@@ -56,17 +67,22 @@ async def booking_from_date(db: SessionDep, stadium_id: int, selected_date: date
     """
     Получение списка бронирований стадиона на указанную дату.
 
+    Промах кеша читается с primary, а не с реплики: расписание из отстающей реплики иначе
+    попало бы в кеш на весь его TTL, уже после сброса кеша новой бронью.
+
     :param db: Сессия базы данных
     :param stadium_id: ID стадиона
     :param selected_date: Дата для проверки бронирований
     :return: Список бронирований на указанную дату
     """
-    return await service_factory.booking_service.get_booking_from_date(db=db, stadium_id=stadium_id, date=selected_date)
+    return await service_factory.booking_service.get_booking_from_date(db=db, stadium_id=stadium_id,
+                                                                       selected_date=selected_date)
 
 
 @booking_router.get("/bookings-vendor", response_model=PaginatedBookingsResponse)
 @sentry_capture_exceptions
-async def bookings_vendor(db: SessionDep, user: CurrentUser, page: int = Query(1, ge=1), size: int = Query(2, le=100)):
+async def bookings_vendor(db: SessionDep, user: CurrentUser, page: int = Query(1, ge=1), size: int = Query(2, le=100),
+                          cursor: Optional[str] = None, with_total: bool = False):
     """
     Получение пагинированного списка бронирований для владельца стадиона.
 
@@ -74,9 +90,11 @@ async def bookings_vendor(db: SessionDep, user: CurrentUser, page: int = Query(1
     :param user: Текущий авторизованный пользователь (владелец)
     :param page: Номер страницы (начиная с 1)
     :param size: Количество элементов на странице (максимум 100)
+    :param cursor: next_cursor предыдущей страницы; пустая строка - первая страница в режиме курсора
+    :param with_total: Вернуть приблизительное общее количество (только в режиме курсора)
     :return: Пагинированный список бронирований
     """
-    return await service_factory.booking_service.bookings_for_vendor(db, user, page, size)
+    return await service_factory.booking_service.bookings_for_vendor(db, user, page, size, cursor, with_total)
 
 
 @booking_router.get("/booking_vendor/{booking_id}", response_model=BookingReadGet)
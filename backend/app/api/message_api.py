@@ -1,24 +1,38 @@
 import logging
-from typing import List, Dict
+from typing import List, Optional
 
-from fastapi import APIRouter
+import sentry_sdk
+from fastapi import APIRouter, HTTPException, Query, status
 
-from backend.app.dependencies.auth_dep import CurrentUser
+from backend.app.dependencies.auth_dep import CurrentUser, get_current_user
 from backend.app.dependencies.service_factory import service_factory
-from backend.app.models.chat import MessageRead, MessageCreate
+from backend.app.models.chat import MessageRead, MessageCreate, ConversationRead
 from fastapi import WebSocket, WebSocketDisconnect
-import asyncio
 
 from backend.app.services.decorators import sentry_capture_exceptions
-from backend.core.db import SessionDep, TransactionSessionDep
+from backend.core.db import ReadSessionDep, TransactionSessionDep
 
 message_router = APIRouter()
 
 
 @message_router.get("/messages/{user_id}", response_model=List[MessageRead])
 @sentry_capture_exceptions
-async def get_messages(db: SessionDep, user_id: int, current_user: CurrentUser):
-    return await service_factory.message_repo.get_messages_between_users(db=db, user_id_1=user_id, user_id_2=current_user.id) or []
+async def get_messages(db: ReadSessionDep, user_id: int, current_user: CurrentUser,
+                       limit: int = Query(50, ge=1, le=200), before_id: Optional[int] = None):
+    """
+    История диалога с пользователем: последние limit сообщений по возрастанию id.
+
+    :param before_id: id первого сообщения предыдущей страницы, чтобы получить более старые
+    """
+    return await service_factory.message_repo.get_messages_between_users(
+        db=db, user_id_1=user_id, user_id_2=current_user.id, limit=limit, before_id=before_id)
+
+
+@message_router.get("/conversations", response_model=List[ConversationRead])
+@sentry_capture_exceptions
+async def get_conversations(db: ReadSessionDep, current_user: CurrentUser, limit: int = Query(50, ge=1, le=200)):
+    """Диалоги текущего пользователя с последним сообщением, последние активные первыми."""
+    return await service_factory.message_repo.get_conversations(db=db, user_id=current_user.id, limit=limit)
 
 
 logger = logging.getLogger(__name__)
@@ -29,6 +43,7 @@ logger = logging.getLogger(__name__)
 async def send_message(db: TransactionSessionDep, schema: MessageCreate, current_user: CurrentUser):
     # Создаем сообщение
     message = await service_factory.message_repo.create(db=db, schema=schema, sender_id=current_user.id)
+    await service_factory.message_repo.touch_conversation(db=db, message=message)
 
     # Подготовка данных для уведомления
     message_data = {
@@ -37,9 +52,9 @@ async def send_message(db: TransactionSessionDep, schema: MessageCreate, current
         'content': schema.content,
     }
 
-    # Уведомление через WebSocket
-    await notify_user(schema.recipient_id, message_data)
-    await notify_user(current_user.id, message_data)
+    # Уведомление через WebSocket: сокеты получателя и отправителя могут быть на любом воркере
+    await service_factory.connection_hub.publish(schema.recipient_id, message_data)
+    await service_factory.connection_hub.publish(current_user.id, message_data)
 
     # Возвращаем объект с данными сообщения
     return MessageRead(
@@ -50,31 +65,32 @@ async def send_message(db: TransactionSessionDep, schema: MessageCreate, current
     )
 
 
-# Активные WebSocket-подключения: {user_id: websocket}
-active_connections: Dict[int, WebSocket] = {}
-
-
-# Функция для отправки сообщения пользователю, если он подключен
-async def notify_user(user_id: int, message: dict):
-    """Отправить сообщение пользователю, если он подключен."""
-    if user_id in active_connections:
-        websocket = active_connections[user_id]
-        # Отправляем сообщение в формате JSON
-        await websocket.send_json(message)
-
-
 # WebSocket эндпоинт для соединений
-@message_router.websocket("/ws/{user_id}")
-@sentry_capture_exceptions
-async def websocket_endpoint(websocket: WebSocket, user_id: int):
-    # Принимаем WebSocket-соединение
+@message_router.websocket("/ws")
+async def websocket_endpoint(websocket: WebSocket, token: str = ""):
+    """
+    Сокет уведомлений текущего пользователя.
+
+    Пользователь определяется по access-токену из параметра token еще до accept: без валидного токена
+    рукопожатие отклоняется (1008). Дальше сокет читается до отключения, простой проверяется ping/pong.
+    """
+    try:
+        user = await get_current_user(token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
     await websocket.accept()
-    # Сохраняем активное соединение для пользователя
-    active_connections[user_id] = websocket
+    hub = service_factory.connection_hub
+    connection = None
     try:
-        while True:
-            # Просто поддерживаем соединение активным (1 секунда паузы)
-            await asyncio.sleep(1)
-    except WebSocketDisconnect:
-        # Удаляем пользователя из активных соединений при отключении
-        active_connections.pop(user_id, None)
+        connection = await hub.connect(user.id, websocket)
+        await hub.serve(connection)
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    except Exception as e:
+        logger.exception(f"Ошибка сокета пользователя {user.id}")
+        sentry_sdk.capture_exception(e)
+    finally:
+        if connection is not None:
+            await hub.disconnect(connection)
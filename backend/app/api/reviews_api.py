@@ -1,10 +1,12 @@
-from fastapi import APIRouter
+from typing import Optional
+
+from fastapi import APIRouter, Query
 from backend.app.dependencies.auth_dep import CurrentUser
 from backend.app.dependencies.service_factory import service_factory
 from backend.app.models.auth import Msg
-from backend.app.models.stadium_reviews import ReviewRead, CreateReview, UpdateReview
+from backend.app.models.stadium_reviews import ReviewRead, CreateReview, UpdateReview, PaginatedReviewsResponse
 from backend.app.services.decorators import sentry_capture_exceptions
-from backend.core.db import TransactionSessionDep
+from backend.core.db import SessionDep, TransactionSessionDep
 
 add_review_router = APIRouter()
 
@@ -51,3 +53,20 @@ async def delete_review(db: TransactionSessionDep, review_id: int, user: Current
     :return: Сообщение о результате операции
     """
     return await service_factory.review_service.delete_review(db, user=user, review_id=review_id)
+
+
+@add_review_router.get("/reviews/{stadium_id}", response_model=PaginatedReviewsResponse)
+@sentry_capture_exceptions
+async def get_stadium_reviews(db: SessionDep, stadium_id: int, size: int = Query(20, ge=1, le=100),
+                              cursor: Optional[str] = None):
+    """
+    Отзывы стадиона, новые первыми.
+
+    :param db: Сессия базы данных
+    :param stadium_id: ID стадиона
+    :param size: Количество отзывов на странице (максимум 100)
+    :param cursor: next_cursor предыдущей страницы; без него - первая страница
+    :return: Объект PaginatedReviewsResponse с отзывами и курсором следующей страницы
+    """
+    return await service_factory.review_service.get_stadium_reviews(db, stadium_id=stadium_id, size=size,
+                                                                    cursor=cursor)
@@ -1,6 +1,6 @@
 from datetime import datetime
-from typing import List
-from fastapi import APIRouter, UploadFile, File, Query
+from typing import List, Optional
+from fastapi import APIRouter, UploadFile, File, Query, Header, Response
 from backend.app.dependencies.auth_dep import CurrentUser, SuperUser, OwnerUser
 from backend.app.dependencies.service_factory import service_factory
 from backend.app.models.auth import Msg
@@ -98,7 +98,7 @@ async def approve_verification(stadium_id: int, schema: StadiumVerificationUpdat
     return await service_factory.stadium_verif_service.approve_verification_by_admin(db=db, schema=schema, stadium_id=stadium_id, user=user)
 
 
-@stadium_router.put("/upload/{stadium_id}", response_model=dict)
+@stadium_router.put("/upload/{stadium_id}", response_model=dict, status_code=202)
 @sentry_capture_exceptions
 async def upload_image_stadium(db: TransactionSessionDep, stadium_id: int, user: CurrentUser,
                                file: UploadFile = File()):
@@ -129,7 +129,8 @@ async def get_stadiums(db: SessionDep):
 @stadium_router.get('/vendors-stadiums', response_model=PaginatedStadiumsResponse)
 @sentry_capture_exceptions
 async def get_vendor_stadiums(db: SessionDep, user: OwnerUser, page: int = Query(1, ge=1),
-                              size: int = Query(2, le=100)) -> PaginatedStadiumsResponse:
+                              size: int = Query(2, le=100), cursor: Optional[str] = None,
+                              with_total: bool = False) -> PaginatedStadiumsResponse:
     """
     Получение пагинированного списка стадионов, принадлежащих текущему владельцу (вендору).
 
@@ -137,27 +138,36 @@ async def get_vendor_stadiums(db: SessionDep, user: OwnerUser, page: int = Query
     :param user: Авторизованный владелец стадионов (извлекается из токена)
     :param page: Номер страницы (начиная с 1), по умолчанию 1
     :param size: Количество элементов на странице (максимум 100), по умолчанию 2
+    :param cursor: next_cursor предыдущей страницы; пустая строка - первая страница в режиме курсора
+    :param with_total: Вернуть приблизительное общее количество (только в режиме курсора)
     :return: Объект PaginatedStadiumsResponse с пагинированным списком стадионов:
              - items: List[Stadium] - список стадионов
-             - total: int - общее количество стадионов
-             - page: int - текущая страница
-             - size: int - количество элементов на странице
-             - pages: int - общее количество страниц
+             - page: int - текущая страница (постраничный режим)
+             - pages: int - общее количество страниц (постраничный режим)
+             - next_cursor: str - курсор следующей страницы или None
+             - total: int - приблизительное общее количество стадионов (with_total)
     """
-    return await service_factory.stadium_service.get_vendor_stadiums(db, user, page, size)
+    return await service_factory.stadium_service.get_vendor_stadiums(db, user, page, size, cursor, with_total)
 
 
 @stadium_router.get("/detail/{stadium_id}", response_model=StadiumsReadWithFacility)
 @sentry_capture_exceptions
-async def detail_stadium(db: SessionDep, stadium_id: int):
+async def detail_stadium(db: SessionDep, stadium_id: int, if_none_match: Optional[str] = Header(None)):
     """
     Получение подробной информации о стадионе.
 
+    Тело отдается из кеша как есть, с ETag; при совпадении If-None-Match возвращается 304 без тела.
+
     :param db: Сессия базы данных
     :param stadium_id: Идентификатор стадиона
+    :param if_none_match: ETag, полученный клиентом ранее
     :return: Стадион с привязанными услугами и отзывами
     """
-    return await service_factory.stadium_service.detail_stadium(db, stadium_id=stadium_id)
+    payload = await service_factory.stadium_service.detail_stadium_payload(db, stadium_id=stadium_id)
+    headers = {"ETag": payload.etag, "Cache-Control": "no-cache"}
+    if if_none_match and payload.etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=payload.body, media_type="application/json", headers=headers)
 
 
 @stadium_router.post("/services/{stadium_id}/")
@@ -0,0 +1,35 @@
+from fastapi import APIRouter
+
+from backend.app.dependencies.auth_dep import SuperUser
+from backend.app.dependencies.service_factory import service_factory
+from backend.core.db import engine, pool_stats, session_manager
+
+system_router = APIRouter()
+
+
+@system_router.get("/db-pool", response_model=dict)
+async def db_pool_stats(user: SuperUser):
+    """
+    Состояние пула соединений с БД этого процесса (только для администратора).
+
+    :param user: Авторизованный администратор
+    :return: Размер пула, выданные и сверхлимитные соединения, время ожидания соединения;
+             для реплик также состояние проверки и отставание; число запросов с обращением к БД и без него
+    """
+    replicas = [
+        {"host": replica.engine.url.host, "healthy": replica.healthy, "lag_seconds": replica.lag,
+         "last_error": replica.last_error, **pool_stats(replica.engine)}
+        for replica in session_manager.replicas
+    ]
+    return {**pool_stats(engine), **session_manager.request_stats(), "replicas": replicas}
+
+
+@system_router.get("/password-hashing", response_model=dict)
+async def password_hashing_stats(user: SuperUser):
+    """
+    Состояние пула хеширования паролей этого процесса (только для администратора).
+
+    :param user: Авторизованный администратор
+    :return: Задачи в очереди, выполненные и отклоненные с 503, среднее ожидание и время bcrypt
+    """
+    return service_factory.password_service.stats()
@@ -5,6 +5,7 @@ from backend.app.dependencies.auth_dep import CurrentUser, SuperUser
 from backend.app.dependencies.service_factory import service_factory
 
 from backend.app.models.auth import Msg
+from backend.app.models.email_outbox import EmailOutboxStats
 from backend.app.models.users import UserPublic, UserUpdate, UpdatePassword
 from backend.app.services.decorators import sentry_capture_exceptions
 from backend.core.db import SessionDep, TransactionSessionDep
@@ -51,7 +52,7 @@ async def update_password_me(*, db: TransactionSessionDep, schema: UpdatePasswor
     return await service_factory.user_service.update_password(db=db, schema=schema, model=user)
 
 
-@user_router.patch("/upload-avatar")
+@user_router.patch("/upload-avatar", status_code=202)
 @sentry_capture_exceptions
 async def upload_image(db: TransactionSessionDep, user: CurrentUser, file: UploadFile = File(...)):
     """
@@ -78,6 +79,19 @@ async def get_all_user(db: SessionDep, user: SuperUser):
     return await service_factory.user_repo.get_many(db=db)
 
 
+@user_router.get("/email-outbox/stats", response_model=EmailOutboxStats)
+@sentry_capture_exceptions
+async def email_outbox_stats(db: SessionDep, user: SuperUser):
+    """
+    Глубина очереди писем и счетчики воркера доставки (только для администратора).
+
+    :param db: Сессия базы данных
+    :param user: Авторизованный администратор
+    :return: Метрики очереди email_outbox
+    """
+    return await service_factory.email_outbox_worker.stats(db)
+
+
 @user_router.delete("/delete/{user_id}", response_model=Msg)
 @sentry_capture_exceptions
 async def delete_user(user_id: int, db: TransactionSessionDep, user: CurrentUser) -> Msg:
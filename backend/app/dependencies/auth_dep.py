@@ -12,11 +12,6 @@ from backend.app.services.utils_service.permission import PermissionService
 from backend.core.config import settings
 
 
-from backend.core.db import SessionDep
-
-
-
-
 reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_STR}/auth/login/access-token", auto_error=False
 )
@@ -26,7 +21,11 @@ TokenDep = Annotated[str, Depends(reusable_oauth2)]
 
 
 
-async def get_current_user(db: SessionDep, token: TokenDep) -> User:
+async def get_current_user(token: TokenDep) -> User:
+    """
+    Пользователь по access-токену. Сессию БД зависимость не открывает: при попадании в кеш запрос
+    к БД не нужен, а промах кеш читает в своей короткой сессии.
+    """
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
@@ -34,8 +33,7 @@ async def get_current_user(db: SessionDep, token: TokenDep) -> User:
         token_data = TokenPayload(**payload)
     except PyJWTError:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Could not validate credentials")
-    user = await service_factory.user_repo.get_or_404(db=db, object_id=token_data.sub)
-    return user
+    return await service_factory.user_cache.get_user(user_id=token_data.sub)
 
 
 CurrentUser = Annotated[User, Depends(get_current_user)]
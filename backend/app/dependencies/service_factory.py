@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from typing import Type
 
 from sqlmodel import SQLModel
@@ -12,6 +13,8 @@ from backend.app.interface.utils.i_password_service import IPasswordService
 from backend.app.models import Stadium, User
 from backend.app.repositories.bookings_repositories import BookingRepository
 from backend.app.repositories.chat_repositories import MessageRepositories
+from backend.app.repositories.email_outbox_repository import EmailOutboxRepository
+from backend.app.repositories.webhook_event_repository import WebhookEventRepository
 from backend.app.repositories.facility_repository import FacilityRepository
 from backend.app.repositories.review_repository import ReviewRepository
 from backend.app.repositories.stadiums_repositories import StadiumRepository
@@ -22,18 +25,30 @@ from backend.app.services.auth.google_auth_service import GoogleAuthService
 from backend.app.services.utils_service.password_service import PasswordService
 from backend.app.services.utils_service.permission import PermissionService
 from backend.app.services.user.registration_service import RegistrationService
+from backend.app.services.user.user_cache import UserCache
 from backend.app.services.user.user_service import UserService
 from backend.app.services.booking.booking_service import BookingService
+from backend.app.services.booking.price_schedule import PriceScheduleCache
+from backend.app.services.booking.stripe_checkout import StripeCheckout
+from backend.app.services.booking.webhook_worker import StripeWebhookWorker
+from backend.app.services.chat.connection_hub import ConnectionHub
+from backend.app.services.email.email import SmtpClient
 from backend.app.services.email.email_service import EmailService
+from backend.app.services.email.outbox_worker import EmailOutboxWorker
+from backend.app.services.email.template_registry import EmailTemplateRegistry
 from backend.app.services.facility.facility_service import FacilityService
 from backend.app.services.image.image_service import CloudinaryImageHandler
+from backend.app.services.image.image_storage import CloudinaryStorage, LocalImageStorage
 from backend.app.services.redis import RedisClient
 from backend.app.services.review.review_service import ReviewService
+from backend.app.services.stadium.stadium_availability_service import StadiumAvailabilityService
 from backend.app.services.stadium.stadium_facility_service import StadiumFacilityService
 from backend.app.services.stadium.stadium_image_service import StadiumImageService
 from backend.app.services.stadium.stadium_intervals_service import StadiumIntervalsService
 from backend.app.services.stadium.stadium_service import StadiumService
 from backend.app.services.stadium.stadium_verif_service import StadiumVerifService
+from backend.core.config import settings
+from backend.core.db import async_session_maker
 
 
 class ServiceFactory:
@@ -46,19 +61,37 @@ class ServiceFactory:
         self._stadium_repo = StadiumRepository()
         self._booking_repo = BookingRepository()
         self._message_repo = MessageRepositories()
+        self._email_outbox_repo = EmailOutboxRepository()
+        self._webhook_event_repo = WebhookEventRepository()
 
         # Базовые сервисы
         self._password_service = PasswordService()
-        self._email_service = EmailService()
+        self._email_templates = EmailTemplateRegistry(settings.EMAIL_TEMPLATE_DIR,
+                                                      auto_reload=settings.ENVIRONMENT == "local")
+        self._email_service = EmailService(self._email_outbox_repo, self._email_templates)
+        self._email_outbox_worker = EmailOutboxWorker(self._email_outbox_repo, SmtpClient(),
+                                                      session_maker=async_session_maker)
         self._permission_service = PermissionService()
         self._redis_client = RedisClient(redis_url)
         self._image_handlers: dict[Type[SQLModel], CloudinaryImageHandler] = {}
+        self._image_executor = ThreadPoolExecutor(max_workers=settings.IMAGE_WORKERS, thread_name_prefix="image")
+        if settings.IMAGE_STORAGE == "local":
+            self._image_storage = LocalImageStorage(settings.UPLOAD_DIRECTORY)
+        else:
+            self._image_storage = CloudinaryStorage(max_dimension=settings.IMAGE_MAX_DIMENSION)
+        self._price_schedules = PriceScheduleCache()
+        self._user_cache = UserCache(self._user_repo, self._redis_client, session_maker=async_session_maker)
+        self._stripe_checkout = StripeCheckout(self._redis_client)
+        self._connection_hub = ConnectionHub(self._redis_client, queue_size=settings.WS_SEND_QUEUE_SIZE,
+                                             ping_interval=settings.WS_PING_INTERVAL,
+                                             pong_timeout=settings.WS_PONG_TIMEOUT)
 
 
         # Лениво инициализируемые сервисы
         self._review_service = None
         self._facility_service = None
         self._booking_service = None
+        self._stripe_webhook_worker = None
 
         self._user_auth = None
         self._google_auth_service = None
@@ -71,13 +104,24 @@ class ServiceFactory:
         self._stadium_intervals_service = None
         self._stadium_facility_service = None
         self._stadium_image_service = None
+        self._stadium_availability_service = None
 
 
     def get_image_handler(self, model_type: Type[SQLModel]) -> CloudinaryImageHandler:
         if model_type not in self._image_handlers:
-            self._image_handlers[model_type] = CloudinaryImageHandler(model_type)
+            self._image_handlers[model_type] = CloudinaryImageHandler(
+                model_type,
+                storage=self._image_storage,
+                session_maker=async_session_maker,
+                executor=self._image_executor,
+                max_size=settings.IMAGE_MAX_SIZE_MB * 1024 * 1024
+            )
         return self._image_handlers[model_type]
 
+    async def drain_image_uploads(self) -> None:
+        for handler in self._image_handlers.values():
+            await handler.drain()
+
     # --- Core Services ---
     @property
     def password_service(self) -> IPasswordService:
@@ -87,6 +131,14 @@ class ServiceFactory:
     def email_service(self) -> EmailService:
         return self._email_service
 
+    @property
+    def email_templates(self) -> EmailTemplateRegistry:
+        return self._email_templates
+
+    @property
+    def email_outbox_worker(self) -> EmailOutboxWorker:
+        return self._email_outbox_worker
+
     @property
     def permission_service(self) -> PermissionService:
         return self._permission_service
@@ -95,6 +147,22 @@ class ServiceFactory:
     def redis_client(self) -> RedisClient:
         return self._redis_client
 
+    @property
+    def price_schedules(self) -> PriceScheduleCache:
+        return self._price_schedules
+
+    @property
+    def user_cache(self) -> UserCache:
+        return self._user_cache
+
+    @property
+    def connection_hub(self) -> ConnectionHub:
+        return self._connection_hub
+
+    @property
+    def stripe_checkout(self) -> StripeCheckout:
+        return self._stripe_checkout
+
 
 
     # --- Repository Access ---
@@ -126,6 +194,10 @@ class ServiceFactory:
     def message_repo(self) -> MessageRepositories:
         return self._message_repo
 
+    @property
+    def webhook_event_repo(self) -> WebhookEventRepository:
+        return self._webhook_event_repo
+
 
 
     # --- Business Services ---
@@ -146,8 +218,10 @@ class ServiceFactory:
         if self._stadium_service is None:
             self._stadium_service = StadiumService(
                 stadium_repository=self._stadium_repo,
+                review_repository=self._review_repo,
                 permission=self._permission_service,
-                redis=self._redis_client
+                redis=self._redis_client,
+                availability=self.stadium_availability_service
             )
         return self._stadium_service
 
@@ -167,7 +241,8 @@ class ServiceFactory:
             self._stadium_intervals_service = StadiumIntervalsService(
                 stadium_repository=self._stadium_repo,
                 permission=self._permission_service,
-                redis=self._redis_client
+                redis=self._redis_client,
+                price_schedules=self._price_schedules
             )
         return self._stadium_intervals_service
 
@@ -192,6 +267,16 @@ class ServiceFactory:
             )
         return self._stadium_image_service
 
+    @property
+    def stadium_availability_service(self) -> StadiumAvailabilityService:
+        if self._stadium_availability_service is None:
+            self._stadium_availability_service = StadiumAvailabilityService(
+                stadium_repository=self._stadium_repo,
+                booking_repository=self._booking_repo,
+                redis=self._redis_client
+            )
+        return self._stadium_availability_service
+
     ##############################################
     @property
     def facility_service(self) -> FacilityService:
@@ -209,10 +294,24 @@ class ServiceFactory:
                 booking_repository=self._booking_repo,
                 stadium_repository=self._stadium_repo,
                 facility_repository=self._facility_repo,
-                permission=self._permission_service
+                permission=self._permission_service,
+                price_schedules=self._price_schedules,
+                availability=self.stadium_availability_service,
+                redis=self._redis_client,
+                checkout=self._stripe_checkout
             )
         return self._booking_service
 
+    @property
+    def stripe_webhook_worker(self) -> StripeWebhookWorker:
+        if self._stripe_webhook_worker is None:
+            self._stripe_webhook_worker = StripeWebhookWorker(
+                repository=self._webhook_event_repo,
+                booking_service=self.booking_service,
+                session_maker=async_session_maker
+            )
+        return self._stripe_webhook_worker
+
 
     ################# User ####################
     @property
@@ -240,7 +339,8 @@ class ServiceFactory:
                 user_repository=self._user_repo,
                 verif_repository=self._verify_repo,
                 email_service=self._email_service,
-                pass_service=self._password_service
+                pass_service=self._password_service,
+                user_cache=self._user_cache
             )
         return self._registration_service
 
@@ -252,7 +352,8 @@ class ServiceFactory:
                 permission=self._permission_service,
                 pass_service=self._password_service,
                 email_service=self._email_service,
-                image_handler=self.get_image_handler(User)
+                image_handler=self.get_image_handler(User),
+                user_cache=self._user_cache
             )
         return self._user_service
 
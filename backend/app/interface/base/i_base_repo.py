@@ -30,7 +30,12 @@ class IFilterRepository(ABC, Generic[ModelType]):
 # Пагинация
 class IPaginateRepository(ABC, Generic[ModelType]):
     @abstractmethod
-    async def paginate(self, query, db: AsyncSession, page: int, size: int) -> dict:
+    async def paginate(self, query, db: AsyncSession, page: int, size: int, order_by: Sequence = ()) -> dict:
+        pass
+
+    @abstractmethod
+    async def paginate_cursor(self, query, db: AsyncSession, size: int, cursor: Optional[str] = None,
+                              order_by: Sequence = (), with_total: bool = False, descending: bool = False) -> dict:
         pass
 
 
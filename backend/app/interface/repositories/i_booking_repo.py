@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from datetime import datetime, date
-from typing import List
+from typing import Dict, List, Optional, Sequence
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -26,6 +26,14 @@ class IBookingRepository(IReadRepository[Booking], IFilterRepository[Booking], I
     async def get_booking_from_date(self, db: AsyncSession, stadium_id: int, selected_date: date):
         pass
 
+    @abstractmethod
+    async def get_city_bookings(self, db: AsyncSession, city: str, start_time: datetime, end_time: datetime):
+        pass
+
     @abstractmethod
     async def cancel_booking(self, db: AsyncSession, existing_booking: Booking):
         pass
+
+    @abstractmethod
+    async def complete_pending(self, db: AsyncSession, payments: Dict[int, Optional[str]]) -> Sequence:
+        pass
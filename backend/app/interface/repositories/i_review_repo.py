@@ -1,4 +1,6 @@
 from abc import abstractmethod, ABC
+from typing import Optional
+
 from sqlalchemy.ext.asyncio import AsyncSession
 from backend.app.interface.base.i_base_repo import ICrudRepository, IReadRepository
 from backend.app.models.stadium_reviews import StadiumReview, CreateReview, UpdateReview
@@ -9,3 +11,8 @@ class IReviewRepository(IReadRepository[StadiumReview],ICrudRepository[StadiumRe
     @abstractmethod
     async def check_duplicate_review(self, db: AsyncSession, user_id: int, stadium_id: int):
         pass
+
+    @abstractmethod
+    async def paginate_stadium_reviews(self, db: AsyncSession, stadium_id: int, size: int,
+                                       cursor: Optional[str] = None) -> dict:
+        pass
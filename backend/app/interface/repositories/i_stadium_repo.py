@@ -1,6 +1,5 @@
 from abc import ABC, abstractmethod
-from datetime import datetime
-from typing import Type
+from typing import Type, Iterable, Sequence
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import SQLModel
@@ -31,12 +30,16 @@ class IStadiumRepository(IReadRepository[Stadium], IPaginateRepository[Stadium],
         pass
 
     @abstractmethod
-    async def search_available_stadiums(self, db: AsyncSession, city: str, start_time: datetime, end_time: datetime):
+    async def get_active_in_city(self, db: AsyncSession, city: str, exclude_ids: Iterable[int] = ()) -> Sequence[Stadium]:
         pass
 
 
 
 
+    @abstractmethod
+    async def change_review_count(self, db: AsyncSession, stadium_id: int, delta: int) -> None:
+        pass
+
     @abstractmethod
     async def add_price_intervals(self, db,  price_intervals, stadium_id):
         pass
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Optional
 
 from fastapi import UploadFile
 from sqlmodel.ext.asyncio.session import AsyncSession
@@ -9,9 +10,15 @@ from backend.app.interface.base.i_base_repo import ModelType
 # Интерфейс для работы с изображениями
 class ImageHandler(ABC):
     @abstractmethod
-    async def upload_image(self, db: AsyncSession, instance: ModelType, file: UploadFile) -> dict:
+    async def upload_image(self, db: AsyncSession, instance: ModelType, file: UploadFile,
+                           on_uploaded: Optional[Callable[[], Awaitable[None]]] = None) -> dict:
+        """Принимает файл и возвращает статус pending; on_uploaded вызывается после записи image_url"""
         pass
 
     @abstractmethod
     async def delete_old_image(self, db: AsyncSession, instance: ModelType) -> None:
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    async def drain(self) -> None:
+        pass
@@ -0,0 +1,13 @@
+from abc import ABC, abstractmethod
+
+
+# Интерфейс хранилища изображений. Методы синхронные: обработчик вызывает их в пуле потоков
+class ImageStorage(ABC):
+    @abstractmethod
+    def upload(self, path: str, folder: str) -> dict:
+        """Загружает файл и возвращает {"url": ..., "public_id": ...}"""
+        pass
+
+    @abstractmethod
+    def destroy(self, url: str) -> None:
+        pass
@@ -5,11 +5,11 @@ from typing import Optional
 # Интерфейс для работы с паролями
 class IPasswordService(ABC):
     @abstractmethod
-    def hash_password(self, password: str) -> str:
+    async def hash_password(self, password: str) -> str:
         pass
 
     @abstractmethod
-    def verify_password(self, plain: str, hashed: str) -> bool:
+    async def verify_password(self, plain: str, hashed: str) -> bool:
         pass
 
     @abstractmethod
@@ -18,4 +18,12 @@ class IPasswordService(ABC):
 
     @abstractmethod
     def verify_password_reset_token(self, token: str) -> Optional[str]:
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def stats(self) -> dict:
+        pass
+
+    @abstractmethod
+    def shutdown(self) -> None:
+        pass
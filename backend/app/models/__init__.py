@@ -7,6 +7,9 @@ __all__ = ('User',
            'StadiumReview',
            'AdditionalFacility',
            'Message',
+           'ConversationSummary',
+           'EmailOutbox',
+           'WebhookEvent',
 
            )
 
@@ -17,4 +20,6 @@ from backend.app.models.stadium_reviews import StadiumReview
 from backend.app.models.users import User
 from backend.app.models.stadiums import Stadium, PriceInterval
 from backend.app.models.bookings import Booking
-from backend.app.models.chat import Message
+from backend.app.models.chat import Message, ConversationSummary
+from backend.app.models.email_outbox import EmailOutbox
+from backend.app.models.webhook_event import WebhookEvent
@@ -1,8 +1,11 @@
 from datetime import datetime
+from decimal import Decimal
 from enum import Enum
-from typing import Optional, List
+from typing import Optional, List, Any
 
 from pydantic.v1 import validator
+from sqlalchemy import Column, Computed, DDL, Index, event
+from sqlalchemy.dialects.postgresql import ExcludeConstraint, TSRANGE
 from sqlmodel import SQLModel, Field, Relationship
 
 from backend.app.models.base_model_public import BookingReadBase, StadiumsReadBase, UserReadBase
@@ -21,6 +24,18 @@ class BookingBase(SQLModel):
 
 
 class Booking(BookingBase, table=True):
+    __table_args__ = (
+        # Пересечение броней одного стадиона отсекается самой БД, без предварительного SELECT
+        ExcludeConstraint(
+            ("stadium_id", "="),
+            ("period", "&&"),
+            name="booking_stadium_period_excl",
+            using="gist",
+            where="status <> 'Canceled'",
+        ),
+        Index("ix_booking_stadium_time", "stadium_id", "start_time", "end_time"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True, index=True)
     user_id: Optional[int] = Field(foreign_key="user.id")
     stadium_id: int = Field(foreign_key="stadium.id")
@@ -39,6 +54,11 @@ class Booking(BookingBase, table=True):
     )
 
     status_note: str = Field(default="", nullable=True)  # Поле для пометки
+    period: Optional[Any] = Field(
+        default=None,
+        exclude=True,
+        sa_column=Column(TSRANGE, Computed("tsrange(start_time, end_time, '[)')", persisted=True)),
+    )
 
     @property
     def formatted_created_at(self):
@@ -48,6 +68,9 @@ class Booking(BookingBase, table=True):
         return f"Бронь № {self.id}"
 
 
+event.listen(Booking.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS btree_gist"))
+
+
 class BookingFacility(SQLModel, table=True):
     __tablename__ = 'booking_facility'
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -120,5 +143,22 @@ class BookingReadGet(BookingReadBase):
 
 class PaginatedBookingsResponse(SQLModel):
     items: List[BookingReadGet]
-    page: int
-    pages: int
\ No newline at end of file
+    page: Optional[int] = None
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+
+class BookingQuoteSlot(SQLModel):
+    start_time: datetime
+    end_time: datetime
+
+
+class BookingQuoteRequest(SQLModel):
+    stadium_id: int
+    slots: List[BookingQuoteSlot] = Field(..., max_length=500, description="Интервалы для расчета цены")
+
+
+class BookingQuoteResponse(SQLModel):
+    stadium_id: int
+    prices: List[Decimal]
@@ -1,13 +1,46 @@
 from typing import Optional
+
+from sqlalchemy import Column, Computed, Index, Integer, text
 from sqlmodel import SQLModel, Field
 
 
 class Message(SQLModel, table=True):
+    __table_args__ = (
+        # История диалога - один диапазон индекса по нормализованной паре пользователей
+        Index("ix_message_conversation", "user_low", "user_high", "id"),
+    )
+
     id: int = Field(default=None, primary_key=True, index=True)
     sender_id: int = Field(foreign_key="user.id")
     recipient_id: int = Field(foreign_key="user.id")
     content: Optional[str] = Field(default=None, nullable=True)
 
+    # Ключ диалога: пара (меньший id, больший id) не зависит от направления сообщения
+    user_low: Optional[int] = Field(
+        default=None,
+        exclude=True,
+        sa_column=Column(Integer, Computed("LEAST(sender_id, recipient_id)", persisted=True)),
+    )
+    user_high: Optional[int] = Field(
+        default=None,
+        exclude=True,
+        sa_column=Column(Integer, Computed("GREATEST(sender_id, recipient_id)", persisted=True)),
+    )
+
+
+class ConversationSummary(SQLModel, table=True):
+    """Последнее сообщение диалога, по строке на каждого участника: список диалогов читается без message."""
+    __tablename__ = "conversation_summary"
+    __table_args__ = (
+        Index("ix_conversation_summary_user_last", "user_id", text("last_message_id DESC")),
+    )
+
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    peer_id: int = Field(foreign_key="user.id", primary_key=True)
+    last_message_id: int = Field(foreign_key="message.id")
+    last_sender_id: int
+    last_content: Optional[str] = Field(default=None, nullable=True)
+
 
 class MessageCreate(SQLModel):
     recipient_id: int = Field(..., description="ID получателя сообщения")
@@ -22,4 +55,11 @@ class MessageRead(SQLModel):
     id: int = Field(..., description="Уникальный идентификатор сообщения")
     sender_id: int = Field(..., description="ID отправителя сообщения")
     recipient_id: int = Field(..., description="ID получателя сообщения")
-    content: str = Field(..., description="Содержимое сообщения")
\ No newline at end of file
+    content: str = Field(..., description="Содержимое сообщения")
+
+
+class ConversationRead(SQLModel):
+    peer_id: int = Field(..., description="ID собеседника")
+    last_message_id: int = Field(..., description="ID последнего сообщения")
+    last_sender_id: int = Field(..., description="ID отправителя последнего сообщения")
+    last_content: Optional[str] = Field(None, description="Содержимое последнего сообщения")
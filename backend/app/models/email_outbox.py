@@ -0,0 +1,45 @@
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+
+from sqlalchemy import Index
+from sqlmodel import SQLModel, Field
+
+
+class EmailStatus(str, Enum):
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+
+
+class EmailOutbox(SQLModel, table=True):
+    """
+    Письмо, ожидающее отправки. Строка пишется в транзакции запроса, доставкой занимается EmailOutboxWorker:
+    письмо уходит только если транзакция закоммичена, а запрос не ждет SMTP.
+    """
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        # Очередь воркера и счетчики метрик: письма статуса по времени следующей попытки
+        Index("ix_email_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    email_to: str
+    subject: str
+    html: Optional[str] = Field(default=None, nullable=True)  # Очищается после отправки: в письмах бывают пароли
+    status: EmailStatus = Field(default=EmailStatus.PENDING)
+    attempts: int = Field(default=0)
+    next_attempt_at: datetime = Field(default_factory=datetime.utcnow)
+    last_error: Optional[str] = Field(default=None, nullable=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    sent_at: Optional[datetime] = Field(default=None, nullable=True)
+
+
+class EmailOutboxStats(SQLModel):
+    pending: int = Field(..., description="Писем в очереди")
+    due: int = Field(..., description="Из них готовых к отправке сейчас")
+    failed: int = Field(..., description="Писем, исчерпавших попытки")
+    oldest_pending_seconds: float = Field(..., description="Возраст самого старого письма в очереди")
+    sent_total: int = Field(..., description="Отправлено воркером с запуска")
+    retried_total: int = Field(..., description="Отложено на повтор с запуска")
+    failed_total: int = Field(..., description="Отброшено воркером с запуска")
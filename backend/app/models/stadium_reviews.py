@@ -1,12 +1,19 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
+from sqlalchemy import Index, text
 from sqlmodel import SQLModel, Field, Relationship
 
 from backend.app.models.base_model_public import ReviewReadBase
 
 
 class StadiumReview(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_stadiumreview_user_stadium", "user_id", "stadium_id"),
+        # Новые отзывы стадиона первыми: деталь стадиона и keyset-пагинация отзывов
+        Index("ix_stadiumreview_stadium_data", "stadium_id", text("data DESC"), text("id DESC")),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id", )
     stadium_id: int = Field(foreign_key="stadium.id", description="ID связанного поля")
@@ -20,6 +27,11 @@ class ReviewRead(ReviewReadBase):
     pass
 
 
+class PaginatedReviewsResponse(SQLModel):
+    items: List[ReviewRead]
+    next_cursor: Optional[str] = None
+
+
 class CreateReview(SQLModel):
     review: str
 class UpdateReview(SQLModel):
@@ -4,7 +4,7 @@ from typing import Optional, List
 from enum import Enum as PyEnum
 
 from pydantic import BaseModel, field_validator
-from sqlalchemy import Column, Numeric, Time
+from sqlalchemy import Column, Index, Numeric, Time
 from sqlmodel import SQLModel, Field, Relationship
 from backend.app.models.base_model_public import ReviewReadBase, StadiumsReadBase, AdditionalFacilityReadBase
 
@@ -44,6 +44,9 @@ class StadiumsBase(SQLModel):
 
 class Stadium(StadiumsBase, table=True):
     __tablename__ = 'stadium'
+    __table_args__ = (
+        Index("ix_stadium_active_city", "is_active", "city"),
+    )
     id: Optional[int] = Field(default=None, primary_key=True, index=True)
     image_url: Optional[str]
     created_at: datetime = Field(default_factory=datetime.now, description="Дата создания")
@@ -52,6 +55,8 @@ class Stadium(StadiumsBase, table=True):
     user_id: Optional[int] = Field(default=None, foreign_key="user.id")
     status: StadiumStatus = Field(default=StadiumStatus.DRAFT, nullable=True)
     reason: Optional[str] = Field(default=None, nullable=True)
+    # Поддерживается ReviewService, чтобы деталь стадиона не считала отзывы
+    review_count: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
 
     # Связи с другими моделями
     images_all: List["Image"] = Relationship(back_populates="stadium")
@@ -158,11 +163,21 @@ class StadiumsRead(StadiumsReadBase):
 
 
 class StadiumsReadWithFacility(StadiumsReadBase):
+    # Последние отзывы; остальные отдает /reviews/{stadium_id}
     stadium_reviews: List[ReviewReadBase]
+    review_count: int = 0
     stadium_facility: Optional[List[AdditionalFacilityReadBase]] = None
 
 
+class StadiumDetailPayload(SQLModel):
+    """Сериализованный StadiumsReadWithFacility и его ETag, в таком виде деталь стадиона хранится в кеше."""
+    etag: str
+    body: str
+
+
 class PaginatedStadiumsResponse(SQLModel):
     items: List[StadiumsRead]
-    page: int
-    pages: int
+    page: Optional[int] = None
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
@@ -0,0 +1,29 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Column, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel import SQLModel, Field
+
+
+class WebhookEvent(SQLModel, table=True):
+    """
+    Принятое событие Stripe. Вебхук только проверяет подпись и вставляет строку, ключ - id события:
+    повторная доставка того же события Stripe не создает второй записи.
+    Применяет события StripeWebhookWorker, после чего выставляет processed_at; событие, которое не
+    удалось применить, откладывается до next_attempt_at.
+    """
+    __tablename__ = "webhook_event"
+    __table_args__ = (
+        # Очередь воркера: только необработанные события
+        Index("ix_webhook_event_unprocessed", "received_at", postgresql_where=text("processed_at IS NULL")),
+    )
+
+    id: str = Field(primary_key=True, description="id события Stripe (evt_...)")
+    type: str
+    payload: dict = Field(sa_column=Column(JSONB, nullable=False))
+    received_at: datetime = Field(default_factory=datetime.utcnow)
+    processed_at: Optional[datetime] = Field(default=None, nullable=True)
+    attempts: int = Field(default=0)
+    next_attempt_at: datetime = Field(default_factory=datetime.utcnow, description="Не раньше этого - следующая попытка")
+    last_error: Optional[str] = Field(default=None, nullable=True)
@@ -1,11 +1,17 @@
+import base64
+import binascii
+import json
 import logging
+from datetime import datetime
 from typing import Optional, Sequence, Tuple, Any
 
-from sqlalchemy import func
+from cachetools import TTLCache
+from sqlalchemy import func, text, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from fastapi import HTTPException
 
+from backend.app.services.serialize import serialize_datetime
 from backend.app.interface.base.i_base_repo import (
     ModelType,
     ICrudRepository,
@@ -18,6 +24,29 @@ from backend.app.interface.base.i_base_repo import (
 
 logger = logging.getLogger(__name__)
 
+# Оценки количества строк от планировщика, ключ - текст запроса с параметрами
+_approximate_totals: TTLCache = TTLCache(maxsize=1024, ttl=300)
+
+
+def encode_cursor(item: Any, keys: Sequence) -> str:
+    """Непрозрачный курсор из значений ключа сортировки последней записи страницы."""
+    values = [getattr(item, key.key) for key in keys]
+    raw = json.dumps(values, default=serialize_datetime).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, keys: Sequence) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(keys):
+            raise ValueError
+        return [
+            datetime.fromisoformat(value) if key.type.python_type is datetime else value
+            for key, value in zip(keys, values)
+        ]
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Некорректный курсор")
+
 
 # Миксин для дополнительных операций
 class QueryMixin(
@@ -69,8 +98,9 @@ class QueryMixin(
         result = await db.execute(query)
         return result.scalars().all()
 
-    async def paginate(self, query, db: AsyncSession, page: int, size: int):
+    async def paginate(self, query, db: AsyncSession, page: int, size: int, order_by: Sequence = ()):
         offset = (page - 1) * size
+        keys = order_by or (self.model.id,)
 
         # Подсчет количества записей
         total_query = select(func.count()).select_from(query)
@@ -78,7 +108,7 @@ class QueryMixin(
         total = total_result.scalar()
 
         # Получаем записи с пагинацией
-        result = await db.execute(query.offset(offset).limit(size))
+        result = await db.execute(query.order_by(*keys).offset(offset).limit(size))
         items = result.scalars().all()
 
         pages = (total + size - 1) // size if total else 1
@@ -86,9 +116,57 @@ class QueryMixin(
         return {
             "items": items,
             "page": page,
-            "pages": pages
+            "pages": pages,
+            # Курсор позволяет продолжить обход без OFFSET
+            "next_cursor": encode_cursor(items[-1], keys) if items and page < pages else None
+        }
+
+    async def paginate_cursor(self, query, db: AsyncSession, size: int, cursor: Optional[str] = None,
+                              order_by: Sequence = (), with_total: bool = False, descending: bool = False):
+        """
+        Keyset-пагинация: следующая страница ищется по индексу от ключа последней записи,
+        поэтому глубокие страницы стоят столько же, сколько первая, а count() не выполняется.
+        Пример: await paginate_cursor(query, db, 20, cursor, order_by=(Booking.start_time, Booking.id))
+        Ключ должен быть уникальным, поэтому последним в нем идет id.
+        descending=True обходит ключ от больших значений к меньшим (например, новые записи первыми).
+        """
+        keys = order_by or (self.model.id,)
+        if descending:
+            page_query = query.order_by(*[key.desc() for key in keys]).limit(size + 1)
+        else:
+            page_query = query.order_by(*keys).limit(size + 1)
+        if cursor:
+            after = tuple_(*decode_cursor(cursor, keys))
+            page_query = page_query.where(tuple_(*keys) < after if descending else tuple_(*keys) > after)
+
+        result = await db.execute(page_query)
+        items = result.scalars().all()
+        has_more = len(items) > size
+        items = items[:size]
+
+        return {
+            "items": items,
+            "next_cursor": encode_cursor(items[-1], keys) if has_more else None,
+            "total": await self.approximate_count(query, db) if with_total else None
         }
 
+    async def approximate_count(self, query, db: AsyncSession) -> int:
+        """
+        Оценка количества строк запроса по статистике планировщика (pg_class.reltuples и pg_statistic)
+        без чтения самих строк. Результат кешируется на 5 минут.
+        """
+        statement = str(query.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True}))
+        if statement in _approximate_totals:
+            return _approximate_totals[statement]
+
+        result = await db.execute(text(f"EXPLAIN (FORMAT JSON) {statement}"))
+        plan = result.scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        total = int(plan[0]["Plan"]["Plan Rows"])
+        _approximate_totals[statement] = total
+        return total
+
 
 class AsyncBaseRepository(ICrudRepository[ModelType, CreateType, UpdateType]):
     def __init__(self, model: type[ModelType]):
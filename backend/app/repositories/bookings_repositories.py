@@ -1,17 +1,20 @@
-from datetime import datetime, date
-from typing import List
+from datetime import datetime, date, time, timedelta
+from typing import Dict, List, Optional, Sequence
 
-from sqlalchemy import delete
+from sqlalchemy import Integer, String, column, delete, update, values
+from sqlalchemy.exc import IntegrityError
 
 from .base_repositories import AsyncBaseRepository, QueryMixin
-from sqlmodel import select, func
+from sqlmodel import select
 from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..interface.repositories.i_booking_repo import IBookingRepository
-from ..models.bookings import Booking, BookingCreate, BookingUpdate, BookingFacility
+from ..models import Stadium
+from ..models.bookings import Booking, BookingCreate, BookingUpdate, BookingFacility, StatusBooking
 
 
+EXCLUSION_VIOLATION = "23P01"
 
 
 class BookingRepository(IBookingRepository, AsyncBaseRepository[Booking, BookingCreate, BookingUpdate], QueryMixin):
@@ -25,9 +28,9 @@ class BookingRepository(IBookingRepository, AsyncBaseRepository[Booking, Booking
                 Booking.stadium_id == stadium_id,
                 Booking.start_time < end_time,
                 Booking.end_time > start_time
-            )
+            ).limit(1)
         )
-        return result.scalar_one_or_none()
+        return result.scalars().first()
 
 
     async def create_with_facilities(self, db: AsyncSession,booking_data: dict,facilities_data: List[dict]) -> Booking:
@@ -51,6 +54,15 @@ class BookingRepository(IBookingRepository, AsyncBaseRepository[Booking, Booking
             await db.refresh(booking)
             return booking
 
+        except IntegrityError as e:
+            await db.rollback()
+            # Пересечение с существующей бронью ловит exclusion constraint booking_stadium_period_excl
+            if getattr(e.orig, "sqlstate", None) == EXCLUSION_VIOLATION:
+                raise HTTPException(status_code=409, detail="Этот промежуток времени уже забронирован.")
+            raise HTTPException(
+                status_code=400,
+                detail=f"Booking creation failed: {str(e)}"
+            )
         except Exception as e:
             await db.rollback()
             raise HTTPException(
@@ -59,17 +71,53 @@ class BookingRepository(IBookingRepository, AsyncBaseRepository[Booking, Booking
             )
 
     async def get_booking_from_date(self, db: AsyncSession, stadium_id: int, selected_date: date):
+        # Полуоткрытый интервал [день, следующий день) вместо date(start_time) использует индекс по start_time
+        day_start = datetime.combine(selected_date, time.min)
         result = await db.execute(
             select(self.model).where(
                 self.model.stadium_id == stadium_id,
-                func.date(self.model.start_time) == selected_date
-            )
+                self.model.start_time >= day_start,
+                self.model.start_time < day_start + timedelta(days=1)
+            ).order_by(self.model.start_time)
         )
         return result.scalars().all()
 
+    async def get_city_bookings(self, db: AsyncSession, city: str, start_time: datetime, end_time: datetime):
+        """(stadium_id, start_time, end_time) броней активных стадионов города, пересекающих интервал"""
+        result = await db.execute(
+            select(Booking.stadium_id, Booking.start_time, Booking.end_time)
+            .join(Stadium, Stadium.id == Booking.stadium_id)
+            .where(
+                Stadium.city == city,
+                Stadium.is_active == True,  # noqa: E712
+                Booking.start_time < end_time,
+                Booking.end_time > start_time
+            )
+        )
+        return result.all()
 
     async def cancel_booking(self, db: AsyncSession, existing_booking: Booking):
         await db.execute(delete(BookingFacility).where(BookingFacility.booking_id == existing_booking.id))
         # Удаляем само бронирование
         await db.delete(existing_booking)
         await db.commit()
+
+    async def complete_pending(self, db: AsyncSession, payments: Dict[int, Optional[str]]) -> Sequence:
+        """
+        Одним UPDATE ... FROM (VALUES ...) отмечает оплаченными ожидающие брони из payments
+        (id брони -> payment_intent). Уже оплаченные или отмененные брони не меняются,
+        поэтому повторное применение того же платежа ничего не делает.
+        Возвращает (id, stadium_id, start_time) измененных броней.
+        """
+        paid = values(column("id", Integer), column("payment_intent_id", String), name="paid").data(
+            list(payments.items()))
+        result = await db.execute(
+            update(Booking)
+            .where(Booking.id == paid.c.id, Booking.status == StatusBooking.PENDING)
+            .values(status=StatusBooking.COMPLETED, stripe_payment_intent_id=paid.c.payment_intent_id)
+            .returning(Booking.id, Booking.stadium_id, Booking.start_time)
+            .execution_options(synchronize_session=False)
+        )
+        rows = result.all()
+        await db.commit()
+        return rows
@@ -1,7 +1,10 @@
+from typing import Optional, Sequence
+
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlmodel import select, or_, and_
+from sqlmodel import select
 
-from backend.app.models import Message
+from backend.app.models import Message, ConversationSummary
 from backend.app.models.chat import MessageCreate, MessageUpdate
 from backend.app.repositories.base_repositories import AsyncBaseRepository
 
@@ -9,26 +12,63 @@ from backend.app.repositories.base_repositories import AsyncBaseRepository
 class MessageRepositories(AsyncBaseRepository[Message, MessageCreate, MessageUpdate]):
     def __init__(self):
         super().__init__(Message)
-    async def get_messages_between_users(self, db: AsyncSession, user_id_1: int, user_id_2: int):
+
+    async def get_messages_between_users(self, db: AsyncSession, user_id_1: int, user_id_2: int, limit: int = 50,
+                                         before_id: Optional[int] = None) -> Sequence[Message]:
         """
-        Асинхронно находит и возвращает все сообщения между двумя пользователями.
+        Асинхронно находит страницу сообщений между двумя пользователями.
 
         Аргументы:
             user_id_1: ID первого пользователя.
             user_id_2: ID второго пользователя.
+            limit: Размер страницы.
+            before_id: Вернуть сообщения старше этого id; без него - последние сообщения.
 
         Возвращает:
-            Список сообщений между двумя пользователями.
+            До limit последних сообщений (старше before_id) в порядке возрастания id.
+            Следующая, более старая страница запрашивается с before_id первого сообщения.
         """
 
-        query = select(self.model).filter(
-            or_(
-                and_(self.model.sender_id == user_id_1, self.model.recipient_id == user_id_2),
-                and_(self.model.sender_id == user_id_2, self.model.recipient_id == user_id_1)
-            )
-        ).order_by(self.model.id)
-        result = await db.execute(query)
-        return result.scalars().all()
-
+        query = select(self.model).where(
+            self.model.user_low == min(user_id_1, user_id_2),
+            self.model.user_high == max(user_id_1, user_id_2),
+        )
+        if before_id is not None:
+            query = query.where(self.model.id < before_id)
+        result = await db.execute(query.order_by(self.model.id.desc()).limit(limit))
+        return list(reversed(result.scalars().all()))
 
+    async def touch_conversation(self, db: AsyncSession, message: Message) -> None:
+        """Записывает сообщение последним в диалоге у обоих участников."""
+        owners = {(message.sender_id, message.recipient_id), (message.recipient_id, message.sender_id)}
+        statement = insert(ConversationSummary).values([
+            {
+                "user_id": user_id,
+                "peer_id": peer_id,
+                "last_message_id": message.id,
+                "last_sender_id": message.sender_id,
+                "last_content": message.content,
+            }
+            for user_id, peer_id in owners
+        ])
+        excluded = statement.excluded
+        await db.execute(statement.on_conflict_do_update(
+            index_elements=[ConversationSummary.user_id, ConversationSummary.peer_id],
+            set_={
+                "last_message_id": excluded.last_message_id,
+                "last_sender_id": excluded.last_sender_id,
+                "last_content": excluded.last_content,
+            },
+            # Параллельная отправка не должна затереть более новое сообщение
+            where=ConversationSummary.last_message_id < excluded.last_message_id,
+        ))
 
+    async def get_conversations(self, db: AsyncSession, user_id: int, limit: int = 50) -> Sequence[ConversationSummary]:
+        """Диалоги пользователя, последние активные первыми."""
+        result = await db.execute(
+            select(ConversationSummary)
+            .where(ConversationSummary.user_id == user_id)
+            .order_by(ConversationSummary.last_message_id.desc())
+            .limit(limit)
+        )
+        return result.scalars().all()
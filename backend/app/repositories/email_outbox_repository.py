@@ -0,0 +1,48 @@
+from datetime import datetime
+from typing import Sequence
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.models.email_outbox import EmailOutbox, EmailStatus
+
+
+class EmailOutboxRepository:
+
+    async def enqueue(self, db: AsyncSession, email_to: str, subject: str, html: str) -> EmailOutbox:
+        """Добавляет письмо в сессию запроса; оно станет видно воркеру вместе с коммитом транзакции."""
+        message = EmailOutbox(email_to=email_to, subject=subject, html=html)
+        db.add(message)
+        await db.flush()
+        return message
+
+    async def claim_batch(self, db: AsyncSession, limit: int) -> Sequence[EmailOutbox]:
+        """
+        Блокирует до limit готовых к отправке писем до конца транзакции.
+        SKIP LOCKED позволяет нескольким воркерам разбирать очередь, не дожидаясь и не дублируя друг друга.
+        """
+        query = (
+            select(EmailOutbox)
+            .where(EmailOutbox.status == EmailStatus.PENDING, EmailOutbox.next_attempt_at <= datetime.utcnow())
+            .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await db.execute(query)
+        return result.scalars().all()
+
+    async def stats(self, db: AsyncSession) -> dict:
+        now = datetime.utcnow()
+        query = select(
+            func.count().filter(EmailOutbox.status == EmailStatus.PENDING),
+            func.count().filter(EmailOutbox.status == EmailStatus.PENDING, EmailOutbox.next_attempt_at <= now),
+            func.count().filter(EmailOutbox.status == EmailStatus.FAILED),
+            func.min(EmailOutbox.created_at).filter(EmailOutbox.status == EmailStatus.PENDING),
+        ).where(EmailOutbox.status.in_([EmailStatus.PENDING, EmailStatus.FAILED]))
+        pending, due, failed, oldest = (await db.execute(query)).one()
+        return {
+            "pending": pending,
+            "due": due,
+            "failed": failed,
+            "oldest_pending_seconds": round((now - oldest).total_seconds(), 1) if oldest else 0.0,
+        }
@@ -1,3 +1,6 @@
+from typing import Optional
+
+from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 from backend.app.interface.repositories.i_review_repo import IReviewRepository
 from backend.app.models import StadiumReview
@@ -13,5 +16,12 @@ class ReviewRepository(IReviewRepository, AsyncBaseRepository[StadiumReview, Cre
     async def check_duplicate_review(self, db: AsyncSession, user_id: int, stadium_id: int):
          return await self.exist(db=db, user_id=user_id, stadium_id=stadium_id)
 
+    async def paginate_stadium_reviews(self, db: AsyncSession, stadium_id: int, size: int,
+                                       cursor: Optional[str] = None) -> dict:
+        """Отзывы стадиона, новые первыми, по индексу ix_stadiumreview_stadium_data"""
+        query = select(StadiumReview).where(StadiumReview.stadium_id == stadium_id)
+        return await self.paginate_cursor(query, db, size, cursor, order_by=(StadiumReview.data, StadiumReview.id),
+                                          descending=True)
+
 
 
@@ -1,14 +1,14 @@
 import logging
-from datetime import datetime, time
-from typing import List, Type
+from datetime import time
+from typing import List, Type, Iterable, Sequence
 
 from fastapi import HTTPException
-from sqlalchemy import delete
+from sqlalchemy import delete, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select, and_, SQLModel
 from .base_repositories import AsyncBaseRepository, QueryMixin
 from backend.app.interface.repositories.i_stadium_repo import IStadiumRepository
-from ..models import AdditionalFacility, Booking
+from ..models import AdditionalFacility
 from ..models.stadiums import StadiumCreate, Stadium, StadiumsUpdate, StadiumFacility, PriceInterval, \
     PriceIntervalCreate
 
@@ -62,25 +62,21 @@ class StadiumRepository(IStadiumRepository, AsyncBaseRepository[Stadium, Stadium
 
 
 
-    async def search_available_stadiums(self, db: AsyncSession, city: str, start_time: datetime, end_time: datetime):
-        # Подзапрос для поиска стадионов, которые уже забронированы в заданном диапазоне времени.
-        subquery = (
-            select(Booking.stadium_id)
-            .where(
-                (Booking.start_time < end_time) &
-                (Booking.end_time > start_time)
-            )
-        )
-
-        # Основной запрос для поиска доступных стадионов
-        available_stadiums = (
-            select(Stadium)
-            .where(Stadium.city == city)
-            .where(Stadium.id.notin_(subquery))
+    async def change_review_count(self, db: AsyncSession, stadium_id: int, delta: int) -> None:
+        """Атомарно меняет денормализованный счетчик отзывов стадиона"""
+        await db.execute(
+            update(Stadium)
+            .where(Stadium.id == stadium_id)
+            .values(review_count=Stadium.review_count + delta)
         )
 
-        # Выполняем запрос и возвращаем результат
-        result = await db.execute(available_stadiums)
+    async def get_active_in_city(self, db: AsyncSession, city: str, exclude_ids: Iterable[int] = ()) -> Sequence[Stadium]:
+        """Активные стадионы города, кроме перечисленных (занятых)"""
+        query = select(Stadium).where(Stadium.city == city, Stadium.is_active == True)  # noqa: E712
+        exclude_ids = list(exclude_ids)
+        if exclude_ids:
+            query = query.where(Stadium.id.notin_(exclude_ids))
+        result = await db.execute(query)
         return result.scalars().all()
 
     async def check_intersection(
@@ -0,0 +1,54 @@
+from datetime import datetime
+from typing import Optional, Sequence
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.models.webhook_event import WebhookEvent
+
+
+class WebhookEventRepository:
+
+    async def insert_if_new(self, db: AsyncSession, event_id: str, event_type: str, payload: dict) -> bool:
+        """Сохраняет событие, если его еще нет. False - повторная доставка уже принятого события."""
+        now = datetime.utcnow()
+        query = (
+            insert(WebhookEvent)
+            .values(id=event_id, type=event_type, payload=payload, received_at=now, attempts=0, next_attempt_at=now)
+            .on_conflict_do_nothing(index_elements=[WebhookEvent.id])
+            .returning(WebhookEvent.id)
+        )
+        result = await db.execute(query)
+        return result.scalar_one_or_none() is not None
+
+    async def claim_batch(self, db: AsyncSession, limit: int, max_attempts: int) -> Sequence[WebhookEvent]:
+        """Блокирует до limit необработанных событий до конца транзакции, другие воркеры их пропускают."""
+        query = (
+            select(WebhookEvent)
+            .where(WebhookEvent.processed_at.is_(None), WebhookEvent.attempts < max_attempts,
+                   WebhookEvent.next_attempt_at <= datetime.utcnow())
+            .order_by(WebhookEvent.received_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        result = await db.execute(query)
+        return result.scalars().all()
+
+    async def claim(self, db: AsyncSession, event_id: str) -> Optional[WebhookEvent]:
+        """Блокирует одно необработанное событие; None, если его уже обработали или держит другой воркер."""
+        query = (
+            select(WebhookEvent)
+            .where(WebhookEvent.id == event_id, WebhookEvent.processed_at.is_(None))
+            .with_for_update(skip_locked=True)
+        )
+        result = await db.execute(query)
+        return result.scalar_one_or_none()
+
+    async def record_failure(self, db: AsyncSession, event_id: str, error: str, retry_at: datetime) -> None:
+        await db.execute(
+            update(WebhookEvent)
+            .where(WebhookEvent.id == event_id)
+            .values(attempts=WebhookEvent.attempts + 1, last_error=error, next_attempt_at=retry_at)
+        )
+        await db.commit()
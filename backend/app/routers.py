@@ -7,6 +7,7 @@ from backend.app.api.message_api import message_router
 from backend.app.api.facility_api import services_router
 
 from backend.app.api.stadiums_api import stadium_router
+from backend.app.api.system_api import system_router
 
 from backend.app.api.user_api import user_router
 from backend.app.api.webhook import webhook_router
@@ -23,4 +24,5 @@ api_router.include_router(add_review_router,  tags=["reviews"])
 api_router.include_router(webhook_router, tags=["Webhooks"])
 
 api_router.include_router(message_router, tags=["messages"])
+api_router.include_router(system_router, prefix="/system", tags=["system"])
 
@@ -24,7 +24,7 @@ class UserAuthentication:
     @HttpExceptionWrapper
     async def authenticate(self, db: AsyncSession, email: str, password: str) -> Optional[User]:
         user = await self.user_repository.get_by_email(db, email=email)
-        if not user or not self.pass_service.verify_password(password, user.hashed_password):
+        if not user or not await self.pass_service.verify_password(password, user.hashed_password):
             return None
         return user
 
@@ -1,6 +1,6 @@
 import logging
-from datetime import datetime, timedelta
-import stripe
+from datetime import datetime, date
+from typing import Dict, List, Optional
 from fastapi import HTTPException
 from sqlalchemy.orm import selectinload
 from sqlmodel import select
@@ -10,10 +10,14 @@ from backend.app.interface.repositories.i_booking_repo import IBookingRepository
 from backend.app.interface.repositories.i_stadium_repo import IStadiumRepository
 from backend.app.models import User, Stadium
 from backend.app.models.bookings import BookingCreate, StatusBooking, Booking, BookingFacility, \
-    PaginatedBookingsResponse
+    PaginatedBookingsResponse, BookingQuoteRequest, BookingQuoteResponse, BookingRead
 from backend.app.repositories.facility_repository import FacilityRepository
+from backend.app.services.booking.price_schedule import PriceScheduleCache
+from backend.app.services.booking.stripe_checkout import StripeCheckout
+from backend.app.services.stadium.stadium_availability_service import StadiumAvailabilityService
 from backend.app.services.utils_service.permission import PermissionService
 from backend.app.services.decorators import HttpExceptionWrapper
+from backend.app.services.redis import RedisClient
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -24,20 +28,26 @@ class BookingService:
 
     def __init__(self, booking_repository: IBookingRepository, stadium_repository: IStadiumRepository,
                  facility_repository: FacilityRepository,
-                 permission: PermissionService):
+                 permission: PermissionService, price_schedules: PriceScheduleCache,
+                 availability: StadiumAvailabilityService, redis: RedisClient, checkout: StripeCheckout):
         self.booking_repository = booking_repository
         self.stadium_repository = stadium_repository
         self.facility_repository = facility_repository
         self.permission = permission
-
-    async def _check_overlapping_booking(self, db: AsyncSession, stadium_id: int, start_time: datetime,
-                                         end_time: datetime):
-        overlapping_booking = await self.booking_repository.overlapping_booking(db, stadium_id, start_time, end_time)
-        if overlapping_booking:
-            raise HTTPException(status_code=400, detail="Этот промежуток времени уже забронирован.")
+        self.price_schedules = price_schedules
+        self.availability = availability
+        self.redis = redis
+        self.checkout = checkout
 
     @staticmethod
-    def _calculate_price(stadium: Stadium, start_time: datetime, end_time: datetime):
+    def _day_cache_key(stadium_id: int, day: date) -> str:
+        return f"bookings:stadium:{stadium_id}:date:{day.isoformat()}"
+
+    async def _invalidate_day(self, booking: Booking):
+        """Сбрасывает кеш расписания дня, в который начинается бронь."""
+        await self.redis.delete_cache(self._day_cache_key(booking.stadium_id, booking.start_time.date()))
+
+    def _calculate_price(self, stadium: Stadium, start_time: datetime, end_time: datetime):
 
         if start_time >= end_time:
             raise HTTPException(
@@ -45,47 +55,12 @@ class BookingService:
                 detail="Время окончания должно быть больше времени начала."
             )
 
-        total = 0
-        current = start_time
-        day_of_week = start_time.weekday()  # 0=понедельник, 6=воскресенье
-
-        while current < end_time:
-            segment_end = min(current + timedelta(minutes=30), end_time)
-            segment_start_time = current.time()
-            segment_end_time = segment_end.time()
-
-            # Ищем подходящий интервал (сначала для дня недели, потом общий)
-            price = None
-            for interval in stadium.price_intervals:
-                if ((interval.day_of_week == day_of_week or interval.day_of_week is None)
-                        and segment_start_time < interval.end_time
-                        and segment_end_time > interval.start_time
-                ):
-                    price = interval.price
-                    # Приоритет у интервалов с указанным днём недели
-                    if interval.day_of_week == day_of_week:
-                        break
-
-            # Если интервал не найден, используем стандартную цену
-            if price is None:
-                price = stadium.default_price
-
-            total += price
-            current = segment_end
-
-            # Обновляем день недели, если текущее время перешло на следующий день
-            if segment_end.day > current.day:
-                day_of_week = segment_end.weekday()
-
-        return total
+        # Расписание компилируется один раз и переиспользуется до изменения интервалов
+        return self.price_schedules.get(stadium).calculate(start_time, end_time)
 
     @HttpExceptionWrapper
     async def create_booking(self, db: AsyncSession, schema: BookingCreate, user: User):
-        # 1. Проверка пересечений бронирований
-        await self._check_overlapping_booking(db, schema.stadium_id, schema.start_time, schema.end_time)
-
-        # 2. Получаем и проверяем стадион
-
+        # 1. Получаем и проверяем стадион
         stadium = await self.stadium_repository.get_or_404(
             db,
             schema.stadium_id,
@@ -95,7 +70,7 @@ class BookingService:
         if not stadium.is_active:
             raise HTTPException(status_code=400, detail="Этот стадион не активен для бронирования")
 
-        # 3. Проверяем услуги
+        # 2. Проверяем услуги
         facilities_data = []
         if schema.list_facility:
             for facility_data in schema.list_facility:
@@ -111,11 +86,11 @@ class BookingService:
                     'total': facility.price * facility_data.quantity
                 })
 
-        # 4. Рассчитываем цену
+        # 3. Рассчитываем цену
         booking_price = self._calculate_price(stadium, schema.start_time, schema.end_time)
         total_price = booking_price + sum(item['total'] for item in facilities_data)
 
-        # 5. Подготавливаем данные для создания бронирования
+        # 4. Подготавливаем данные для создания бронирования
         booking_data = {
             'start_time': schema.start_time,
             'end_time': schema.end_time,
@@ -127,13 +102,42 @@ class BookingService:
             'status_note': schema.status_note
         }
 
-        # 6. Создаем бронирование через репозиторий (включая коммит)
-        return await self.booking_repository.create_with_facilities(
+        # 5. Создаем бронирование через репозиторий (включая коммит).
+        # Пересечения проверяет exclusion constraint при вставке: конфликт превращается в 409
+        booking = await self.booking_repository.create_with_facilities(
             db=db,
             booking_data=booking_data,
             facilities_data=facilities_data
         )
 
+        # 6. Сбрасываем индекс поиска и кеш расписания дня
+        await self.availability.refresh_stadium(stadium, booking.start_time, booking.end_time)
+        await self._invalidate_day(booking)
+        return booking
+
+    @HttpExceptionWrapper
+    async def quote_prices(self, db: AsyncSession, schema: BookingQuoteRequest) -> BookingQuoteResponse:
+        """Расчет цен для набора интервалов одного стадиона за один проход по расписанию."""
+        stadium = await self.stadium_repository.get_or_404(
+            db,
+            schema.stadium_id,
+            options=[selectinload(Stadium.price_intervals)]  # type: ignore
+        )
+        if not stadium.is_active:
+            raise HTTPException(status_code=400, detail="Этот стадион не активен для бронирования")
+
+        if any(slot.start_time >= slot.end_time for slot in schema.slots):
+            raise HTTPException(
+                status_code=400,
+                detail="Время окончания должно быть больше времени начала."
+            )
+
+        schedule = self.price_schedules.get(stadium)
+        return BookingQuoteResponse(
+            stadium_id=stadium.id,
+            prices=schedule.calculate_many((slot.start_time, slot.end_time) for slot in schema.slots)
+        )
+
     @HttpExceptionWrapper
     async def create_payment_session(self, db: AsyncSession, booking_id: int, success_url: str, cancel_url: str):
         booking = await self.booking_repository.get_or_404(
@@ -180,24 +184,41 @@ class BookingService:
                     "quantity": facility.quantity,
                 })
 
-        # Создание Stripe-сессии
-        session = stripe.checkout.Session.create(
-            payment_method_types=["card"],
-            line_items=line_items,
-            mode="payment",
-            success_url=success_url,
-            cancel_url=cancel_url,
-            metadata={"booking_id": booking.id},  # Метаданные для связи заказа со Stripe
-        )
-
-        return session.url
+        # Создание Stripe-сессии или уже созданная для этой брони
+        return await self.checkout.checkout_url(booking.id, {
+            "payment_method_types": ["card"],
+            "line_items": line_items,
+            "mode": "payment",
+            "success_url": success_url,
+            "cancel_url": cancel_url,
+            "metadata": {"booking_id": str(booking.id)},  # Метаданные для связи заказа со Stripe
+        })
 
     @HttpExceptionWrapper
-    async def get_booking_from_date(self, db: AsyncSession, stadium_id: int, date: str):
-        selected_date = datetime.strptime(date, "%Y-%m-%d").date()
-        result = self.booking_repository.get_booking_from_date(db=db, stadium_id=stadium_id,
-                                                               selected_date=selected_date)
-        return result
+    async def get_booking_from_date(self, db: AsyncSession, stadium_id: int, selected_date: date):
+        cache_key = self._day_cache_key(stadium_id, selected_date)
+        cached_bookings = await self.redis.fetch_cached_data(cache_key=cache_key, schema=BookingRead)
+        if cached_bookings is not None:
+            return cached_bookings
+
+        bookings = await self.booking_repository.get_booking_from_date(db=db, stadium_id=stadium_id,
+                                                                       selected_date=selected_date)
+        items = [BookingRead.model_validate(booking) for booking in bookings]
+        await self.redis.cache_data(cache_key, items, BookingRead)
+        return items
+
+    async def mark_paid_many(self, db: AsyncSession, payments: Dict[int, Optional[str]]) -> List[int]:
+        """
+        Отмечает брони оплаченными по пачке событий Stripe (id брони -> payment_intent) и коммитит.
+        Возвращает id броней, которые действительно были в ожидании оплаты.
+        Вызывается только воркером вебхуков, поэтому без HttpExceptionWrapper: в last_error события
+        должна попасть настоящая ошибка, а не общий HTTP 500.
+        """
+        paid = await self.booking_repository.complete_pending(db, payments)
+        for booking in paid:
+            await self._invalidate_day(booking)
+            await self.checkout.invalidate(booking.id)
+        return [booking.id for booking in paid]
 
     @HttpExceptionWrapper
     async def booking_stadium(self, db: AsyncSession, stadium_id: int, user: User):
@@ -217,7 +238,8 @@ class BookingService:
                                                          options=[selectinload(Booking.stadium)])
 
     @HttpExceptionWrapper
-    async def bookings_for_vendor(self, db: AsyncSession, user: User, page: int, size: int):
+    async def bookings_for_vendor(self, db: AsyncSession, user: User, page: int, size: int,
+                                  cursor: Optional[str] = None, with_total: bool = False):
         query = (
             select(Booking)
             .join(Booking.stadium)
@@ -227,17 +249,26 @@ class BookingService:
                 selectinload(Booking.user)
             )
         )
-
-        # Получаем данные с пагинацией
-        paginated_data = await self.booking_repository.paginate(query, db, page, size)
+        order_by = (Booking.start_time, Booking.id)
+
+        # Курсор задан - keyset-пагинация без count(), иначе постраничная
+        if cursor is not None:
+            paginated_data = await self.booking_repository.paginate_cursor(query, db, size, cursor, order_by,
+                                                                            with_total)
+        else:
+            paginated_data = await self.booking_repository.paginate(query, db, page, size, order_by)
         return PaginatedBookingsResponse(**paginated_data)
 
     @HttpExceptionWrapper
     async def delete_booking(self, db: AsyncSession, user: User, booking_id: int):
-        booking = await self.booking_repository.get_or_404(db=db, object_id=booking_id)
+        booking = await self.booking_repository.get_or_404(db=db, object_id=booking_id,
+                                                           options=[selectinload(Booking.stadium)])
         if not booking.status == StatusBooking.PENDING:
             raise HTTPException(status_code=400, detail="Удалять бронирования можно только со статусом 'Pending'")
 
         self.permission.check_owner_or_admin(current_user=user, model=booking)
         await self.booking_repository.cancel_booking(db, existing_booking=booking)
+        await self.availability.refresh_stadium(booking.stadium, booking.start_time, booking.end_time)
+        await self._invalidate_day(booking)
+        await self.checkout.invalidate(booking.id)
         return {"msg": "Бронирование и связанные услуги успешно удалены"}
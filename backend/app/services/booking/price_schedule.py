@@ -0,0 +1,153 @@
+import math
+from datetime import datetime, timedelta, time
+from decimal import Decimal
+from itertools import accumulate
+from typing import Iterable, List, Optional, Tuple
+
+from cachetools import LRUCache
+
+from backend.app.models.stadiums import Stadium, PriceInterval
+
+SLOT_MINUTES = 30
+MINUTES_PER_DAY = 24 * 60
+DAYS_PER_WEEK = 7
+MINUTES_PER_WEEK = DAYS_PER_WEEK * MINUTES_PER_DAY
+SLOTS_PER_WEEK = MINUTES_PER_WEEK // SLOT_MINUTES
+
+# (начало, конец, цена) в минутах от понедельника 00:00
+WeekSegment = Tuple[int, int, Decimal]
+
+
+def minute_of_day(value: time | datetime) -> int:
+    return value.hour * 60 + value.minute
+
+
+def minute_of_week(moment: datetime) -> int:
+    """Минута недели, где 0 - понедельник 00:00."""
+    return moment.weekday() * MINUTES_PER_DAY + minute_of_day(moment)
+
+
+class PriceSchedule:
+    """
+    Скомпилированное недельное расписание цен стадиона.
+
+    Бронь тарифицируется слотами по 30 минут от времени начала. Слот получает цену интервала, с которым
+    пересекается: интервалы конкретного дня недели приоритетнее ежедневных, без пересечений берется
+    default_price. Цены полных слотов хранятся префиксными суммами, поэтому расчет многодневной брони
+    стоит столько же, сколько часовой.
+    """
+
+    def __init__(self, default_price: Optional[Decimal], intervals: Iterable[PriceInterval]):
+        self.default_price = Decimal(default_price or 0)
+        self._daily: List[WeekSegment] = []
+        self._weekly: List[WeekSegment] = []
+
+        for interval in intervals:
+            start, end = minute_of_day(interval.start_time), minute_of_day(interval.end_time)
+            if start >= end:
+                continue
+            if interval.day_of_week is None:
+                days, target = range(DAYS_PER_WEEK), self._daily
+            else:
+                days, target = (interval.day_of_week,), self._weekly
+            target.extend(
+                (day * MINUTES_PER_DAY + start, day * MINUTES_PER_DAY + end, Decimal(interval.price))
+                for day in days
+            )
+
+        slot_prices = self._paint(SLOT_MINUTES)
+        # Для каждого смещения начала внутри получаса - префиксные суммы по слотам недели
+        self._prefix = [
+            list(accumulate(slot_prices[offset::SLOT_MINUTES], initial=Decimal(0)))
+            for offset in range(SLOT_MINUTES)
+        ]
+
+    def _paint(self, length: int) -> List[Decimal]:
+        """
+        Цена слота длиной length для каждой минуты недели, в которую он может начаться.
+
+        Слот [m, m + length) пересекается с интервалом [start, end), если m лежит в [start - length + 1, end).
+        Ежедневные интервалы наносятся по порядку (побеждает последний), интервалы дня недели -
+        в обратном порядке поверх них (побеждает первый).
+        """
+        prices = [self.default_price] * MINUTES_PER_WEEK
+        for start, end, price in self._daily + self._weekly[::-1]:
+            start -= length - 1
+            if start < 0:
+                # Слот в конце воскресенья задевает интервал понедельника
+                prices[start:] = [price] * -start
+                start = 0
+            prices[start:end] = [price] * (end - start)
+        return prices
+
+    def _slot_price(self, minute: int, length: int) -> Decimal:
+        """Цена одиночного (неполного) слота прямым перебором интервалов."""
+
+        def overlaps(segment: WeekSegment) -> bool:
+            start, end, _ = segment
+            return any(start < shift + minute + length and end > shift + minute for shift in (0, -MINUTES_PER_WEEK))
+
+        for segment in self._weekly:
+            if overlaps(segment):
+                return segment[2]
+        price = self.default_price
+        for segment in self._daily:
+            if overlaps(segment):
+                price = segment[2]
+        return price
+
+    def _full_slots_total(self, minute: int, count: int) -> Decimal:
+        sums = self._prefix[minute % SLOT_MINUTES]
+        index = minute // SLOT_MINUTES
+        weeks, rest = divmod(count, SLOTS_PER_WEEK)
+        total = sums[-1] * weeks
+        end = index + rest
+        if end <= SLOTS_PER_WEEK:
+            return total + sums[end] - sums[index]
+        return total + sums[-1] - sums[index] + sums[end - SLOTS_PER_WEEK]
+
+    def calculate(self, start_time: datetime, end_time: datetime) -> Decimal:
+        """Стоимость брони за O(1) независимо от ее длительности."""
+        full_slots, rest = divmod(end_time - start_time, timedelta(minutes=SLOT_MINUTES))
+        minute = minute_of_week(start_time)
+        total = self._full_slots_total(minute, full_slots)
+        if rest:
+            tail = (minute + full_slots * SLOT_MINUTES) % MINUTES_PER_WEEK
+            total += self._slot_price(tail, math.ceil(rest / timedelta(minutes=1)))
+        return total
+
+    def calculate_many(self, slots: Iterable[Tuple[datetime, datetime]]) -> List[Decimal]:
+        """Стоимость набора интервалов: каждый интервал - две выборки из префиксных сумм."""
+        return [self.calculate(start_time, end_time) for start_time, end_time in slots]
+
+
+class PriceScheduleCache:
+    """
+    LRU-кеш скомпилированных расписаний по id стадиона.
+
+    Запись сверяется с отпечатком загруженных интервалов и default_price, поэтому изменения,
+    сделанные другим воркером, не приводят к устаревшей цене.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self._schedules: LRUCache = LRUCache(maxsize=maxsize)
+
+    @staticmethod
+    def _fingerprint(stadium: Stadium) -> tuple:
+        return stadium.default_price, tuple(
+            (interval.id, interval.start_time, interval.end_time, interval.price, interval.day_of_week)
+            for interval in stadium.price_intervals
+        )
+
+    def get(self, stadium: Stadium) -> PriceSchedule:
+        fingerprint = self._fingerprint(stadium)
+        cached = self._schedules.get(stadium.id)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+
+        schedule = PriceSchedule(stadium.default_price, stadium.price_intervals)
+        self._schedules[stadium.id] = (fingerprint, schedule)
+        return schedule
+
+    def invalidate(self, stadium_id: int) -> None:
+        self._schedules.pop(stadium_id, None)
@@ -0,0 +1,84 @@
+import hashlib
+import json
+import logging
+from typing import Optional
+
+import stripe
+from fastapi import HTTPException
+
+from backend.app.services.redis import RedisClient
+from backend.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def checkout_cache_key(booking_id: int) -> str:
+    return f"checkout:booking:{booking_id}"
+
+
+class StripeCheckout:
+    """
+    Checkout-сессии Stripe через асинхронный клиент (httpx.AsyncClient с пулом соединений),
+    event loop не блокируется на запросе к Stripe.
+
+    Сессия кешируется по брони вместе с отпечатком параметров: повторное нажатие "оплатить" в пределах
+    cache_ttl возвращает тот же URL без сетевого запроса. Ключ идемпотентности строится из брони
+    и того же отпечатка, поэтому одновременные запросы мимо кеша получают от Stripe одну и ту же сессию.
+    """
+
+    def __init__(self, redis: RedisClient, api_key: Optional[str] = settings.STRIPE_SECRET_KEY,
+                 api_base: Optional[str] = settings.STRIPE_API_BASE,
+                 cache_ttl: int = settings.STRIPE_CHECKOUT_CACHE_TTL,
+                 timeout: float = settings.STRIPE_TIMEOUT):
+        self.redis = redis
+        self.api_key = api_key
+        self.api_base = api_base
+        self.cache_ttl = cache_ttl
+        self.timeout = timeout
+        self._http_client: Optional[stripe.HTTPXClient] = None
+        self._client: Optional[stripe.StripeClient] = None
+
+    @property
+    def client(self) -> stripe.StripeClient:
+        # Клиент создается при первом платеже: без STRIPE_SECRET_KEY приложение должно запускаться
+        if self._client is None:
+            self._http_client = stripe.HTTPXClient(timeout=self.timeout)
+            self._client = stripe.StripeClient(
+                self.api_key,
+                http_client=self._http_client,
+                base_addresses={"api": self.api_base} if self.api_base else {},
+                max_network_retries=2,
+            )
+        return self._client
+
+    @staticmethod
+    def _fingerprint(params: dict) -> str:
+        raw = json.dumps(params, sort_keys=True, default=str).encode()
+        return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+    async def checkout_url(self, booking_id: int, params: dict) -> str:
+        cache_key = checkout_cache_key(booking_id)
+        fingerprint = self._fingerprint(params)
+        cached = await self.redis.fetch_hash(cache_key)
+        if cached and cached.get("fingerprint") == fingerprint:
+            return cached["url"]
+
+        try:
+            session = await self.client.checkout.sessions.create_async(
+                params=params,
+                options={"idempotency_key": f"checkout-{booking_id}-{fingerprint}"},
+            )
+        except stripe.StripeError as e:
+            logger.error(f"Ошибка создания checkout-сессии для брони {booking_id}: {e}")
+            raise HTTPException(status_code=502, detail="Платежный сервис недоступен")
+
+        await self.redis.cache_hash(cache_key, {"url": session.url, "session_id": session.id,
+                                                "fingerprint": fingerprint}, self.cache_ttl)
+        return session.url
+
+    async def invalidate(self, booking_id: int) -> None:
+        await self.redis.delete_cache(checkout_cache_key(booking_id))
+
+    async def close(self) -> None:
+        if self._http_client is not None:
+            await self._http_client.close_async()
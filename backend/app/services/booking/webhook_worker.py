@@ -0,0 +1,142 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.app.models.webhook_event import WebhookEvent
+from backend.app.repositories.webhook_event_repository import WebhookEventRepository
+from backend.app.services.booking.booking_service import BookingService
+from backend.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHECKOUT_COMPLETED = "checkout.session.completed"
+
+MAX_RETRY_DELAY = 3600
+
+
+class StripeWebhookWorker:
+    """
+    Применяет события Stripe из webhook_event пачками.
+
+    Пачка блокируется FOR UPDATE SKIP LOCKED, оплаты всех событий пачки применяются одним UPDATE,
+    события отмечаются обработанными в той же транзакции. Повтор безопасен: дубликаты событий
+    отсекает первичный ключ, а уже оплаченная бронь повторно не меняется.
+    Если пачка не применилась, ее события применяются по одному, чтобы одно плохое событие не держало
+    остальные оплаты. Событие, которое не применилось и так, откладывается с экспоненциальной задержкой
+    (next_attempt_at); после max_attempts оно остается в таблице с last_error для разбора вручную.
+    """
+
+    def __init__(self, repository: WebhookEventRepository, booking_service: BookingService,
+                 session_maker: async_sessionmaker[AsyncSession],
+                 poll_interval: float = settings.STRIPE_WEBHOOK_POLL_INTERVAL,
+                 batch_size: int = settings.STRIPE_WEBHOOK_BATCH_SIZE,
+                 max_attempts: int = settings.STRIPE_WEBHOOK_MAX_ATTEMPTS,
+                 retry_delay: float = settings.STRIPE_WEBHOOK_RETRY_DELAY):
+        self.repository = repository
+        self.booking_service = booking_service
+        self.session_maker = session_maker
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._stopping.clear()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._stopping.set()
+            await self._task
+            self._task = None
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                processed = await self.process_batch()
+            except Exception as e:
+                logger.error(f"Ошибка обработки событий Stripe: {e}")
+                processed = 0
+            if processed == self.batch_size:
+                continue
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    @staticmethod
+    def _payment(event: WebhookEvent) -> Optional[tuple]:
+        """(id брони, payment_intent) из события checkout.session.completed."""
+        if event.type != CHECKOUT_COMPLETED:
+            return None
+        session = event.payload.get("data", {}).get("object", {})
+        try:
+            booking_id = int((session.get("metadata") or {})["booking_id"])
+        except (KeyError, TypeError, ValueError):
+            booking_id = None
+        # Иначе одно испорченное событие валило бы UPDATE всей пачки
+        if booking_id is None or not 0 < booking_id < 2 ** 31:
+            logger.warning(f"Событие {event.id} без корректного booking_id в metadata")
+            return None
+        return booking_id, session.get("payment_intent")
+
+    async def _apply(self, db: AsyncSession, events: Sequence[WebhookEvent]) -> None:
+        """Применяет оплаты событий и отмечает их обработанными одним коммитом."""
+        payments: Dict[int, Optional[str]] = {}
+        now = datetime.utcnow()
+        for event in events:
+            payment = self._payment(event)
+            if payment is not None:
+                booking_id, payment_intent_id = payment
+                payments[booking_id] = payment_intent_id
+            event.processed_at = now
+            event.attempts += 1
+
+        if payments:
+            # Коммитит брони вместе с отметками событий
+            await self.booking_service.mark_paid_many(db, payments)
+        else:
+            await db.commit()
+
+    async def process_batch(self) -> int:
+        """
+        Применяет одну пачку событий, возвращает число обработанных.
+        Если пачка не применилась, возвращает 0, и цикл ждет poll_interval, а не забирает события снова.
+        """
+        async with self.session_maker() as db:
+            events = await self.repository.claim_batch(db, self.batch_size, self.max_attempts)
+            if not events:
+                return 0
+            event_ids = [event.id for event in events]
+            try:
+                await self._apply(db, events)
+                return len(events)
+            except Exception as e:
+                await db.rollback()
+                logger.error(f"Пачка событий Stripe {event_ids} не применена, применяем по одному: {e}")
+
+        for event_id in event_ids:
+            await self._process_one(event_id)
+        return 0
+
+    async def _process_one(self, event_id: str) -> None:
+        async with self.session_maker() as db:
+            event = await self.repository.claim(db, event_id)
+            if event is None:
+                return
+            attempts = event.attempts + 1
+            try:
+                await self._apply(db, [event])
+            except Exception as e:
+                await db.rollback()
+                delay = min(self.retry_delay * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+                logger.error(f"Событие Stripe {event_id} не применено (попытка {attempts}), "
+                             f"повтор через {delay} с: {e!r}")
+                await self.repository.record_failure(db, event_id, repr(e),
+                                                     retry_at=datetime.utcnow() + timedelta(seconds=delay))
@@ -0,0 +1,38 @@
+from functools import lru_cache
+from typing import Any, Generic, List, Type, TypeVar
+
+from pydantic import TypeAdapter
+
+T = TypeVar("T")
+
+
+class CacheCodec(Generic[T]):
+    """
+    Сериализация значений кеша по их схеме.
+
+    Кодирование и разбор выполняет pydantic-core по схеме типа, поэтому datetime, Decimal и вложенные модели
+    восстанавливаются по объявленным типам полей, а не угадываются по содержимому строк.
+    validate_json строит модели прямо из JSON, без промежуточных словарей.
+    """
+
+    def __init__(self, schema: Any):
+        self.schema = schema
+        self._adapter = TypeAdapter(schema)
+
+    def encode(self, value: T) -> bytes:
+        return self._adapter.dump_json(value)
+
+    def decode(self, raw: str | bytes) -> T:
+        return self._adapter.validate_json(raw)
+
+
+@lru_cache(maxsize=None)
+def codec_for(schema: Any) -> CacheCodec:
+    """Кодек схемы; TypeAdapter строится один раз на тип."""
+    return CacheCodec(schema)
+
+
+def items_codec(schema: Type[T]) -> CacheCodec[List[T]]:
+    """Кодек списка моделей для RedisClient.cache_data/fetch_cached_data."""
+    return codec_for(List[schema])
+
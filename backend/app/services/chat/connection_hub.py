@@ -0,0 +1,223 @@
+import asyncio
+import json
+import logging
+from typing import Dict, Optional, Set
+
+from fastapi import WebSocket
+from starlette.websockets import WebSocketState
+
+from backend.app.services.redis import RedisClient
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "ws:user:"
+
+# Код закрытия для клиента, не успевающего читать сообщения (RFC 6455: 1013 Try Again Later)
+SLOW_CONSUMER_CLOSE_CODE = 1013
+# Клиент не ответил на ping
+HEARTBEAT_CLOSE_CODE = 1011
+
+PING = json.dumps({"type": "ping"})
+PONG = json.dumps({"type": "pong"})
+
+
+class HubConnection:
+    """Сокет пользователя с собственной ограниченной очередью отправки и задачей-отправителем."""
+
+    def __init__(self, user_id: int, websocket: WebSocket, queue_size: int):
+        self.user_id = user_id
+        self.websocket = websocket
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=queue_size)
+        self.sender: Optional[asyncio.Task] = None
+
+    def offer(self, message: str) -> bool:
+        """Ставит сообщение в очередь без ожидания; False, если очередь заполнена."""
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def send_loop(self) -> None:
+        try:
+            while True:
+                message = await self.queue.get()
+                await self.websocket.send_text(message)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Сокет закрыт клиентом; соединение снимает done-callback хаба
+            logger.info(f"Отправка в сокет пользователя {self.user_id} остановлена: {e}")
+
+    async def close(self, code: int) -> None:
+        if self.websocket.application_state == WebSocketState.CONNECTED:
+            try:
+                await self.websocket.close(code=code)
+            except RuntimeError:
+                pass
+
+
+class ConnectionHub:
+    """
+    Доставка сообщений по WebSocket между воркерами.
+
+    Сообщение публикуется в Redis-канал получателя ws:user:{id}. Каждый воркер подписан на каналы
+    пользователей, у которых на нем есть открытые сокеты, и раскладывает полученное по их очередям.
+    У пользователя может быть несколько сокетов (вкладок, устройств).
+
+    Отправка не блокирует публикующего: сообщение кладется в очередь сокета, а пишет в сокет его задача.
+    Сокет, чья очередь заполнена, закрывается с кодом 1013. Клиент переподключается и догружает историю,
+    а остальные получатели не ждут медленного клиента.
+    """
+
+    def __init__(self, redis: RedisClient, queue_size: int = 100, ping_interval: float = 30,
+                 pong_timeout: float = 10):
+        self.redis = redis
+        self.queue_size = queue_size
+        self.ping_interval = ping_interval
+        self.pong_timeout = pong_timeout
+        self._connections: Dict[int, Set[HubConnection]] = {}
+        self._pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def channel(user_id: int) -> str:
+        return f"{CHANNEL_PREFIX}{user_id}"
+
+    async def connect(self, user_id: int, websocket: WebSocket) -> HubConnection:
+        """Регистрирует принятый сокет; первый сокет пользователя на воркере подписывает его канал."""
+        connection = HubConnection(user_id, websocket, self.queue_size)
+        connection.sender = asyncio.create_task(connection.send_loop())
+        connection.sender.add_done_callback(lambda _: asyncio.ensure_future(self.disconnect(connection)))
+
+        async with self._lock:
+            connections = self._connections.setdefault(user_id, set())
+            connections.add(connection)
+            if len(connections) == 1:
+                try:
+                    pubsub = await self._ensure_pubsub()
+                    await pubsub.subscribe(self.channel(user_id))
+                except BaseException:
+                    # Без отката пустая запись осталась бы в хабе, и следующие сокеты пользователя
+                    # считали бы канал уже подписанным
+                    connections.discard(connection)
+                    if not connections:
+                        del self._connections[user_id]
+                    connection.sender.cancel()
+                    raise
+                # Слушатель мог завершиться, пока шла подписка: он выходит, когда каналов не осталось
+                self._ensure_listener()
+        return connection
+
+    async def serve(self, connection: HubConnection) -> None:
+        """
+        Читает сокет до отключения клиента.
+
+        Цикл просыпается только на входящие кадры и раз в ping_interval простоя: тогда клиенту уходит
+        {"type": "ping"} через его очередь. Если за pong_timeout от клиента ничего не пришло, сокет закрывается.
+        На {"type": "ping"} клиента отвечаем pong; остальные кадры только подтверждают, что клиент жив.
+        """
+        websocket = connection.websocket
+        awaiting_pong = False
+        while connection.sender and not connection.sender.done():
+            timeout = self.pong_timeout if awaiting_pong else self.ping_interval
+            try:
+                message = await asyncio.wait_for(websocket.receive(), timeout=timeout)
+            except asyncio.TimeoutError:
+                if awaiting_pong:
+                    logger.info(f"Сокет пользователя {connection.user_id} не ответил на ping")
+                    await self.disconnect(connection)
+                    await connection.close(HEARTBEAT_CLOSE_CODE)
+                    return
+                connection.offer(PING)
+                awaiting_pong = True
+                continue
+
+            if message["type"] == "websocket.disconnect":
+                return
+            awaiting_pong = False
+            if message.get("text") and _is_ping(message["text"]):
+                connection.offer(PONG)
+
+    async def disconnect(self, connection: HubConnection) -> None:
+        """Снимает сокет; с последним сокетом пользователя воркер отписывается от его канала."""
+        if connection.sender and not connection.sender.done():
+            connection.sender.cancel()
+
+        async with self._lock:
+            connections = self._connections.get(connection.user_id)
+            if not connections or connection not in connections:
+                return
+            connections.discard(connection)
+            if not connections:
+                del self._connections[connection.user_id]
+                if self._pubsub is not None:
+                    await self._pubsub.unsubscribe(self.channel(connection.user_id))
+
+    async def publish(self, user_id: int, message: dict) -> None:
+        """Отправляет сообщение всем сокетам пользователя на любом воркере."""
+        await self.redis.publish(self.channel(user_id), json.dumps(message))
+
+    def deliver(self, user_id: int, message: str) -> None:
+        """Раскладывает сообщение по очередям локальных сокетов пользователя."""
+        for connection in list(self._connections.get(user_id, ())):
+            if not connection.offer(message):
+                logger.warning(f"Очередь сокета пользователя {user_id} заполнена, соединение закрывается")
+                asyncio.ensure_future(self._drop(connection))
+
+    async def _drop(self, connection: HubConnection) -> None:
+        await self.disconnect(connection)
+        await connection.close(SLOW_CONSUMER_CLOSE_CODE)
+
+    async def _ensure_pubsub(self):
+        if self._pubsub is None:
+            self._pubsub = await self.redis.pubsub()
+        return self._pubsub
+
+    def _ensure_listener(self) -> None:
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        """
+        Читает pub/sub, пока воркер подписан хоть на один канал. Без сокетов слушатель завершается
+        и не просыпается впустую; его снова запускает connect первого сокета.
+        """
+        while self._pubsub is not None and self._pubsub.subscribed:
+            try:
+                # Ждет сообщения без таймаута: отписка последнего канала тоже приходит сообщением
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=None)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ошибка чтения Redis pub/sub: {e}")
+                await asyncio.sleep(1)
+                continue
+            if message and message["type"] == "message":
+                user_id = int(message["channel"].removeprefix(CHANNEL_PREFIX))
+                self.deliver(user_id, message["data"])
+
+    def stats(self) -> dict:
+        return {
+            "users": len(self._connections),
+            "connections": sum(len(connections) for connections in self._connections.values()),
+        }
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+        for connections in list(self._connections.values()):
+            for connection in list(connections):
+                await self.disconnect(connection)
+                await connection.close(1001)
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            self._pubsub = None
+
+
+def _is_ping(text: str) -> bool:
+    try:
+        return json.loads(text).get("type") == "ping"
+    except (ValueError, AttributeError):
+        return False
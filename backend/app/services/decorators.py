@@ -1,7 +1,19 @@
+import asyncio
+import inspect
 import logging
+import math
+import random
+import time
 from functools import wraps
+from typing import Any, Callable, Dict, Iterable, Optional, Union, get_type_hints
+
 import sentry_sdk
 from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from backend.app.services.cache_codec import CacheCodec, codec_for
+from backend.core.db import async_session_maker
 
 logger = logging.getLogger(__name__)
 
@@ -36,6 +48,119 @@ def sentry_capture_exceptions(func):
 #     return decorator
 
 
+CacheKey = Union[str, Callable[..., str]]
+
+
+def _render_key(template: CacheKey, arguments: Dict[str, Any]) -> str:
+    return template(**arguments) if callable(template) else template.format(**arguments)
+
+
+def cached(key: CacheKey, ttl: int = 600, tags: Iterable[CacheKey] = (), stale_ttl: int = 60, beta: float = 1.0,
+           db_arg: str = "db", session_maker: async_sessionmaker = async_session_maker):
+    """
+    Read-through кеш для методов сервисов с self.redis.
+
+    Ключ и теги - шаблоны str.format по аргументам метода ("stadiums:vendor:{user.id}") или функции,
+    принимающие эти аргументы. Значение сериализуется кодеком по аннотации возвращаемого типа метода.
+
+    - Одновременные промахи по одному ключу выполняют один загрузчик, остальные ждут его результат.
+    - Запись считается свежей ttl секунд; до этого она обновляется заранее с вероятностью, растущей
+      к концу ttl и пропорциональной времени загрузки (beta=0 отключает раннее обновление).
+    - Еще stale_ttl секунд запись отдается устаревшей, а обновление идет в фоне.
+    - Загрузчик всегда работает в собственной сессии из session_maker: его результат ждут несколько
+      запросов, и сессия первого из них может закрыться раньше (ответ отдан, клиент отключился).
+
+    invalidate_cache/delete_cache_by_prefix сбрасывают сам ключ и ключи с тегом, равным префиксу: ключи,
+    которые сбрасываются префиксом-родителем (страницы списка), должны перечислить его в tags.
+    :param key: Шаблон ключа кеша.
+    :param ttl: Время свежести записи в секундах.
+    :param tags: Шаблоны тегов - префиксов, сброс которых удаляет и этот ключ.
+    :param stale_ttl: Сколько секунд после ttl запись отдается устаревшей.
+    :param beta: Коэффициент раннего обновления.
+    :param db_arg: Имя аргумента с сессией БД, которую загрузчик заменяет своей.
+    :param session_maker: Фабрика сессий загрузчика.
+    """
+
+    def decorator(func):
+        signature = inspect.signature(func)
+        self_arg = next(iter(signature.parameters))
+        return_type = get_type_hints(func).get("return")
+        if return_type is None:
+            raise TypeError(f"@cached: у {func.__qualname__} нет аннотации возвращаемого типа")
+        codec = codec_for(return_type)
+        inflight: Dict[str, asyncio.Future] = {}
+
+        async def load(bound: inspect.BoundArguments, cache_key: str, cache_tags: list) -> Any:
+            service = bound.arguments[self_arg]
+            started = time.perf_counter()
+            value = await func(*bound.args, **bound.kwargs)
+            delta = time.perf_counter() - started
+            await service.redis.cache_entry(cache_key, {
+                "value": codec.encode(value),
+                "expires_at": time.time() + ttl,
+                "delta": delta,
+            }, ttl + stale_ttl, cache_tags)
+            return value
+
+        async def load_in_session(bound: inspect.BoundArguments, cache_key: str, cache_tags: list) -> Any:
+            # Общая задача не должна зависеть от сессии запроса, которая ее запустила
+            async with session_maker() as session:
+                arguments = {**bound.arguments, db_arg: session}
+                return await load(signature.bind(**arguments), cache_key, cache_tags)
+
+        def single_flight(cache_key: str, loader) -> asyncio.Future:
+            task = inflight.get(cache_key)
+            if task is None:
+                task = asyncio.ensure_future(loader)
+                inflight[cache_key] = task
+                task.add_done_callback(lambda _: inflight.pop(cache_key, None))
+            else:
+                loader.close()
+            return task
+
+        def refresh_in_background(bound: inspect.BoundArguments, cache_key: str, cache_tags: list) -> None:
+            if cache_key in inflight:
+                return
+            task = single_flight(cache_key, load_in_session(bound, cache_key, cache_tags))
+
+            def log_error(done: asyncio.Future) -> None:
+                if not done.cancelled() and done.exception() is not None:
+                    logger.error(f"Ошибка фонового обновления кеша {cache_key}: {done.exception()}")
+
+            task.add_done_callback(log_error)
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = {name: value for name, value in bound.arguments.items() if name != self_arg}
+            cache_key = _render_key(key, arguments)
+            cache_tags = [_render_key(tag, arguments) for tag in tags]
+            service = bound.arguments[self_arg]
+
+            value, expires_at, delta = _decode_entry(codec, await service.redis.fetch_hash(cache_key), cache_key)
+            if expires_at is not None:
+                now = time.time()
+                if now >= expires_at or (beta and now - delta * beta * math.log(1.0 - random.random()) >= expires_at):
+                    refresh_in_background(bound, cache_key, cache_tags)
+                return value
+
+            return await asyncio.shield(single_flight(cache_key, load_in_session(bound, cache_key, cache_tags)))
+
+        return wrapper
+
+    return decorator
+
+
+def _decode_entry(codec: CacheCodec, entry: Optional[dict], cache_key: str):
+    """Возвращает (значение, expires_at, delta) записи @cached или (None, None, None) для промаха."""
+    if not entry:
+        return None, None, None
+    try:
+        return codec.decode(entry["value"]), float(entry["expires_at"]), float(entry["delta"])
+    except (KeyError, ValueError, ValidationError) as e:
+        logger.warning(f"Запись кеша {cache_key} не читается, загружаем заново: {e}")
+        return None, None, None
 
 
 def HttpExceptionWrapper(func):
@@ -1,26 +1,73 @@
 import logging
-
-import emails
-from emails.template import JinjaTemplate
+import smtplib
+from email.message import EmailMessage
+from email.utils import formataddr
+from typing import Optional
 
 from backend.core.config import settings
 
+logger = logging.getLogger(__name__)
+
+
+class SmtpClient:
+    """
+    SMTP-соединение, переиспользуемое между письмами: рукопожатие, STARTTLS и авторизация выполняются
+    один раз на пачку писем, а не на каждое. Методы блокирующие - EmailOutboxWorker вызывает их
+    из своего единственного потока, поэтому соединение не используется конкурентно.
+    """
+
+    def __init__(self, host: Optional[str] = settings.SMTP_HOST, port: int = settings.SMTP_PORT,
+                 user: Optional[str] = settings.SMTP_USER, password: Optional[str] = settings.SMTP_PASSWORD,
+                 tls: bool = settings.SMTP_TLS, ssl: bool = settings.SMTP_SSL,
+                 mail_from: tuple = (settings.EMAILS_FROM_NAME, settings.EMAILS_FROM_EMAIL), timeout: float = 30):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.tls = tls
+        self.ssl = ssl
+        self.mail_from = mail_from
+        self.timeout = timeout
+        self._smtp: Optional[smtplib.SMTP] = None
+
+    def _connection(self) -> smtplib.SMTP:
+        if self._smtp is None:
+            smtp_class = smtplib.SMTP_SSL if self.ssl else smtplib.SMTP
+            smtp = smtp_class(self.host, self.port, timeout=self.timeout)
+            try:
+                if self.tls and not self.ssl:
+                    smtp.starttls()
+                if self.user:
+                    smtp.login(self.user, self.password)
+            except Exception:
+                smtp.close()
+                raise
+            self._smtp = smtp
+            logger.info(f"Открыто SMTP-соединение с {self.host}:{self.port}")
+        return self._smtp
+
+    def build_message(self, email_to: str, subject: str, html: str) -> EmailMessage:
+        message = EmailMessage()
+        message["Subject"] = subject
+        message["From"] = formataddr(self.mail_from)
+        message["To"] = email_to
+        message.set_content(html, subtype="html")
+        return message
+
+    def send(self, email_to: str, subject: str, html: str) -> None:
+        message = self.build_message(email_to, subject, html)
+        try:
+            self._connection().send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            # Сервер закрыл простаивавшее соединение - одна попытка через новое
+            self.close()
+            self._connection().send_message(message)
 
-def send_email(email_to: str, subject_template="", html_template="", environment=None):
-    if environment is None:
-        environment = {}
-    message = emails.Message(
-        subject=JinjaTemplate(subject_template),
-        html=JinjaTemplate(html_template),
-        mail_from=(settings.EMAILS_FROM_NAME, settings.EMAILS_FROM_EMAIL),
-    )
-    smtp_options = {"host": settings.SMTP_HOST, "port": settings.SMTP_PORT}
-    if settings.SMTP_TLS:
-        smtp_options['tls'] = True
-    if settings.SMTP_USER:
-        smtp_options["user"] = settings.SMTP_USER
-    if settings.SMTP_PASSWORD:
-        smtp_options["password"] = settings.SMTP_PASSWORD
-
-    response = message.send(to=email_to, render=environment, smtp=smtp_options)
-    logging.info(f"send email result: {response}")
+    def close(self) -> None:
+        if self._smtp is None:
+            return
+        smtp, self._smtp = self._smtp, None
+        try:
+            smtp.quit()
+        except OSError:
+            smtp.close()
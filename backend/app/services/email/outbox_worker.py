@@ -0,0 +1,171 @@
+import asyncio
+import logging
+import smtplib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Optional, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.app.models.email_outbox import EmailOutbox, EmailStatus
+from backend.app.repositories.email_outbox_repository import EmailOutboxRepository
+from backend.app.services.email.email import SmtpClient
+from backend.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+MAX_RETRY_DELAY = 3600
+
+# Ошибки соединения и рукопожатия SMTP: письмо тут ни при чем
+SMTP_CONNECTION_ERRORS = (smtplib.SMTPConnectError, smtplib.SMTPServerDisconnected, smtplib.SMTPHeloError,
+                          smtplib.SMTPAuthenticationError, smtplib.SMTPNotSupportedError)
+
+
+class EmailOutboxWorker:
+    """
+    Доставляет письма из email_outbox.
+
+    Пачка писем блокируется в БД (FOR UPDATE SKIP LOCKED) и отправляется через одно SMTP-соединение
+    в отдельном потоке, event loop SMTP не ждет. Временная ошибка откладывает письмо с экспоненциальной
+    задержкой, после max_attempts или постоянного отказа сервера (5xx) письмо помечается failed.
+    Если недоступен сам сервер, попытки писем не тратятся: пачка прерывается, а воркер ждет
+    с экспоненциальной задержкой до следующей попытки соединиться.
+    """
+
+    def __init__(self, repository: EmailOutboxRepository, smtp: SmtpClient,
+                 session_maker: async_sessionmaker[AsyncSession],
+                 poll_interval: float = settings.EMAIL_OUTBOX_POLL_INTERVAL,
+                 batch_size: int = settings.EMAIL_OUTBOX_BATCH_SIZE,
+                 max_attempts: int = settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+                 retry_delay: float = settings.EMAIL_OUTBOX_RETRY_DELAY):
+        self.repository = repository
+        self.smtp = smtp
+        self.session_maker = session_maker
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="smtp")
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.connection_failures = 0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._stopping.clear()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._stopping.set()
+            await self._task
+            self._task = None
+        await self._in_thread(self.smtp.close)
+        self._executor.shutdown(wait=False)
+
+    async def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                processed = await self.process_batch()
+            except Exception as e:
+                logger.error(f"Ошибка обработки очереди писем: {e}")
+                processed = 0
+            if processed == self.batch_size:
+                continue
+            if processed == 0:
+                # Очередь пуста - соединение не держится открытым до следующего письма
+                await self._in_thread(self.smtp.close)
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self._next_poll_delay())
+            except asyncio.TimeoutError:
+                pass
+
+    def _next_poll_delay(self) -> float:
+        if not self.connection_failures:
+            return self.poll_interval
+        return min(self.retry_delay * 2 ** (self.connection_failures - 1), MAX_RETRY_DELAY)
+
+    async def process_batch(self) -> int:
+        """Отправляет одну пачку готовых писем, возвращает число писем, которые удалось попробовать отправить."""
+        attempted = 0
+        async with self.session_maker() as db:
+            messages = await self.repository.claim_batch(db, self.batch_size)
+            for message in messages:
+                try:
+                    await self._in_thread(self.smtp.send, message.email_to, message.subject, message.html)
+                except (smtplib.SMTPRecipientsRefused, smtplib.SMTPDataError) as e:
+                    # Сервер отклонил конкретное письмо, соединение живо
+                    message.attempts += 1
+                    if self._permanent(e):
+                        self._fail(message, e)
+                    else:
+                        self._retry(message, e)
+                except Exception as e:
+                    if self._connection_error(e):
+                        await self._in_thread(self.smtp.close)
+                        self.connection_failures += 1
+                        logger.warning(f"SMTP-сервер недоступен, следующая попытка через "
+                                       f"{self._next_poll_delay()} с: {e!r}")
+                        break
+                    message.attempts += 1
+                    self._retry(message, e)
+                else:
+                    message.attempts += 1
+                    self.connection_failures = 0
+                    self._sent(message)
+                attempted += 1
+            await db.commit()
+        return attempted
+
+    @staticmethod
+    def _connection_error(error: Exception) -> bool:
+        # SMTPException - подкласс OSError, но отказ по конкретному письму соединение не ломает
+        if isinstance(error, smtplib.SMTPException):
+            return isinstance(error, SMTP_CONNECTION_ERRORS)
+        return isinstance(error, OSError)
+
+    @staticmethod
+    def _permanent(error: smtplib.SMTPException) -> bool:
+        if isinstance(error, smtplib.SMTPRecipientsRefused):
+            return all(code >= 500 for code, _ in error.recipients.values())
+        return error.smtp_code >= 500
+
+    def _sent(self, message: EmailOutbox) -> None:
+        message.status = EmailStatus.SENT
+        message.sent_at = datetime.utcnow()
+        message.html = None
+        self.sent += 1
+
+    def _retry(self, message: EmailOutbox, error: Exception) -> None:
+        message.last_error = repr(error)
+        if message.attempts >= self.max_attempts:
+            self._fail(message, error)
+            return
+        delay = min(self.retry_delay * 2 ** (message.attempts - 1), MAX_RETRY_DELAY)
+        message.next_attempt_at = datetime.utcnow() + timedelta(seconds=delay)
+        self.retried += 1
+        logger.warning(f"Письмо {message.id} отложено на {delay} с: {error!r}")
+
+    def _fail(self, message: EmailOutbox, error: Exception) -> None:
+        message.status = EmailStatus.FAILED
+        message.last_error = repr(error)
+        message.html = None
+        self.failed += 1
+        logger.error(f"Письмо {message.id} для {message.email_to} не доставлено: {error!r}")
+
+    async def _in_thread(self, func: Callable[..., T], *args) -> T:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def stats(self, db: AsyncSession) -> dict:
+        return {
+            **await self.repository.stats(db),
+            "sent_total": self.sent,
+            "retried_total": self.retried,
+            "failed_total": self.failed,
+            "connection_failures": self.connection_failures,
+        }
@@ -0,0 +1,43 @@
+import logging
+from typing import Dict
+
+from jinja2 import Environment, FileSystemLoader, Template
+
+logger = logging.getLogger(__name__)
+
+
+class EmailTemplateRegistry:
+    """
+    Шаблоны писем из EMAIL_TEMPLATE_DIR, загруженные и скомпилированные один раз.
+
+    Отправка письма только рендерит готовый шаблон: без чтения файла и компиляции.
+    С auto_reload (локальная разработка) Jinja сверяет mtime файла при каждом обращении
+    и перекомпилирует измененный шаблон.
+    """
+
+    def __init__(self, directory: str, auto_reload: bool = False):
+        self.auto_reload = auto_reload
+        self.environment = Environment(loader=FileSystemLoader(directory), auto_reload=auto_reload, cache_size=-1)
+        self._templates: Dict[str, Template] = {}
+        self._loaded = False
+
+    def load(self) -> None:
+        self._templates = {
+            name: self.environment.get_template(name)
+            for name in self.environment.list_templates(extensions=["html"])
+        }
+        self._loaded = True
+        logger.info(f"Загружено шаблонов писем: {len(self._templates)}")
+
+    def get(self, name: str) -> Template:
+        if not self._loaded:
+            self.load()
+        if self.auto_reload:
+            return self.environment.get_template(name)
+        try:
+            return self._templates[name]
+        except KeyError:
+            raise LookupError(f"Шаблон письма {name} не найден") from None
+
+    def render(self, name: str, **context) -> str:
+        return self.get(name).render(**context)
@@ -1,42 +1,149 @@
-
+import asyncio
 import logging
-import cloudinary.uploader
+import os
+import tempfile
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Optional, Set
+
 from fastapi import UploadFile, HTTPException
+from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlmodel.ext.asyncio.session import AsyncSession
 from backend.app.interface.base.i_base_repo import ModelType
 from backend.app.interface.utils.i_image_handler import ImageHandler
+from backend.app.interface.utils.i_image_storage import ImageStorage
 
 logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+
+# Сигнатуры поддерживаемых форматов: content_type от клиента не проверяет содержимое
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"\x89PNG\r\n\x1a\n", ".png"),
+    (b"GIF87a", ".gif"),
+    (b"GIF89a", ".gif"),
+)
+
+OnUploaded = Optional[Callable[[], Awaitable[None]]]
+
+
+def detect_extension(header: bytes) -> Optional[str]:
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return ".webp"
+    for signature, extension in IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return extension
+    return None
+
+
 class CloudinaryImageHandler(ImageHandler):
-    def __init__(self, model: type[ModelType]):
+    """
+    Загрузка изображений без блокировки event loop.
+
+    Запрос только копирует файл во временный spool и проверяет его в пуле потоков, после чего сразу
+    отвечает статусом pending. Загрузка в хранилище, запись image_url и удаление старого изображения
+    выполняются фоновой задачей в собственной сессии. Хранилище подключаемое: Cloudinary в работе,
+    LocalImageStorage в разработке и тестах.
+    """
+
+    def __init__(self, model: type[ModelType], storage: ImageStorage, session_maker: async_sessionmaker,
+                 executor: ThreadPoolExecutor, max_size: int):
         self.model = model
+        self.storage = storage
+        self.session_maker = session_maker
+        self.executor = executor
+        self.max_size = max_size
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def _in_thread(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
 
-    async def upload_image(self, db: AsyncSession, instance: ModelType, file: UploadFile) -> dict|None:
+    async def _spool(self, file: UploadFile) -> str:
+        fd, path = tempfile.mkstemp(prefix="upload-")
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as spool:
+                while chunk := await file.read(CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > self.max_size:
+                        raise HTTPException(413, f"Файл больше {self.max_size // CHUNK_SIZE} МБ")
+                    await self._in_thread(spool.write, chunk)
+        except BaseException:
+            os.remove(path)
+            raise
+        finally:
+            await file.close()
+        return path
 
-        if not file.content_type.startswith("image/"):
+    @staticmethod
+    def _validate(path: str) -> str:
+        """Проверяет сигнатуру файла и добавляет к spool расширение формата."""
+        with open(path, "rb") as spool:
+            extension = detect_extension(spool.read(16))
+        if extension is None:
+            os.remove(path)
             raise HTTPException(400, "File must be an image")
+        os.replace(path, path + extension)
+        return path + extension
+
+    def _schedule(self, coroutine) -> asyncio.Task:
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def upload_image(self, db: AsyncSession, instance: ModelType, file: UploadFile,
+                           on_uploaded: OnUploaded = None) -> dict:
+
+        if not file.content_type or not file.content_type.startswith("image/"):
+            raise HTTPException(400, "File must be an image")
+
+        path = await self._in_thread(self._validate, await self._spool(file))
+        folder = f"{self.model.__tablename__.lower()}/id-{instance.id}"
+        task_id = uuid.uuid4().hex
+        self._schedule(self._process(task_id, instance.id, path, folder, on_uploaded))
+        logger.info(f"Изображение {task_id} для {folder} поставлено в очередь")
+        return {"status": "pending", "task_id": task_id}
+
+    async def _process(self, task_id: str, instance_id: int, path: str, folder: str, on_uploaded: OnUploaded):
         try:
-            folder = f"{self.model.__tablename__.lower()}/id-{instance.id}"
-            result = cloudinary.uploader.upload(file.file, folder=folder, use_filename=True)
-            instance.image_url = result["secure_url"]
-            await db.flush()
-            await db.refresh(instance)
-            return {"url": result["secure_url"], "public_id": result["public_id"]}
+            result = await self._in_thread(self.storage.upload, path, folder)
+            async with self.session_maker() as session:
+                instance = await session.get(self.model, instance_id)
+                if instance is None:
+                    # Объект удалили, пока шла загрузка
+                    await self._in_thread(self.storage.destroy, result["url"])
+                    return
+                old_url, instance.image_url = instance.image_url, result["url"]
+                await session.commit()
+
+            if old_url:
+                await self._destroy(old_url)
+            if on_uploaded:
+                await on_uploaded()
+            logger.info(f"Изображение {task_id} загружено: {result['url']}")
         except Exception as e:
-            await db.rollback()
-            logger.error(f"Image upload failed: {str(e)}")
-            raise HTTPException(500, "Image upload failed")
+            logger.error(f"Image upload {task_id} failed: {str(e)}")
         finally:
-            await file.close()
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    async def _destroy(self, url: str) -> None:
+        try:
+            await self._in_thread(self.storage.destroy, url)
+        except Exception as e:
+            logger.error(f"Ошибка удаления фото {url}: {str(e)}")
 
     async def delete_old_image(self, db: AsyncSession, instance: ModelType) -> None:
 
         if instance.image_url:
-            try:
-                result = cloudinary.uploader.destroy(instance.image_url.split('/')[-1])
-                if result.get('result') == 'ok':
-                    instance.image_url = None
-                    await db.flush()
-            except Exception as e:
-                logger.error(f"Ошибка удаления фото: {str(e)}")
-                raise HTTPException(status_code=500, detail=f"Ошибка удаления старого фото: {str(e)}")
\ No newline at end of file
+            self._schedule(self._destroy(instance.image_url))
+            instance.image_url = None
+            await db.flush()
+
+    async def drain(self) -> None:
+        """Дожидается фоновых загрузок (остановка приложения, тесты)."""
+        await asyncio.gather(*self._tasks, return_exceptions=True)
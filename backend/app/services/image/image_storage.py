@@ -0,0 +1,67 @@
+import logging
+import os
+import shutil
+import uuid
+from urllib.parse import urlparse
+
+import cloudinary.uploader
+
+from backend.app.interface.utils.i_image_storage import ImageStorage
+
+logger = logging.getLogger(__name__)
+
+
+class CloudinaryStorage(ImageStorage):
+    """Хранилище в Cloudinary. Уменьшение до max_dimension выполняет сам Cloudinary при загрузке."""
+
+    def __init__(self, max_dimension: int):
+        self.max_dimension = max_dimension
+
+    @staticmethod
+    def public_id(url: str) -> str:
+        """public_id из secure_url: путь после /upload/ без версии и расширения."""
+        path = urlparse(url).path.split("/upload/", 1)[-1]
+        parts = path.split("/")
+        if parts[0].startswith("v") and parts[0][1:].isdigit():
+            parts = parts[1:]
+        return os.path.splitext("/".join(parts))[0]
+
+    def upload(self, path: str, folder: str) -> dict:
+        result = cloudinary.uploader.upload(
+            path,
+            folder=folder,
+            transformation=[{"width": self.max_dimension, "height": self.max_dimension, "crop": "limit"}],
+        )
+        return {"url": result["secure_url"], "public_id": result["public_id"]}
+
+    def destroy(self, url: str) -> None:
+        result = cloudinary.uploader.destroy(self.public_id(url))
+        if result.get("result") != "ok":
+            logger.warning(f"Cloudinary не удалил {url}: {result}")
+
+
+class LocalImageStorage(ImageStorage):
+    """
+    Локальная замена Cloudinary для разработки и тестов без сети.
+    Файлы кладутся в directory и отдаются по url_prefix (по умолчанию - через смонтированный /static).
+    """
+
+    def __init__(self, directory: str, url_prefix: str = "/"):
+        self.directory = directory
+        self.url_prefix = url_prefix.rstrip("/")
+
+    def upload(self, path: str, folder: str) -> dict:
+        public_id = f"{folder}/{uuid.uuid4().hex}{os.path.splitext(path)[1]}"
+        target = os.path.join(self.directory, public_id)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copyfile(path, target)
+        return {"url": f"{self.url_prefix}/{self.directory.strip('/')}/{public_id}", "public_id": public_id}
+
+    def destroy(self, url: str) -> None:
+        prefix = f"{self.url_prefix}/{self.directory.strip('/')}/"
+        if not url.startswith(prefix):
+            return
+        try:
+            os.remove(os.path.join(self.directory, url[len(prefix):]))
+        except FileNotFoundError:
+            pass
@@ -1,15 +1,71 @@
-import json
-from typing import Optional
+from typing import Iterable, Optional, Sequence
 
 import redis.asyncio as redis
 import sentry_sdk
 
-from backend.app.services.serialize import serialize_datetime, deserialize_datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.services.cache_codec import items_codec
+from backend.core.db import after_commit
 import logging
 
 # Настройка логирования
 logger = logging.getLogger(__name__)
 
+# Запись хеша, только если поколение не менялось с момента чтения данных для него: иначе между чтением
+# и записью данные изменились, и хеш был бы построен по устаревшему снимку
+HSET_IF_GENERATION_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+redis.call('HSET', KEYS[1], unpack(ARGV, 3))
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+# Сдвиг поколения и удаление построенных по нему ключей
+BUMP_GENERATION_SCRIPT = """
+redis.call('INCR', KEYS[1])
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+if #KEYS > 1 then
+    redis.call('DEL', unpack(KEYS, 2))
+end
+return 1
+"""
+
+# Удаление всех ключей тега, самого тега и ключа с именем префикса. Выполняется атомарно, чтобы ключ,
+# добавленный во время инвалидации, не остался без тега
+DELETE_TAG_SCRIPT = """
+local keys = redis.call('SMEMBERS', KEYS[1])
+for i = 1, #keys, 5000 do
+    redis.call('DEL', unpack(keys, i, math.min(i + 4999, #keys)))
+end
+redis.call('DEL', KEYS[1], KEYS[2])
+return #keys
+"""
+
+# Регистрация ключа в теге. Тег живет не меньше самого долгоживущего ключа, поэтому сам он не истекает,
+# пока в него пишут; истекшие ключи вычищаются выборкой случайных членов на каждой записи, и размер тега
+# остается порядка числа живых ключей
+REGISTER_TAG_SCRIPT = """
+redis.call('SADD', KEYS[1], ARGV[1])
+if redis.call('TTL', KEYS[1]) < tonumber(ARGV[2]) then
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+local pruned = 0
+for _, member in ipairs(redis.call('SRANDMEMBER', KEYS[1], ARGV[3])) do
+    if redis.call('EXISTS', member) == 0 then
+        pruned = pruned + redis.call('SREM', KEYS[1], member)
+    end
+end
+return pruned
+"""
+
+TAG_PREFIX = "tag:"
+# Сколько случайных членов тега проверяется на каждой регистрации
+TAG_PRUNE_SAMPLE = 20
+
 
 class RedisClient:
     def __init__(self, redis_url: str):
@@ -28,56 +84,188 @@ class RedisClient:
             await self.connect()
         return self.redis
 
-    async def cache_data(self, cache_key: str, data: dict, expire_time: int = 600) -> None:
+    @staticmethod
+    def _register_tags(pipe, cache_key: str, expire_time: int, tags: Iterable[str]) -> None:
+        """Добавляет ключ в теги, по которым его сбрасывает delete_cache_by_prefix."""
+        for tag in tags:
+            pipe.eval(REGISTER_TAG_SCRIPT, 1, TAG_PREFIX + tag, cache_key, expire_time, TAG_PRUNE_SAMPLE)
+
+    async def cache_data(self, cache_key: str, items: Sequence, schema, expire_time: int = 600,
+                         tags: Iterable[str] = ()) -> None:
         """
-        Кеширует данные в Redis.
+        Кеширует список моделей в Redis и регистрирует ключ в тегах.
         :param cache_key: Ключ для кеширования.
-        :param data: Данные для кеширования.
+        :param items: Модели схемы schema.
+        :param schema: Схема элементов, по которой они сериализуются.
         :param expire_time: Время жизни кеша в секундах.
+        :param tags: Префиксы, при сбросе которых ключ тоже удаляется.
         """
         try:
             client_redis = await self.get_client()
-            await client_redis.setex(cache_key, expire_time, json.dumps(data, default=serialize_datetime))
+            async with client_redis.pipeline(transaction=False) as pipe:
+                pipe.setex(cache_key, expire_time, items_codec(schema).encode(list(items)))
+                self._register_tags(pipe, cache_key, expire_time, tags)
+                await pipe.execute()
         except Exception as e:
             logger.error(f"Error caching data: {e}")
 
-    async def fetch_cached_data(self, cache_key: str, schema) -> Optional[dict]:
+    async def fetch_cached_data(self, cache_key: str, schema) -> Optional[list]:
         """
-        Получает данные из кеша.
+        Получает список моделей из кеша.
         :param cache_key: Ключ для получения данных.
-        :param schema: Схема для десериализации данных.
-        :return: Десериализованные данные или None, если данных нет в кеше.
+        :param schema: Схема элементов для десериализации.
+        :return: Список моделей (возможно пустой) или None, если данных нет в кеше.
         """
         try:
             client_redis = await self.get_client()
             cached_data = await client_redis.get(cache_key)
-            if cached_data:
-                cached_data = json.loads(cached_data)
-                cached_data = deserialize_datetime(cached_data)
-                cached_data["items"] = [schema(**item) for item in cached_data["items"]]
-                return cached_data
-            return None
+            if cached_data is None:
+                return None
+            return items_codec(schema).decode(cached_data)
         except Exception as e:
             logger.error(f"Ошибка получения данных из кеша : {e}")
             return None
 
+    async def fetch_hash(self, cache_key: str) -> Optional[dict]:
+        """
+        Получает все поля хеша.
+        :param cache_key: Ключ хеша.
+        :return: Словарь полей или None, если хеша нет в кеше.
+        """
+        try:
+            client_redis = await self.get_client()
+            return await client_redis.hgetall(cache_key) or None
+        except Exception as e:
+            logger.error(f"Ошибка получения хеша {cache_key} из кеша: {e}")
+            return None
+
+    async def cache_hash(self, cache_key: str, mapping: dict, expire_time: int = 600) -> None:
+        """
+        Кеширует хеш целиком, заменяя предыдущее содержимое.
+        :param cache_key: Ключ хеша.
+        :param mapping: Поля хеша.
+        :param expire_time: Время жизни кеша в секундах.
+        """
+        try:
+            client_redis = await self.get_client()
+            async with client_redis.pipeline(transaction=True) as pipe:
+                pipe.delete(cache_key)
+                pipe.hset(cache_key, mapping=mapping)
+                pipe.expire(cache_key, expire_time)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Ошибка кеширования хеша {cache_key}: {e}")
+
+    async def cache_entry(self, cache_key: str, mapping: dict, expire_time: int = 600,
+                          tags: Iterable[str] = ()) -> None:
+        """
+        Кеширует хеш целиком и регистрирует ключ в тегах, чтобы его сбрасывал delete_cache_by_prefix.
+        :param cache_key: Ключ хеша.
+        :param mapping: Поля хеша.
+        :param expire_time: Время жизни кеша в секундах.
+        :param tags: Префиксы, при сбросе которых ключ тоже удаляется.
+        """
+        try:
+            client_redis = await self.get_client()
+            async with client_redis.pipeline(transaction=True) as pipe:
+                pipe.delete(cache_key)
+                pipe.hset(cache_key, mapping=mapping)
+                pipe.expire(cache_key, expire_time)
+                self._register_tags(pipe, cache_key, expire_time, tags)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Ошибка кеширования записи {cache_key}: {e}")
+
+    async def get_generation(self, generation_key: str) -> Optional[int]:
+        """
+        Получает текущее поколение данных. Читается до запроса к БД и передается в cache_hash_if_generation.
+        :param generation_key: Ключ поколения.
+        :return: Номер поколения (0, если ключа нет) или None, если Redis недоступен.
+        """
+        try:
+            client_redis = await self.get_client()
+            return int(await client_redis.get(generation_key) or 0)
+        except Exception as e:
+            logger.error(f"Ошибка получения поколения {generation_key}: {e}")
+            return None
+
+    async def cache_hash_if_generation(self, cache_key: str, mapping: dict, expire_time: int,
+                                       generation_key: str, generation: int) -> bool:
+        """
+        Кеширует хеш целиком, только если поколение не сдвинулось с момента get_generation.
+        :param cache_key: Ключ хеша.
+        :param mapping: Поля хеша.
+        :param expire_time: Время жизни кеша в секундах.
+        :param generation_key: Ключ поколения.
+        :param generation: Поколение, прочитанное до построения хеша.
+        :return: True, если хеш записан.
+        """
+        args = [item for field, value in mapping.items() for item in (field, value)]
+        try:
+            client_redis = await self.get_client()
+            return bool(await client_redis.eval(HSET_IF_GENERATION_SCRIPT, 2, cache_key, generation_key,
+                                                generation, expire_time, *args))
+        except Exception as e:
+            logger.error(f"Ошибка кеширования хеша {cache_key}: {e}")
+            return False
+
+    async def bump_generation(self, generation_key: str, *cache_keys: str, expire_time: int = 600) -> None:
+        """
+        Сдвигает поколение и удаляет ключи, построенные по прежнему. Построения, начатые до сдвига,
+        уже не запишутся, поэтому следующее чтение соберет ключи заново по свежим данным.
+        :param generation_key: Ключ поколения.
+        :param cache_keys: Ключи для удаления.
+        :param expire_time: Время жизни ключа поколения; не меньше времени жизни самих ключей.
+        """
+        try:
+            client_redis = await self.get_client()
+            await client_redis.eval(BUMP_GENERATION_SCRIPT, 1 + len(cache_keys), generation_key, *cache_keys,
+                                    expire_time)
+        except Exception as e:
+            logger.error(f"Ошибка сдвига поколения {generation_key}: {e}")
+
+    async def delete_cache(self, *cache_keys: str) -> None:
+        """
+        Удаляет конкретные ключи из кеша.
+        :param cache_keys: Ключи для удаления.
+        """
+        try:
+            client_redis = await self.get_client()
+            await client_redis.delete(*cache_keys)
+        except Exception as e:
+            logger.error(f"Ошибка удаления ключей {cache_keys} из кеша: {e}")
+
     async def delete_cache_by_prefix(self, prefix: str) -> None:
         """
-        Удаляет все ключи из кеша с префикса.
-        :param prefix: Префикс для поиска ключей.
+        Удаляет ключ с именем префикса ("stadiums:vendor:1" или "stadiums:vendor:1:") и ключи,
+        зарегистрированные в теге этого префикса при кешировании. Стоимость пропорциональна числу ключей тега,
+        а не размеру всего keyspace; ключи, закешированные без тега, по префиксу не удаляются.
+        :param prefix: Префикс ключей.
         """
         try:
             client_redis = await self.get_client()
-            cursor = "0"
-            while cursor != 0:
-                # Используем SCAN для поиска ключей по префиксу
-                cursor, keys = await client_redis.scan(cursor=cursor, match=f"{prefix}*")
-                if keys:
-                    # Удаляем найденные ключи
-                    await client_redis.delete(*keys)
+            prefix = prefix.rstrip(":")
+            await client_redis.eval(DELETE_TAG_SCRIPT, 2, TAG_PREFIX + prefix, prefix)
         except Exception as e:
             logger.error(f"ошибка удаления кеша по префиксу {prefix}: {e}")
 
+    async def publish(self, channel: str, message: str) -> None:
+        """
+        Публикует сообщение в канал Redis pub/sub.
+        :param channel: Канал.
+        :param message: Сообщение.
+        """
+        try:
+            client_redis = await self.get_client()
+            await client_redis.publish(channel, message)
+        except Exception as e:
+            logger.error(f"Ошибка публикации в канал {channel}: {e}")
+
+    async def pubsub(self):
+        """Отдельное pub/sub-соединение с Redis."""
+        client_redis = await self.get_client()
+        return client_redis.pubsub()
+
     async def invalidate_cache(self, cache_key: str, message: str) -> bool:
         """
         Инвалидирует кеш и логирует операцию.
@@ -96,6 +284,33 @@ class RedisClient:
             sentry_sdk.capture_exception(e)
             return False
 
+    async def set_flag(self, key: str, ttl: float) -> None:
+        """Ставит флаг, который сам исчезнет через ttl секунд."""
+        try:
+            client_redis = await self.get_client()
+            await client_redis.set(key, 1, px=max(int(ttl * 1000), 1))
+        except Exception as e:
+            logger.error(f"Ошибка установки флага {key}: {e}")
+
+    async def has_flag(self, key: str) -> bool:
+        try:
+            client_redis = await self.get_client()
+            return bool(await client_redis.exists(key))
+        except Exception as e:
+            logger.error(f"Ошибка чтения флага {key}: {e}")
+            return False
+
+    async def invalidate_on_commit(self, db: AsyncSession, cache_key: str, message: str) -> None:
+        """
+        Инвалидирует кеш изменения, сделанного в транзакции db: сразу и повторно после коммита.
+        Промах между сбросом и коммитом прочитал бы из БД старые данные и вернул бы их в кеш.
+
+        :param db: Сессия с транзакцией изменения.
+        :param cache_key: Ключ кеша для инвалидации.
+        :param message: Сообщение для логирования.
+        """
+        await self.invalidate_cache(cache_key, message)
+        after_commit(db, lambda: self.invalidate_cache(cache_key, f"{message} (после коммита)"))
 
 
 
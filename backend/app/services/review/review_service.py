@@ -1,4 +1,5 @@
 import logging
+from typing import Optional
 
 from fastapi import HTTPException
 from sqlmodel.ext.asyncio.session import AsyncSession
@@ -7,10 +8,11 @@ from backend.app.interface.repositories.i_review_repo import IReviewRepository
 from backend.app.interface.repositories.i_stadium_repo import IStadiumRepository
 from backend.app.models import User
 from backend.app.models.auth import Msg
-from backend.app.models.stadium_reviews import CreateReview, UpdateReview
+from backend.app.models.stadium_reviews import CreateReview, UpdateReview, PaginatedReviewsResponse
 from backend.app.services.utils_service.permission import PermissionService
 from backend.app.services.decorators import HttpExceptionWrapper
 from backend.app.services.redis import RedisClient
+from backend.app.services.stadium.stadium_service import stadium_detail_cache_key
 
 
 logger = logging.getLogger(__name__)
@@ -28,7 +30,9 @@ class ReviewService:
         if await self.review_repository.check_duplicate_review(db=db, user_id=user.id, stadium_id=stadium_id):
             raise HTTPException(status_code=400, detail="Вы уже оставили отзыв для этого стадиона")
         review = await self.review_repository.create(db=db, schema=schema, stadium_id=stadium.id, user_id=user.id)
+        await self.stadium_repository.change_review_count(db, stadium.id, 1)
         logger.info(f"отзыв {review.id} успешно создан пользователем {user.id}")
+        await self.redis.invalidate_on_commit(db, stadium_detail_cache_key(stadium.id), f"Новый отзыв {review.id}")
         return review
 
     @HttpExceptionWrapper
@@ -37,12 +41,24 @@ class ReviewService:
         self.permission.check_owner_or_admin(current_user=user, model=review)
         review = await self.review_repository.update(db=db, model=review, schema=schema)
         logger.info(f"отзыв {review_id} успешно обновлен пользователем {user.id}")
+        await self.redis.invalidate_on_commit(db, stadium_detail_cache_key(review.stadium_id), f"Обновление отзыва {review_id}")
         return review
 
     @HttpExceptionWrapper
     async def delete_review(self, db: AsyncSession, user: User, review_id: int):
         review = await self.review_repository.get_or_404(db=db, object_id=review_id)
         self.permission.check_owner_or_admin(current_user=user, model=review)
+        stadium_id = review.stadium_id
         await self.review_repository.remove(db=db, id=review.id)
+        await self.stadium_repository.change_review_count(db, stadium_id, -1)
         logger.info(f"отзыв {review_id} успешно удален пользователем {user.id}")
+        await self.redis.invalidate_on_commit(db, stadium_detail_cache_key(stadium_id), f"Удаление отзыва {review_id}")
         return Msg(msg="отзыв успешно удален")
+
+    @HttpExceptionWrapper
+    async def get_stadium_reviews(self, db: AsyncSession, stadium_id: int, size: int,
+                                  cursor: Optional[str] = None) -> PaginatedReviewsResponse:
+        """Отзывы стадиона, новые первыми; следующая страница запрашивается по next_cursor."""
+        await self.stadium_repository.get_or_404(db=db, object_id=stadium_id)
+        paginated_data = await self.review_repository.paginate_stadium_reviews(db, stadium_id, size, cursor)
+        return PaginatedReviewsResponse(items=paginated_data["items"], next_cursor=paginated_data["next_cursor"])
@@ -0,0 +1,115 @@
+import logging
+from datetime import datetime, date, time, timedelta
+from typing import Dict, Iterator, List
+
+from fastapi import HTTPException
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.app.interface.repositories.i_booking_repo import IBookingRepository
+from backend.app.interface.repositories.i_stadium_repo import IStadiumRepository
+from backend.app.models import Stadium
+from backend.app.services.decorators import HttpExceptionWrapper
+from backend.app.services.redis import RedisClient
+
+logger = logging.getLogger(__name__)
+
+SLOT = timedelta(minutes=30)
+MAX_SEARCH_DAYS = 31
+
+# Служебное поле: хеш без броней тоже должен существовать в Redis
+BUILT_FIELD = "_built"
+
+
+class StadiumAvailabilityService:
+    """
+    Индекс занятости стадионов для поиска свободных полей.
+
+    Для каждого города и дня в Redis хранится хеш {stadium_id: маска}, где бит i - занятый i-й получасовой
+    слот дня. Поиск сводится к AND маски запроса с масками стадионов, а создание и отмена брони
+    пересчитывают маску одного стадиона.
+    """
+
+    def __init__(self, stadium_repository: IStadiumRepository, booking_repository: IBookingRepository,
+                 redis: RedisClient, expire_time: int = 3600):
+        self.stadium_repository = stadium_repository
+        self.booking_repository = booking_repository
+        self.redis = redis
+        self.expire_time = expire_time
+
+    @staticmethod
+    def _cache_key(city: str, day: date) -> str:
+        return f"availability:{city}:{day.isoformat()}"
+
+    @classmethod
+    def _generation_key(cls, city: str, day: date) -> str:
+        return f"{cls._cache_key(city, day)}:generation"
+
+    @staticmethod
+    def _days(start_time: datetime, end_time: datetime) -> Iterator[date]:
+        day = start_time.date()
+        while datetime.combine(day, time.min) < end_time:
+            yield day
+            day += timedelta(days=1)
+
+    @staticmethod
+    def slot_mask(day: date, start_time: datetime, end_time: datetime) -> int:
+        """Маска слотов дня, которые задевает интервал [start_time, end_time)."""
+        day_start = datetime.combine(day, time.min)
+        start = max(start_time, day_start) - day_start
+        end = min(end_time, day_start + timedelta(days=1)) - day_start
+        if start >= end:
+            return 0
+        first = start // SLOT
+        last = -(-end // SLOT)  # округление вверх
+        return (1 << last) - (1 << first)
+
+    async def _day_index(self, db: AsyncSession, city: str, day: date) -> Dict[int, int]:
+        cache_key = self._cache_key(city, day)
+        cached = await self.redis.fetch_hash(cache_key)
+        if cached is not None:
+            return {int(stadium_id): int(bits) for stadium_id, bits in cached.items() if stadium_id != BUILT_FIELD}
+
+        # Индекса за этот день нет - строим одним запросом по броням города.
+        # Поколение читается до запроса, чтобы бронь, закоммиченная после него, не потерялась
+        generation_key = self._generation_key(city, day)
+        generation = await self.redis.get_generation(generation_key)
+        day_start = datetime.combine(day, time.min)
+        index: Dict[int, int] = {}
+        for stadium_id, start_time, end_time in await self.booking_repository.get_city_bookings(
+                db, city, day_start, day_start + timedelta(days=1)):
+            index[stadium_id] = index.get(stadium_id, 0) | self.slot_mask(day, start_time, end_time)
+
+        if generation is not None:
+            await self.redis.cache_hash_if_generation(cache_key, {BUILT_FIELD: 1, **index}, self.expire_time,
+                                                      generation_key, generation)
+        return index
+
+    @HttpExceptionWrapper
+    async def get_available_stadiums(self, db: AsyncSession, city: str, start_time: datetime,
+                                     end_time: datetime) -> List[Stadium]:
+        if start_time.tzinfo is not None or end_time.tzinfo is not None:
+            # Брони хранятся без часового пояса, сравнение с aware-датой невозможно
+            raise HTTPException(status_code=400, detail="Время поиска нужно передавать без часового пояса.")
+        if start_time >= end_time:
+            raise HTTPException(status_code=400, detail="Время окончания должно быть больше времени начала.")
+        if end_time - start_time > timedelta(days=MAX_SEARCH_DAYS):
+            raise HTTPException(status_code=400, detail=f"Интервал поиска не может превышать {MAX_SEARCH_DAYS} дней")
+
+        busy = set()
+        for day in self._days(start_time, end_time):
+            mask = self.slot_mask(day, start_time, end_time)
+            index = await self._day_index(db, city, day)
+            busy.update(stadium_id for stadium_id, bits in index.items() if bits & mask)
+
+        return list(await self.stadium_repository.get_active_in_city(db, city, exclude_ids=busy))
+
+    async def refresh_stadium(self, stadium: Stadium, start_time: datetime, end_time: datetime):
+        """
+        Сбрасывает индекс города за дни интервала после создания или отмены брони.
+        Вызывается после коммита: следующий поиск соберет индекс заново уже с этой бронью, а построения,
+        начатые раньше, не запишутся из-за сдвига поколения.
+        """
+        for day in self._days(start_time, end_time):
+            await self.redis.bump_generation(self._generation_key(stadium.city, day),
+                                             self._cache_key(stadium.city, day), expire_time=self.expire_time)
+        logger.info(f"Индекс занятости города {stadium.city} сброшен за {start_time} - {end_time}")
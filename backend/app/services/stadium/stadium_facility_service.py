@@ -8,6 +8,7 @@ from backend.app.models.stadiums import StadiumFacilityCreate, StadiumFacility
 from backend.app.services.utils_service.permission import PermissionService
 from backend.app.services.decorators import HttpExceptionWrapper
 from backend.app.services.redis import RedisClient
+from backend.app.services.stadium.stadium_service import stadium_detail_cache_key
 
 logger = logging.getLogger(__name__)
 
@@ -43,7 +44,8 @@ class StadiumFacilityService:
 
         if added == 0:
             raise HTTPException(400, "Нет новых сервисов для добавления")
-        await self.redis.delete_cache_by_prefix("stadiums:")
+        # Списки стадионов услуг не содержат, меняется только деталь стадиона
+        await self.redis.invalidate_on_commit(db, stadium_detail_cache_key(stadium_id), f"Добавление услуг стадиона {stadium_id}")
         return {f"message": f"Добавлено {added} сервисов"}
 
     @HttpExceptionWrapper
@@ -63,8 +65,9 @@ class StadiumFacilityService:
         if deleted_facility_id is None:
             raise HTTPException(status_code=404, detail="Связь сервиса со стадионом не найдена")
 
-        # 3. Инвалидация кеша (перед коммитом для атомарности)
-        await self.redis.delete_cache_by_prefix(f"stadium:{stadium_id}:")
+        # 3. Инвалидация кеша: сразу и повторно после коммита
+        await self.redis.invalidate_on_commit(db, stadium_detail_cache_key(stadium_id),
+                                              f"Удаление услуги {facility_id} стадиона {stadium_id}")
 
         logger.info(
             f"Удален сервис {facility_id} со стадиона {stadium_id} "
@@ -8,6 +8,7 @@ from backend.app.models.stadiums import StadiumStatus
 from backend.app.services.utils_service.permission import PermissionService
 from backend.app.services.decorators import HttpExceptionWrapper
 from backend.app.services.redis import RedisClient
+from backend.app.services.stadium.stadium_service import stadium_detail_cache_key
 
 logger = logging.getLogger(__name__)
 
@@ -34,16 +35,17 @@ class StadiumImageService:
         if stadium.status == StadiumStatus.VERIFICATION:
             raise HTTPException(status_code=400,
                                 detail="вы не можете изменить объект, пока у него статус 'На верификации")
-        was_active = stadium.is_active
-
-        await self.image_handler.delete_old_image(db, stadium)
-        image = await self.image_handler.upload_image(db=db, instance=stadium, file=file)
-        logger.info(f"Изображение загружено для стадиона {stadium_id}")
-
-        if was_active and not stadium.is_active:
-            await self.redis.invalidate_cache("stadiums:all_active",
-                                              f"Загрузка изображения для стадиона {stadium_id}")
-        await self.redis.invalidate_cache(f"stadiums:vendor:{user.id}", f"Обновление стадиона {stadium_id}")
-
+        is_active, owner_id = stadium.is_active, stadium.user_id
+
+        async def invalidate():
+            if is_active:
+                await self.redis.invalidate_cache("stadiums:all_active",
+                                                  f"Загрузка изображения для стадиона {stadium_id}")
+            await self.redis.invalidate_cache(f"stadiums:vendor:{owner_id}", f"Обновление стадиона {stadium_id}")
+            await self.redis.invalidate_cache(stadium_detail_cache_key(stadium_id),
+                                              f"Обновление стадиона {stadium_id}")
+
+        # Старое изображение удаляется после успешной загрузки нового
+        image = await self.image_handler.upload_image(db=db, instance=stadium, file=file, on_uploaded=invalidate)
+        logger.info(f"Изображение поставлено в очередь для стадиона {stadium_id}")
         return image
-
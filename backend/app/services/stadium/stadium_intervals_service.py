@@ -6,6 +6,7 @@ from backend.app.interface.repositories.i_stadium_repo import IStadiumRepository
 from backend.app.models import User
 from backend.app.models.auth import Msg
 from backend.app.models.stadiums import StadiumStatus, PriceIntervalCreate, PriceInterval
+from backend.app.services.booking.price_schedule import PriceScheduleCache
 from backend.app.services.utils_service.permission import PermissionService
 from backend.app.services.decorators import HttpExceptionWrapper
 from backend.app.services.redis import RedisClient
@@ -16,10 +17,12 @@ logger = logging.getLogger(__name__)
 class StadiumIntervalsService:
     """Сервис управления стадионом"""
 
-    def __init__(self, stadium_repository: IStadiumRepository, permission: PermissionService, redis: RedisClient):
+    def __init__(self, stadium_repository: IStadiumRepository, permission: PermissionService, redis: RedisClient,
+                 price_schedules: PriceScheduleCache):
         self.stadium_repository = stadium_repository
         self.permission = permission
         self.redis = redis
+        self.price_schedules = price_schedules
 
     @HttpExceptionWrapper
     async def create_price_intervals(self, db: AsyncSession, schema: List[PriceIntervalCreate], stadium_id: int,
@@ -30,6 +33,7 @@ class StadiumIntervalsService:
             raise HTTPException(status_code=400,
                                 detail="вы не можете изменить объект, пока у него статус 'На верификации'")
         await self.stadium_repository.add_price_intervals(db=db, price_intervals=schema, stadium_id=stadium_id)
+        self.price_schedules.invalidate(stadium_id)
         return update_stadium
 
     @HttpExceptionWrapper
@@ -48,10 +52,11 @@ class StadiumIntervalsService:
 
         if deleted_interval_id is None:
             raise HTTPException(status_code=404, detail="Ценовой интервал не найден")
+        self.price_schedules.invalidate(stadium_id)
 
         if was_active:
-            await self.redis.invalidate_cache("stadiums:all_active",
-                                              f"Удаление ценового интервала {deleted_interval_id} стадиона {stadium_id}")
+            await self.redis.invalidate_on_commit(db, "stadiums:all_active",
+                                                  f"Удаление ценового интервала {deleted_interval_id} стадиона {stadium_id}")
 
         logger.info(f"Ценовой интервал {deleted_interval_id} стадиона {stadium_id} удален пользователем {user.id}")
 
@@ -1,6 +1,7 @@
+import hashlib
 import logging
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 import sentry_sdk
 from fastapi import HTTPException
@@ -11,8 +12,8 @@ from sqlmodel.ext.asyncio.session import AsyncSession
 from backend.app.interface.repositories.i_stadium_repo import IStadiumRepository
 from backend.app.models import User
 from backend.app.models.auth import Msg
-from backend.app.models.base_model_public import AdditionalFacilityReadBase
-from backend.app.models.stadium_reviews import StadiumReview
+from backend.app.interface.repositories.i_review_repo import IReviewRepository
+from backend.app.models.base_model_public import AdditionalFacilityReadBase, ReviewReadBase
 
 from backend.app.models.stadiums import (
     StadiumStatus,
@@ -22,23 +23,37 @@ from backend.app.models.stadiums import (
     Stadium,
     StadiumsReadWithFacility,
     PaginatedStadiumsResponse,
-    StadiumCreateWithInterval
+    StadiumCreateWithInterval,
+    StadiumDetailPayload,
+    StadiumFacility
 )
 
 from backend.app.services.utils_service.permission import PermissionService
-from backend.app.services.decorators import HttpExceptionWrapper
+from backend.app.services.decorators import HttpExceptionWrapper, cached
 from backend.app.services.redis import RedisClient
+from backend.app.services.stadium.stadium_availability_service import StadiumAvailabilityService
 
 logger = logging.getLogger(__name__)
 
+# Сколько последних отзывов встраивается в деталь стадиона
+DETAIL_REVIEWS_LIMIT = 10
+
+
+def stadium_detail_cache_key(stadium_id: int) -> str:
+    """Ключ кеша детальной страницы стадиона; по нему же кеш сбрасывают сервисы, меняющие стадион."""
+    return f"stadium:{stadium_id}:detail"
+
 
 class StadiumService:
     """Сервис управления стадионом"""
 
-    def __init__(self, stadium_repository: IStadiumRepository, permission: PermissionService, redis: RedisClient):
+    def __init__(self, stadium_repository: IStadiumRepository, review_repository: IReviewRepository,
+                 permission: PermissionService, redis: RedisClient, availability: StadiumAvailabilityService):
         self.stadium_repository = stadium_repository
+        self.review_repository = review_repository
         self.permission = permission
         self.redis = redis
+        self.availability = availability
 
     @HttpExceptionWrapper
     async def create_stadium(self, db: AsyncSession, schema: StadiumCreateWithInterval, user: User):
@@ -86,8 +101,9 @@ class StadiumService:
         logger.info(f"Стадион {stadium_id} обновлен пользователем {user.id}", )
 
         if was_active and not stadium.is_active:
-            await self.redis.invalidate_cache("stadiums:all_active", f"Деактивация стадиона {stadium_id}")
-        await self.redis.invalidate_cache(f"stadiums:vendor:{user.id}", f"Обновление стадиона {stadium_id}")
+            await self.redis.invalidate_on_commit(db, "stadiums:all_active", f"Деактивация стадиона {stadium_id}")
+        await self.redis.invalidate_on_commit(db, f"stadiums:vendor:{user.id}", f"Обновление стадиона {stadium_id}")
+        await self.redis.invalidate_on_commit(db, stadium_detail_cache_key(stadium_id), f"Обновление стадиона {stadium_id}")
 
         return stadium
 
@@ -103,93 +119,77 @@ class StadiumService:
         was_active = stadium.is_active
         await self.stadium_repository.remove(db=db, id=stadium.id)
         if was_active:
-            await self.redis.invalidate_cache("stadiums:all_active", f"Удаление стадиона {stadium_id}")
+            await self.redis.invalidate_on_commit(db, "stadiums:all_active", f"Удаление стадиона {stadium_id}")
+        await self.redis.invalidate_on_commit(db, stadium_detail_cache_key(stadium_id), f"Удаление стадиона {stadium_id}")
         logger.info(f"Стадион {stadium_id} удален пользователем {user.id}")
         return Msg(msg="Стадион удален успешно")
 
+    @staticmethod
+    def _vendor_stadiums_key(user: User, page: int, size: int, cursor: Optional[str], with_total: bool,
+                             **_) -> str:
+        if cursor is not None:
+            return f"stadiums:vendor:{user.id}:cursor{cursor}:size{size}:total{int(with_total)}"
+        return f"stadiums:vendor:{user.id}:page{page}:size{size}"
+
     @HttpExceptionWrapper
-    async def get_stadiums(self, db: AsyncSession, ):
+    @cached(key="stadiums:all_active", ttl=600)
+    async def get_stadiums(self, db: AsyncSession, ) -> List[StadiumsRead]:
         """
         **Описание:**
         Получает список всех активных стадионов из базы данных.
 
         """
-        # Кеш для всех активных стадионов
-        cache_key = "stadiums:all_active"
-
-        # Проверяем, есть ли данные в кеше
-        cached_stadiums = await self.redis.fetch_cached_data(cache_key=cache_key, schema=StadiumsRead)
-        if cached_stadiums:
-            return cached_stadiums["items"]  # Возвращаем данные из кеша
-
-        # Если данных нет в кеше, получаем их из базы данных
         stadiums = await self.stadium_repository.get_many(db=db, is_active=True)
-
-        # Подготавливаем данные для кеширования
-        json_data = {"items": [stadium.model_dump() for stadium in stadiums]}
-        await self.redis.cache_data(cache_key, json_data)  # Кешируем данные
-
-        # Возвращаем данные в формате, ожидаемом в response_model
-        return [StadiumsRead(**stadium.model_dump()) for stadium in stadiums]
+        return [StadiumsRead.model_validate(stadium) for stadium in stadiums]
 
     @HttpExceptionWrapper
-    async def get_vendor_stadiums(self, db: AsyncSession, user: User, page: int,
-                                  size: int) -> PaginatedStadiumsResponse:
-        # Кеш для стадионов вендора с пагинацией
-        cache_key = f"stadiums:vendor:{user.id}:page{page}:size{size}"
-
-        # Пытаемся получить данные из кеша
-        cached_data = await self.redis.fetch_cached_data(cache_key=cache_key, schema=Stadium)
-        if cached_data:
-            return PaginatedStadiumsResponse(**cached_data)
-
-        # Если данных нет в кеше, получаем их из базы данных
+    @cached(key=_vendor_stadiums_key, ttl=600, tags=["stadiums:vendor:{user.id}"])
+    async def get_vendor_stadiums(self, db: AsyncSession, user: User, page: int, size: int,
+                                  cursor: Optional[str] = None, with_total: bool = False) -> PaginatedStadiumsResponse:
         query = select(Stadium).where(Stadium.user_id == user.id)
-        paginated_data = await self.stadium_repository.paginate(query, db, page, size)
+        if cursor is not None:
+            paginated_data = await self.stadium_repository.paginate_cursor(query, db, size, cursor,
+                                                                           with_total=with_total)
+        else:
+            paginated_data = await self.stadium_repository.paginate(query, db, page, size)
 
-        # Подготавливаем данные для кеширования
-        json_data = {
-            "items": [stadium.model_dump() for stadium in paginated_data["items"]],
-            "page": paginated_data["page"],
-            "pages": paginated_data["pages"]
-        }
-        await self.redis.cache_data(cache_key, json_data)
-
-        # Возвращаем данные в формате, ожидаемом в response_model
         return PaginatedStadiumsResponse(**paginated_data)
 
     @HttpExceptionWrapper
-    async def detail_stadium(self, db: AsyncSession, stadium_id: int):
-        # Получаем стадион с загруженными связями
+    async def detail_stadium(self, db: AsyncSession, stadium_id: int) -> StadiumsReadWithFacility:
+        # Услуги загружаются вместе со стадионом, отзывы - только последние по индексу
         stadium = await self.stadium_repository.get_or_404(
             db=db,
             object_id=stadium_id,
-            options=[
-                selectinload(Stadium.stadium_reviews).selectinload(StadiumReview.user_review),
-                selectinload(Stadium.stadium_facility)
-            ]
+            options=[selectinload(Stadium.stadium_facility).selectinload(StadiumFacility.facility)]
         )
+        reviews = await self.review_repository.paginate_stadium_reviews(db, stadium_id, DETAIL_REVIEWS_LIMIT)
 
-        # Формируем список услуг из уже загруженной связи
         facility_response = [
-            AdditionalFacilityReadBase(
-                id=facility.id,
-                name=facility.name,
-                svg_image=facility.svg_image,
-                description=facility.description,
-                price=facility.price
-            )
-            for facility in stadium.stadium_facility  # Используем уже загруженные данные
+            AdditionalFacilityReadBase.model_validate(link.facility)
+            for link in stadium.stadium_facility
         ]
 
-        # Создаем объект StadiumsReadWithServices
-        stadium_with_facility = StadiumsReadWithFacility.model_validate(stadium).model_copy(
-            update={"stadium_facility": facility_response})
+        return StadiumsReadWithFacility(
+            **StadiumsRead.model_validate(stadium).model_dump(),
+            stadium_reviews=[ReviewReadBase.model_validate(review) for review in reviews["items"]],
+            review_count=stadium.review_count,
+            stadium_facility=facility_response
+        )
 
-        return stadium_with_facility
+    @HttpExceptionWrapper
+    @cached(key=lambda stadium_id, **_: stadium_detail_cache_key(stadium_id), ttl=600)
+    async def detail_stadium_payload(self, db: AsyncSession, stadium_id: int) -> StadiumDetailPayload:
+        """Деталь стадиона, сериализованная один раз при загрузке в кеш, и ETag этого тела."""
+        stadium_with_facility = await self.detail_stadium(db, stadium_id)
+        body = stadium_with_facility.model_dump_json()
+        etag = '"' + hashlib.blake2b(body.encode(), digest_size=16).hexdigest() + '"'
+        return StadiumDetailPayload(etag=etag, body=body)
 
     @HttpExceptionWrapper
     async def get_available_stadiums(self, db: AsyncSession, city: str, start_time: datetime, end_time: datetime) -> \
             List[StadiumsRead]:
-        pass
-        # return  await  self.stadium_repository.search_available_stadiums(db, city, start_time, end_time)
+        """Активные стадионы города, свободные на всем интервале [start_time, end_time)."""
+        stadiums = await self.availability.get_available_stadiums(db, city=city, start_time=start_time,
+                                                                  end_time=end_time)
+        return [StadiumsRead.model_validate(stadium) for stadium in stadiums]
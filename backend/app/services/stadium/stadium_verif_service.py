@@ -8,6 +8,7 @@ from backend.app.models.stadiums import StadiumVerificationUpdate, StadiumStatus
 from backend.app.services.utils_service.permission import PermissionService
 from backend.app.services.decorators import HttpExceptionWrapper
 from backend.app.services.redis import RedisClient
+from backend.app.services.stadium.stadium_service import stadium_detail_cache_key
 
 logger = logging.getLogger(__name__)
 
@@ -33,7 +34,8 @@ class StadiumVerifService:
 
         await self.stadium_repository.update(db=db, model=stadium, schema=schema.model_dump(exclude_unset=True))
         logger.info(f"Cтадион {stadium_id} отправлен на верификацию пользователем {user.id}")
-        await self.redis.invalidate_cache(f"stadiums:vendor:{user.id}", f"Обновление стадиона {stadium_id}")
+        await self.redis.invalidate_on_commit(db, f"stadiums:vendor:{user.id}", f"Обновление стадиона {stadium_id}")
+        await self.redis.invalidate_on_commit(db, stadium_detail_cache_key(stadium_id), f"Обновление стадиона {stadium_id}")
         return Msg(msg=f"Стадион {stadium.id} успешно отправлен на верификацию ")
 
     @HttpExceptionWrapper
@@ -49,8 +51,9 @@ class StadiumVerifService:
         await self.stadium_repository.update(db=db, model=stadium, schema=schema.model_dump(exclude_unset=True))
         logger.info(f"Верификация стадиона {stadium_id} подтверждена администратором {user.id}")
         if schema.is_active:
-            await self.redis.invalidate_cache("stadiums:all_active",
-                                              f"Кеш для всех активных стадионов инвалидирован из-за подтверждения "
-                                              f"верификации стадиона {stadium_id}")
-        await self.redis.invalidate_cache(f"stadiums:vendor:{user.id}", f"Обновление стадиона {stadium_id}")
+            await self.redis.invalidate_on_commit(db, "stadiums:all_active",
+                                                  f"Кеш для всех активных стадионов инвалидирован из-за подтверждения "
+                                                  f"верификации стадиона {stadium_id}")
+        await self.redis.invalidate_on_commit(db, f"stadiums:vendor:{user.id}", f"Обновление стадиона {stadium_id}")
+        await self.redis.invalidate_on_commit(db, stadium_detail_cache_key(stadium_id), f"Обновление стадиона {stadium_id}")
         return Msg(msg=f"Стадиону {stadium.id} присвоен статус {schema.status}")
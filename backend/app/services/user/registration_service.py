@@ -8,26 +8,29 @@ from backend.app.models.auth import VerificationCreate, VerificationOut
 from backend.app.models.users import UserCreate, UserUpdateActive
 from backend.app.services.decorators import HttpExceptionWrapper
 from backend.app.services.email.email_service import EmailService
+from backend.app.services.user.user_cache import UserCache
 
 
 class RegistrationService:
     """Сервис регистрации пользователей"""
 
-    def __init__(self, user_repository: IUserRepository, verif_repository: IVerifyRepository, email_service: EmailService, pass_service: IPasswordService,):
+    def __init__(self, user_repository: IUserRepository, verif_repository: IVerifyRepository, email_service: EmailService, pass_service: IPasswordService,
+                 user_cache: UserCache):
         self.user_repository = user_repository
         self.verif_repository = verif_repository
         self.email_service = email_service
         self.pass_service = pass_service
+        self.user_cache = user_cache
 
     @HttpExceptionWrapper
     async def register_user(self, schema: UserCreate, db: AsyncSession):
         existing_user = await self.user_repository.get_by_email(db, email=schema.email)
         if existing_user:
             raise HTTPException(status_code=400, detail="Email уже зарегистрирован")
-        hashed_password = self.pass_service.hash_password(schema.password)
+        hashed_password = await self.pass_service.hash_password(schema.password)
         user = await self.user_repository.create(db, schema=schema, hashed_password=hashed_password)
         verify = await self.verif_repository.create(db, schema=VerificationCreate(user_id=user.id))
-        await self.email_service.send_verification_email(schema.email, schema.email, schema.password, verify.link)
+        await self.email_service.send_verification_email(db, schema.email, schema.email, schema.password, verify.link)
         return {"msg": "Письмо с подтверждением отправлено"}
 
     @HttpExceptionWrapper
@@ -41,4 +44,5 @@ class RegistrationService:
         user_update_schema = UserUpdateActive(**update_data)
         await self.user_repository.update(db, model=user, schema=user_update_schema.model_dump(exclude_unset=True))
         await self.verif_repository.remove(db, link=uuid.link)
+        await self.user_cache.invalidate_on_commit(db, user.id)
         return {"msg": "Email успешно подтвержден"}
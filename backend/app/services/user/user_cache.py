@@ -0,0 +1,98 @@
+import logging
+from datetime import datetime
+from typing import Optional
+
+from cachetools import TTLCache
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlmodel import SQLModel
+
+from backend.app.interface.repositories.i_user_repo import IUserRepository
+from backend.app.models.users import User, StatusEnum
+from backend.app.services.redis import RedisClient
+from backend.core.db import after_commit
+
+logger = logging.getLogger(__name__)
+
+
+class CachedUser(SQLModel):
+    """Поля пользователя, которые нужны потребителям CurrentUser. Хеш пароля в кеш не попадает."""
+    id: int
+    email: str
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    is_active: bool
+    is_superuser: bool
+    last_login: Optional[datetime] = None
+    image_url: Optional[str] = None
+    status: StatusEnum
+
+
+class UserCache:
+    """
+    Двухуровневый кеш пользователей для аутентификации: TTL/LRU в памяти процесса перед Redis.
+
+    Попадание в локальный уровень стоит поиска в словаре, промах доходит до Redis и только затем до БД.
+    Инвалидация удаляет запись локально и в Redis; локальные записи других воркеров живут не дольше
+    local_ttl, поэтому он держится коротким.
+    Возвращаемый User не привязан к сессии: сервисы, которые меняют пользователя, перечитывают его из БД.
+    При промахе пользователь читается в собственной короткой сессии: соединение возвращается в пул сразу,
+    а не держится до конца запроса рядом с сессией обработчика.
+    """
+
+    def __init__(self, user_repository: IUserRepository, redis: RedisClient,
+                 session_maker: async_sessionmaker[AsyncSession], maxsize: int = 10000,
+                 local_ttl: int = 30, redis_ttl: int = 600):
+        self.user_repository = user_repository
+        self.redis = redis
+        self.session_maker = session_maker
+        self.redis_ttl = redis_ttl
+        self._local: TTLCache = TTLCache(maxsize=maxsize, ttl=local_ttl)
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _cache_key(user_id: int) -> str:
+        return f"user:auth:{user_id}"
+
+    async def get_user(self, user_id: int) -> User:
+        fields = self._local.get(user_id)
+        if fields is not None:
+            self.local_hits += 1
+            return User(**fields)
+
+        cache_key = self._cache_key(user_id)
+        cached = await self.redis.fetch_cached_data(cache_key=cache_key, schema=CachedUser)
+        if cached:
+            self.redis_hits += 1
+            fields = cached[0].model_dump()
+        else:
+            self.misses += 1
+            async with self.session_maker() as db:
+                user = await self.user_repository.get_or_404(db=db, object_id=user_id)
+            cached_user = CachedUser.model_validate(user, from_attributes=True)
+            fields = cached_user.model_dump()
+            await self.redis.cache_data(cache_key, [cached_user], CachedUser, self.redis_ttl)
+
+        self._local[user_id] = fields
+        return User(**fields)
+
+    async def invalidate(self, user_id: int) -> None:
+        self._local.pop(user_id, None)
+        await self.redis.delete_cache(self._cache_key(user_id))
+        logger.info(f"Кеш пользователя {user_id} сброшен")
+
+    async def invalidate_on_commit(self, db: AsyncSession, user_id: int) -> None:
+        """
+        Сброс для изменения пользователя в транзакции db: сразу и повторно после коммита.
+        Иначе параллельный промах между сбросом и коммитом вернул бы в кеш старое состояние
+        (удаленный или деактивированный пользователь оставался бы аутентифицирован до redis_ttl).
+        """
+        await self.invalidate(user_id)
+        after_commit(db, lambda: self.invalidate(user_id))
+
+    def clear(self) -> None:
+        self._local.clear()
+
+    def stats(self) -> dict:
+        return {"local_hits": self.local_hits, "redis_hits": self.redis_hits, "misses": self.misses}
@@ -10,6 +10,7 @@ from backend.app.models.auth import Msg
 from backend.app.models.users import UpdatePassword, UserUpdate
 from backend.app.services.decorators import HttpExceptionWrapper
 from backend.app.services.email.email_service import EmailService
+from backend.app.services.user.user_cache import UserCache
 from backend.app.services.utils_service.permission import PermissionService
 
 
@@ -17,12 +18,13 @@ class UserService:
     """Сервис управления пользователями"""
 
     def __init__(self, user_repository: IUserRepository, permission: PermissionService, pass_service: IPasswordService,
-                 email_service: EmailService, image_handler: ImageHandler):
+                 email_service: EmailService, image_handler: ImageHandler, user_cache: UserCache):
         self.user_repository = user_repository
         self.permission = permission
         self.pass_service = pass_service
         self.image_handler = image_handler
         self.email_service = email_service
+        self.user_cache = user_cache
 
     @HttpExceptionWrapper
     async def update_user(self, db: AsyncSession, schema: UserUpdate, model: User) -> User:
@@ -30,17 +32,23 @@ class UserService:
         existing_user = await self.user_repository.get_by_email(db, email=schema.email)
         if existing_user and existing_user.id != model.id:
             raise HTTPException(status_code=400, detail="Email is already in use by another user.")
-        return await self.user_repository.update(db=db, model=model, schema=schema)
+        # model может прийти из кеша аутентификации, поэтому изменяется строка из БД
+        user = await self.user_repository.get_or_404(db, object_id=model.id)
+        user = await self.user_repository.update(db=db, model=user, schema=schema)
+        await self.user_cache.invalidate_on_commit(db, user.id)
+        return user
 
     @HttpExceptionWrapper
     async def update_password(self, db: AsyncSession, model: User, schema: UpdatePassword) -> Msg:
         """Обновление пароля"""
-        if not self.pass_service.verify_password(schema.current_password, model.hashed_password):
+        user = await self.user_repository.get_or_404(db, object_id=model.id)
+        if not await self.pass_service.verify_password(schema.current_password, user.hashed_password):
             raise HTTPException(status_code=400, detail="Incorrect password")
         if schema.current_password == schema.new_password:
             raise HTTPException(status_code=400, detail="New password cannot be the same as the current one")
-        model.hashed_password = self.pass_service.hash_password(schema.new_password)
-        await self.user_repository.save_db(db, model)
+        user.hashed_password = await self.pass_service.hash_password(schema.new_password)
+        await self.user_repository.save_db(db, user)
+        await self.user_cache.invalidate_on_commit(db, user.id)
         return Msg(msg="Пароль обновлен успешно")
 
     @HttpExceptionWrapper
@@ -50,7 +58,7 @@ class UserService:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                                 detail='Пользователя с этим email нет в системе')
         password_reset_token = self.pass_service.generate_password_reset_token(email)
-        await self.email_service.send_reset_password(email_to=user.email, email=email, token=password_reset_token)
+        await self.email_service.send_reset_password(db, email_to=user.email, email=email, token=password_reset_token)
         return {"msg": "Сброс пароля отправлен на email"}
 
     @HttpExceptionWrapper
@@ -65,7 +73,7 @@ class UserService:
                                 detail="Пользователя с этим email нет в системе")
 
         self.permission.verify_active(user)
-        user.hashed_password = self.pass_service.hash_password(new_password)
+        user.hashed_password = await self.pass_service.hash_password(new_password)
         await self.user_repository.save_db(db, user)
         return {"msg": "Пароль успешно изменен"}
 
@@ -74,8 +82,9 @@ class UserService:
         """Загрузка изображения для пользователя."""
         user = await self.user_repository.get_or_404(db, object_id=current_user.id)
         self.permission.check_owner_or_admin(current_user=current_user, model=user)
-        await self.image_handler.delete_old_image(db, user)
-        return await self.image_handler.upload_image(db, user, file)
+        # Старое изображение удаляется после успешной загрузки нового
+        return await self.image_handler.upload_image(db, user, file,
+                                                     on_uploaded=lambda: self.user_cache.invalidate(user.id))
 
     @HttpExceptionWrapper
     async def delete_user(self, db: AsyncSession, current_user: User, user_id: int) -> Msg:
@@ -83,4 +92,5 @@ class UserService:
         target_user = await self.user_repository.get_or_404(db, object_id=user_id)
         self.permission.check_delete_permission(current_user, target_user)
         await self.user_repository.remove(db=db, id=target_user.id)
+        await self.user_cache.invalidate_on_commit(db, target_user.id)
         return Msg(msg="Пользователь удален успешно")
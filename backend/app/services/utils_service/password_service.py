@@ -1,20 +1,81 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta, datetime
-from typing import Optional
+from typing import Optional, Callable, TypeVar
 import jwt
+from fastapi import HTTPException
 
 from backend.app.interface.utils.i_password_service import IPasswordService
 from backend.core.config import settings
 
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
 
 # Реализация сервиса паролей
 class PasswordService(IPasswordService):
-    def hash_password(self, password: str) -> str:
+    """
+    bcrypt выполняется в отдельном пуле потоков (C-реализация bcrypt отпускает GIL), поэтому всплеск
+    логинов не блокирует event loop. Очередь ограничена: сверх max_pending запросов сервис сразу
+    отвечает 503, а не копит задачи, которые клиент все равно не дождется.
+    """
+
+    def __init__(self, max_workers: int = settings.PASSWORD_HASH_WORKERS,
+                 max_pending: int = settings.PASSWORD_HASH_MAX_PENDING):
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_time = 0.0
+        self.run_time = 0.0
+
+    async def _run(self, func: Callable[..., T], *args) -> T:
+        if self._pending >= self.max_pending:
+            self.rejected += 1
+            logger.warning(f"Очередь хеширования паролей переполнена ({self._pending})")
+            raise HTTPException(status_code=503, detail="Сервер перегружен, повторите попытку позже")
+
+        def timed():
+            started = time.perf_counter()
+            return func(*args), started, time.perf_counter()
+
+        submitted = time.perf_counter()
+        self._pending += 1
+        try:
+            result, started, finished = await asyncio.get_running_loop().run_in_executor(self._executor, timed)
+        finally:
+            self._pending -= 1
+
+        # Метрики обновляются в event loop, потоки пула их не трогают
+        self.completed += 1
+        self.wait_time += started - submitted
+        self.run_time += finished - started
+        return result
+
+    async def hash_password(self, password: str) -> str:
         from backend.core.security import get_password_hash
-        return get_password_hash(password)
+        return await self._run(get_password_hash, password)
 
-    def verify_password(self, plain: str, hashed: str) -> bool:
+    async def verify_password(self, plain: str, hashed: str) -> bool:
         from backend.core.security import verify_password
-        return verify_password(plain, hashed)
+        return await self._run(verify_password, plain, hashed)
+
+    def stats(self) -> dict:
+        completed = self.completed or 1
+        return {
+            "pending": self._pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.wait_time / completed * 1000, 2),
+            "avg_run_ms": round(self.run_time / completed * 1000, 2),
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
 
     def generate_password_reset_token(self, email: str):
 
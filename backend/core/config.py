@@ -32,6 +32,28 @@ class Settings(BaseSettings):
 
     TEST_POSTGRES_DB: str = ""
 
+    DB_POOL_SIZE: int = 10  # Постоянных соединений на процесс
+    DB_MAX_OVERFLOW: int = 20  # Временных соединений сверх DB_POOL_SIZE при всплеске
+    DB_POOL_TIMEOUT: float = 10  # Секунд ожидания свободного соединения до ошибки
+    DB_POOL_RECYCLE: int = 1800  # Соединение старше этого переоткрывается
+    DB_POOL_PRE_PING: bool = True  # Проверка соединения перед выдачей, обрывы не доходят до запроса
+    DB_STATEMENT_CACHE_SIZE: int = 100  # Кеш подготовленных выражений asyncpg на соединение
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100  # Кеш подготовленных выражений диалекта SQLAlchemy
+    DB_COMMAND_TIMEOUT: float | None = 60  # Секунд на выполнение запроса на стороне клиента
+    DB_STATEMENT_TIMEOUT_MS: int = 30000  # statement_timeout сервера, 0 - без ограничения
+    DB_APPLICATION_NAME: str = "korobka"
+    # Через PgBouncer в режиме transaction: без пула приложения и без подготовленных выражений
+    DB_PGBOUNCER: bool = False
+
+    POSTGRES_REPLICA_URLS: str = ""  # DSN реплик для чтения через запятую, пусто - все читается с primary
+    DB_REPLICA_HEALTH_INTERVAL: float = 5  # Секунд между проверками реплик
+    DB_REPLICA_MAX_LAG: float = 10  # Секунд отставания, сверх которых реплика не получает чтения
+    DB_READ_YOUR_WRITES_WINDOW: float = 5  # Секунд после записи клиента, в течение которых он читает с primary
+
+    @property
+    def replica_urls(self) -> list[str]:
+        return [url.strip() for url in self.POSTGRES_REPLICA_URLS.split(",") if url.strip()]
+
     @property
     def database_url(self):
         host = "localhost" if self.ENVIRONMENT == "test" else "postgres"
@@ -53,9 +75,21 @@ class Settings(BaseSettings):
 
     EMAIL_RESET_TOKEN_EXPIRE_HOURS: int = 48  # Время жизни токена для сброса пароля
 
+    EMAIL_OUTBOX_POLL_INTERVAL: float = 2.0  # Секунд между опросами пустой очереди писем
+    EMAIL_OUTBOX_BATCH_SIZE: int = 50  # Писем за одно SMTP-соединение
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 5  # После этого письмо помечается failed
+    EMAIL_OUTBOX_RETRY_DELAY: float = 30  # Задержка первого повтора, дальше удваивается
+
     STRIPE_PUBLISHABLE_KEY: str | None = None
     STRIPE_SECRET_KEY: str | None = None
     STRIPE_WEBHOOK_SECRET: str | None = None
+    STRIPE_API_BASE: str | None = None  # Другой адрес API Stripe, например локальная заглушка
+    STRIPE_TIMEOUT: float = 10
+    STRIPE_CHECKOUT_CACHE_TTL: int = 1800  # Секунд, в течение которых повторная оплата брони вернет ту же сессию
+    STRIPE_WEBHOOK_POLL_INTERVAL: float = 1.0  # Секунд между опросами пустой очереди событий
+    STRIPE_WEBHOOK_BATCH_SIZE: int = 100
+    STRIPE_WEBHOOK_MAX_ATTEMPTS: int = 5  # После этого событие ждет разбора вручную
+    STRIPE_WEBHOOK_RETRY_DELAY: float = 30  # Задержка первого повтора события, дальше удваивается
 
     SENTRY_DNS: str | None = None
 
@@ -63,8 +97,20 @@ class Settings(BaseSettings):
     CLOUD_API_KEY: str | None = None
     CLOUD_API_SECRET: str | None = None
 
+    IMAGE_STORAGE: Literal["cloudinary", "local"] = "cloudinary"  # local - без сети, файлы в UPLOAD_DIRECTORY
+    IMAGE_MAX_SIZE_MB: int = 10
+    IMAGE_MAX_DIMENSION: int = 1600  # Большая сторона после уменьшения
+    IMAGE_WORKERS: int = 4
+
     password_reset_jwt_subject: str = 'present'
 
+    WS_SEND_QUEUE_SIZE: int = 100  # Сообщений в очереди сокета, сверх этого медленный клиент отключается
+    WS_PING_INTERVAL: int = 30  # Секунд простоя сокета до ping
+    WS_PONG_TIMEOUT: int = 10  # Секунд на ответ клиента после ping
+
+    PASSWORD_HASH_WORKERS: int = 4  # Потоки bcrypt
+    PASSWORD_HASH_MAX_PENDING: int = 64  # Сверх этого запросы отклоняются с 503
+
     GOOGLE_CLIENT_ID: str | None = None
     GOOGLE_CLIENT_SECRET: str | None = None
 
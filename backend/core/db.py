@@ -1,35 +1,249 @@
-from backend.core.config import settings
+import asyncio
+import itertools
+import time
+from contextlib import suppress
+from contextvars import ContextVar
+from uuid import uuid4
+
+from backend.core.config import settings, Settings
+from backend.core.security import access_token_subject
+from sqlalchemy import event, exc, text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 from contextlib import asynccontextmanager
-from typing import Callable, AsyncGenerator, Annotated
-from fastapi import Depends, HTTPException
+from typing import Awaitable, Callable, AsyncGenerator, Annotated, List, Optional, Sequence
+from fastapi import Depends, HTTPException, Request
 from loguru import logger
 
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    Пул соединений с замером времени выдачи: ожидание свободного соединения, открытие нового
+    и pre-ping. Рост времени выдачи при checked_out == size + overflow означает, что пул мал.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_time = 0.0
+        self.max_wait = 0.0
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.checkouts += 1
+            self.wait_time += waited
+            self.max_wait = max(self.max_wait, waited)
+
+
+def engine_options(config: Settings) -> dict:
+    """Параметры create_async_engine: пул и драйвер asyncpg из настроек."""
+    connect_args: dict = {"command_timeout": config.DB_COMMAND_TIMEOUT}
+    if config.DB_PGBOUNCER:
+        # PgBouncer в режиме transaction отдает каждую транзакцию случайному серверному соединению:
+        # подготовленные выражения и постоянные соединения приложения там не работают
+        connect_args.update(
+            statement_cache_size=0,
+            prepared_statement_cache_size=0,
+            prepared_statement_name_func=lambda: f"__asyncpg_{uuid4()}__",
+        )
+        return {"poolclass": NullPool, "connect_args": connect_args}
+
+    connect_args.update(
+        statement_cache_size=config.DB_STATEMENT_CACHE_SIZE,
+        prepared_statement_cache_size=config.DB_PREPARED_STATEMENT_CACHE_SIZE,
+        server_settings={
+            "application_name": config.DB_APPLICATION_NAME,
+            "statement_timeout": str(config.DB_STATEMENT_TIMEOUT_MS),
+        },
+    )
+    return {
+        "poolclass": TimedAsyncQueuePool,
+        "pool_size": config.DB_POOL_SIZE,
+        "max_overflow": config.DB_MAX_OVERFLOW,
+        "pool_timeout": config.DB_POOL_TIMEOUT,
+        "pool_recycle": config.DB_POOL_RECYCLE,
+        "pool_pre_ping": config.DB_POOL_PRE_PING,
+        "connect_args": connect_args,
+    }
+
+
+def pool_stats(async_engine: AsyncEngine) -> dict:
+    pool = async_engine.pool
+    if not isinstance(pool, TimedAsyncQueuePool):
+        return {"pool": type(pool).__name__}
+    checkouts = pool.checkouts or 1
+    return {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        # overflow() отрицателен, пока открыто меньше pool_size соединений
+        "overflow": max(pool.overflow(), 0),
+        "checkouts": pool.checkouts,
+        "timeouts": pool.timeouts,
+        "avg_wait_ms": round(pool.wait_time / checkouts * 1000, 2),
+        "max_wait_ms": round(pool.max_wait * 1000, 2),
+    }
+
+
 database_url = settings.database_url
-engine: AsyncEngine = create_async_engine(database_url, echo=False)
+engine: AsyncEngine = create_async_engine(database_url, echo=False, **engine_options(settings))
 
 async_session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+replica_engines: List[AsyncEngine] = [create_async_engine(url, echo=False, **engine_options(settings))
+                                      for url in settings.replica_urls]
+
+# Отставание реплики в секундах; 0, если реплика догнала primary или это не реплика
+REPLICA_LAG_QUERY = text(
+    "SELECT CASE WHEN pg_is_in_recovery() AND pg_last_wal_receive_lsn() IS DISTINCT FROM pg_last_wal_replay_lsn() "
+    "THEN coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0) ELSE 0 END"
+)
+
+LAST_WRITE_SESSION_KEY = "db_last_write"
+# Флаг "пользователь недавно писал" для клиентов без cookie (только bearer-токен)
+LAST_WRITE_USER_KEY = "db:last_write:user:{user_id}"
+# Флаги session.info: сессия меняла данные / эти изменения закоммичены
+WROTE_KEY = "db_wrote"
+COMMITTED_WRITE_KEY = "db_committed_write"
+
+# Отметка текущего HTTP-запроса о том, брал ли он соединение из пула; ставится DatabaseUsageMiddleware
+_request_pool_usage: ContextVar[Optional[dict]] = ContextVar("request_pool_usage", default=None)
+
+
+@event.listens_for(Session, "after_begin")
+def _mark_pool_used(session, transaction, connection) -> None:
+    # AsyncSession берет соединение из пула только на первом запросе к БД, тогда же начинается транзакция
+    usage = _request_pool_usage.get()
+    if usage is not None:
+        usage["used"] = True
+
+
+# Колбэки, ждущие коммита транзакции сессии, и колбэки, чья транзакция уже закоммичена
+AFTER_COMMIT_KEY = "after_commit"
+COMMITTED_KEY = "after_commit_ready"
+
+
+def after_commit(session: AsyncSession, callback: Callable[[], Awaitable]) -> None:
+    """
+    Откладывает callback (обычно сброс кеша) до коммита текущей транзакции сессии.
+
+    Сброс до коммита не защищает от гонки: параллельный запрос успевает прочитать из БД старую строку
+    и снова положить ее в кеш. Колбэки вызываются DatabaseSessionManager при закрытии сессии,
+    если транзакция закоммичена, и отбрасываются при откате.
+    """
+    session.info.setdefault(AFTER_COMMIT_KEY, []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _commit_ready(session) -> None:
+    callbacks = session.info.pop(AFTER_COMMIT_KEY, None)
+    if callbacks:
+        session.info.setdefault(COMMITTED_KEY, []).extend(callbacks)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_after_commit(session) -> None:
+    session.info.pop(AFTER_COMMIT_KEY, None)
+    session.info.pop(WROTE_KEY, None)
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_wrote_on_flush(session, flush_context) -> None:
+    session.info[WROTE_KEY] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_wrote_on_execute(orm_execute_state) -> None:
+    # Массовые insert/update/delete идут мимо flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info[WROTE_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_committed_write(session) -> None:
+    if session.info.pop(WROTE_KEY, False):
+        session.info[COMMITTED_WRITE_KEY] = True
+
+
+async def run_after_commit(session: AsyncSession) -> None:
+    """Вызывает колбэки закоммиченных транзакций сессии; ошибка колбэка не отменяет коммит."""
+    for callback in session.info.pop(COMMITTED_KEY, []):
+        try:
+            await callback()
+        except Exception as e:
+            logger.error(f"Ошибка колбэка после коммита: {e}")
+
+
+class Replica:
+    def __init__(self, session_maker: async_sessionmaker[AsyncSession]):
+        self.session_maker = session_maker
+        self.healthy = True
+        self.lag = 0.0
+        self.last_error: Optional[str] = None
+
+    @property
+    def engine(self) -> AsyncEngine:
+        return self.session_maker.kw["bind"]
+
 
 class DatabaseSessionManager:
     """
     Класс для управления асинхронными сессиями базы данных, включая поддержку транзакций и зависимости FastAPI.
+
+    Чтения через ReadSessionDep распределяются по здоровым репликам по кругу; без реплик или когда все
+    больны - идут на primary. Реплики проверяются в фоне: недоступная или отставшая больше max_lag
+    выводится из ротации до следующей успешной проверки. После записи клиент в течение
+    read_your_writes_window читает с primary, чтобы видеть свои изменения. Отметка о записи действует
+    на всех воркерах: время записи хранится в подписанной cookie-сессии (SessionMiddleware), а для
+    клиентов только с bearer-токеном - флагом пользователя в write_marks (Redis) с TTL окна.
+    Записью считается коммит TransactionSessionDep и закоммиченные изменения в сессии SessionDep.
+
+    ReadSessionDep подходит только для чтений, которые не попадают в кеш: загрузчики @cached и кеши
+    расписаний читают с primary, иначе данные отстающей реплики жили бы в кеше весь его TTL.
     """
 
-    def __init__(self, session_maker: async_sessionmaker[AsyncSession]):
+    def __init__(self, session_maker: async_sessionmaker[AsyncSession],
+                 replicas: Sequence[async_sessionmaker[AsyncSession]] = (),
+                 read_your_writes_window: float = settings.DB_READ_YOUR_WRITES_WINDOW,
+                 health_interval: float = settings.DB_REPLICA_HEALTH_INTERVAL,
+                 max_lag: float = settings.DB_REPLICA_MAX_LAG):
         self.session_maker = session_maker
+        self.replicas = [Replica(replica) for replica in replicas]
+        self.read_your_writes_window = read_your_writes_window
+        self.health_interval = health_interval
+        self.max_lag = max_lag
+        self._round_robin = itertools.count()
+        self._health_task: Optional[asyncio.Task] = None
+        self.requests_with_db = 0
+        self.requests_without_db = 0
+        # Хранилище флагов записи с set_flag/has_flag (RedisClient), подключается при старте приложения
+        self.write_marks = None
 
     @asynccontextmanager
-    async def create_session(self):
-        async with self.session_maker() as session:
+    async def create_session(self, session_maker: Optional[async_sessionmaker[AsyncSession]] = None):
+        async with (session_maker or self.session_maker)() as session:
             try:
                 yield session
             except HTTPException:
                 raise
             except Exception as e:
                 logger.error(f"Session error: {e}")
+                if session_maker is not None and self._is_disconnect(e):
+                    self._mark_down(session_maker, e)
                 raise
             finally:
+                await run_after_commit(session)
                 await session.close()
 
     @asynccontextmanager
@@ -45,20 +259,121 @@ class DatabaseSessionManager:
             logger.error(f"Transaction failed: {e}")
             raise
 
-    async def get_session(self) -> AsyncGenerator[AsyncSession, None]:
+    # --- Реплики ---
+    def read_session_maker(self) -> async_sessionmaker[AsyncSession]:
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return self.session_maker
+        return healthy[next(self._round_robin) % len(healthy)].session_maker
+
+    @staticmethod
+    def _user_write_key(request: Request) -> Optional[str]:
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        user_id = access_token_subject(token) if scheme.lower() == "bearer" and token else None
+        return LAST_WRITE_USER_KEY.format(user_id=user_id) if user_id else None
+
+    async def recently_wrote(self, request: Request) -> bool:
+        if "session" in request.scope:
+            last_write = request.session.get(LAST_WRITE_SESSION_KEY, 0)
+            if time.time() - last_write < self.read_your_writes_window:
+                return True
+        key = self._user_write_key(request) if self.write_marks is not None else None
+        return key is not None and await self.write_marks.has_flag(key)
+
+    async def mark_write(self, request: Request) -> None:
+        if "session" in request.scope:
+            request.session[LAST_WRITE_SESSION_KEY] = time.time()
+        # Без реплик все читают с primary, флаг в Redis не нужен
+        key = self._user_write_key(request) if self.replicas and self.write_marks is not None else None
+        if key is not None:
+            await self.write_marks.set_flag(key, self.read_your_writes_window)
+
+    @staticmethod
+    def _is_disconnect(error: Exception) -> bool:
+        return isinstance(error, (OSError, exc.InterfaceError)) or (
+            isinstance(error, exc.DBAPIError) and error.connection_invalidated)
+
+    def _mark_down(self, session_maker: async_sessionmaker[AsyncSession], error: Exception) -> None:
+        for replica in self.replicas:
+            if replica.session_maker is session_maker and replica.healthy:
+                replica.healthy = False
+                replica.last_error = repr(error)
+                logger.warning(f"Реплика {replica.engine.url.host} выведена из ротации: {error!r}")
+
+    async def _check_replica(self, replica: Replica) -> None:
+        try:
+            async with replica.session_maker() as session:
+                result = await asyncio.wait_for(session.execute(REPLICA_LAG_QUERY), timeout=self.health_interval)
+                replica.lag = float(result.scalar() or 0)
+            healthy, replica.last_error = replica.lag <= self.max_lag, None
+        except Exception as e:
+            healthy, replica.last_error = False, repr(e)
+        if healthy != replica.healthy:
+            logger.warning(f"Реплика {replica.engine.url.host}: {'в ротации' if healthy else 'выведена из ротации'}, "
+                           f"отставание {replica.lag:.1f} с, ошибка {replica.last_error}")
+        replica.healthy = healthy
+
+    async def check_replicas(self) -> None:
+        await asyncio.gather(*(self._check_replica(replica) for replica in self.replicas))
+
+    async def _health_loop(self) -> None:
+        while True:
+            await self.check_replicas()
+            await asyncio.sleep(self.health_interval)
+
+    def start_health_checks(self) -> None:
+        if self.replicas and self._health_task is None:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def stop_health_checks(self) -> None:
+        if self._health_task is not None:
+            self._health_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._health_task
+            self._health_task = None
+
+    # --- Счетчики запросов ---
+    def record_request(self, used_pool: bool) -> None:
+        if used_pool:
+            self.requests_with_db += 1
+        else:
+            self.requests_without_db += 1
+
+    def request_stats(self) -> dict:
+        return {"requests_with_db": self.requests_with_db, "requests_without_db": self.requests_without_db}
+
+    # --- Зависимости FastAPI ---
+    async def get_session(self, request: Request) -> AsyncGenerator[AsyncSession, None]:
         """
         Зависимость для FastAPI, возвращающая сессию без управления транзакцией.
+        Соединение из пула сессия берет на первом запросе к БД: обработчик, ответивший из кеша,
+        пул не трогает. Если изменения в сессии закоммичены, клиент читает с primary, как после
+        TransactionSessionDep.
         """
         async with self.create_session() as session:
             yield session
+        if session.info.pop(COMMITTED_WRITE_KEY, False):
+            await self.mark_write(request)
 
-    async def get_transaction_session(self) -> AsyncGenerator[AsyncSession, None]:
+    async def get_transaction_session(self, request: Request) -> AsyncGenerator[AsyncSession, None]:
         """
         Зависимость для FastAPI, возвращающая сессию с управлением транзакцией.
+        После коммита клиент на время read_your_writes_window читает с primary.
         """
         async with self.create_session() as session:
             async with self.transaction(session):
                 yield session
+            await self.mark_write(request)
+
+    async def get_read_session(self, request: Request) -> AsyncGenerator[AsyncSession, None]:
+        """
+        Зависимость для FastAPI, возвращающая сессию только для чтения: реплика, если клиент недавно не писал.
+        """
+        session_maker = self.read_session_maker()
+        if session_maker is not self.session_maker and await self.recently_wrote(request):
+            session_maker = self.session_maker
+        async with self.create_session(None if session_maker is self.session_maker else session_maker) as session:
+            yield session
 
     @property
     def session_dependency(self) -> Callable:
@@ -70,10 +385,43 @@ class DatabaseSessionManager:
         """Возвращает зависимость для FastAPI с поддержкой транзакций."""
         return Depends(self.get_transaction_session)
 
+    @property
+    def read_session_dependency(self) -> Callable:
+        """Возвращает зависимость для FastAPI с сессией чтения с реплики."""
+        return Depends(self.get_read_session)
+
+
+class DatabaseUsageMiddleware:
+    """
+    ASGI-middleware: считает HTTP-запросы, бравшие соединение из пула, и обслуженные без БД
+    (ответ из кеша, отказ в доступе до запроса к БД). Учитываются все сессии запроса,
+    в том числе открытые сервисами, а не зависимостями.
+    """
+
+    def __init__(self, app, manager: DatabaseSessionManager):
+        self.app = app
+        self.manager = manager
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        usage = {"used": False}
+        token = _request_pool_usage.set(usage)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_pool_usage.reset(token)
+            self.manager.record_request(usage["used"])
+
 
 # Инициализация менеджера сессий базы данных
-session_manager = DatabaseSessionManager(async_session_maker)
+session_manager = DatabaseSessionManager(
+    async_session_maker,
+    replicas=[async_sessionmaker(replica, class_=AsyncSession, expire_on_commit=False) for replica in replica_engines]
+)
 
 # Зависимости FastAPI для использования сессий
 SessionDep = Annotated[AsyncSession, session_manager.session_dependency]
 TransactionSessionDep = Annotated[AsyncSession, session_manager.transaction_session_dependency]
+ReadSessionDep = Annotated[AsyncSession, session_manager.read_session_dependency]
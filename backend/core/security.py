@@ -1,6 +1,6 @@
 from datetime import datetime, timedelta, timezone
 from fastapi import  HTTPException
-from typing import  Union
+from typing import  Optional, Union
 
 import jwt
 from passlib.context import CryptContext
@@ -40,6 +40,15 @@ def verify_refresh_token(token:str):
         raise HTTPException(status_code=401, detail="Invalid or expired token")
 
 
+def access_token_subject(token: str) -> Optional[str]:
+    """sub валидного access-токена или None."""
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except jwt.PyJWTError:
+        return None
+    return payload.get("sub") if payload.get("type") == "access" else None
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
@@ -10,6 +10,7 @@ from backend.app import routers
 from backend.app.dependencies.service_factory import service_factory
 
 from backend.core.config import settings
+from backend.core.db import DatabaseUsageMiddleware, session_manager
 from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
 from sentry_sdk.integrations.logging import LoggingIntegration
 
@@ -35,15 +36,31 @@ app = FastAPI(
 
 
 app.add_middleware(SessionMiddleware, secret_key=settings.SECRET_KEY)
+app.add_middleware(DatabaseUsageMiddleware, manager=session_manager)
 
 
 @app.on_event("startup")
 async def startup():
     await service_factory.redis_client.connect()
+    session_manager.write_marks = service_factory.redis_client
+    session_manager.start_health_checks()
+    service_factory.email_templates.load()
+    service_factory.stripe_webhook_worker.start()
+    if settings.SMTP_HOST:
+        service_factory.email_outbox_worker.start()
+    else:
+        logger.warning("SMTP_HOST не задан, письма копятся в email_outbox без отправки")
 
 @app.on_event("shutdown")
 async def shutdown():
+    await service_factory.connection_hub.close()
+    await service_factory.email_outbox_worker.stop()
+    await service_factory.stripe_webhook_worker.stop()
+    await service_factory.stripe_checkout.close()
+    await service_factory.drain_image_uploads()
     await service_factory.redis_client.disconnect()
+    await session_manager.stop_health_checks()
+    service_factory.password_service.shutdown()
 
 # Подключение статики
 app.mount("/static", StaticFiles(directory="static"), name="static")
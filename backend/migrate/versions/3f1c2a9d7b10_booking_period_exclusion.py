@@ -0,0 +1,42 @@
+"""booking period exclusion constraint
+
+Revision ID: 3f1c2a9d7b10
+Revises:
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c2a9d7b10'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # btree_gist нужен для оператора = по stadium_id внутри GiST-индекса
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.add_column(
+        'booking',
+        sa.Column('period', postgresql.TSRANGE(),
+                  sa.Computed("tsrange(start_time, end_time, '[)')", persisted=True), nullable=True)
+    )
+    op.create_exclude_constraint(
+        'booking_stadium_period_excl',
+        'booking',
+        ('stadium_id', '='),
+        ('period', '&&'),
+        using='gist',
+        where="status <> 'Canceled'",
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('booking_stadium_period_excl', 'booking', type_='exclude')
+    op.drop_column('booking', 'period')
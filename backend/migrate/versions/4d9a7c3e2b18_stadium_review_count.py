@@ -0,0 +1,34 @@
+"""stadium review count
+
+Revision ID: 4d9a7c3e2b18
+Revises: c7d2e91f4a36
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4d9a7c3e2b18'
+down_revision: Union[str, None] = 'c7d2e91f4a36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('stadium', sa.Column('review_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute(
+        "UPDATE stadium SET review_count = counts.total "
+        "FROM (SELECT stadium_id, count(*) AS total FROM stadiumreview GROUP BY stadium_id) AS counts "
+        "WHERE stadium.id = counts.stadium_id"
+    )
+    op.create_index('ix_stadiumreview_stadium_data', 'stadiumreview',
+                    ['stadium_id', sa.text('data DESC'), sa.text('id DESC')])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stadiumreview_stadium_data', table_name='stadiumreview')
+    op.drop_column('stadium', 'review_count')
@@ -0,0 +1,34 @@
+"""hot query indexes
+
+Revision ID: 8b4e6d2c1a05
+Revises: 3f1c2a9d7b10
+Create Date: 2026-10-17 12:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b4e6d2c1a05'
+down_revision: Union[str, None] = '3f1c2a9d7b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_booking_stadium_time', 'booking', ['stadium_id', 'start_time', 'end_time'])
+    op.create_index('ix_booking_stadium_start_date', 'booking', ['stadium_id', sa.text('date(start_time)')])
+    op.create_index('ix_stadium_active_city', 'stadium', ['is_active', 'city'])
+    op.create_index('ix_message_sender_recipient', 'message', ['sender_id', 'recipient_id'])
+    op.create_index('ix_stadiumreview_user_stadium', 'stadiumreview', ['user_id', 'stadium_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stadiumreview_user_stadium', table_name='stadiumreview')
+    op.drop_index('ix_message_sender_recipient', table_name='message')
+    op.drop_index('ix_stadium_active_city', table_name='stadium')
+    op.drop_index('ix_booking_stadium_start_date', table_name='booking')
+    op.drop_index('ix_booking_stadium_time', table_name='booking')
@@ -0,0 +1,56 @@
+"""message conversation key and summary
+
+Revision ID: 9e3b5f1d7c42
+Revises: 4d9a7c3e2b18
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e3b5f1d7c42'
+down_revision: Union[str, None] = '4d9a7c3e2b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('message', sa.Column('user_low', sa.Integer(),
+                                       sa.Computed('LEAST(sender_id, recipient_id)', persisted=True)))
+    op.add_column('message', sa.Column('user_high', sa.Integer(),
+                                       sa.Computed('GREATEST(sender_id, recipient_id)', persisted=True)))
+    op.create_index('ix_message_conversation', 'message', ['user_low', 'user_high', 'id'])
+    # История диалога теперь читается по ix_message_conversation
+    op.drop_index('ix_message_sender_recipient', table_name='message')
+
+    op.create_table(
+        'conversation_summary',
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('user.id'), primary_key=True),
+        sa.Column('peer_id', sa.Integer(), sa.ForeignKey('user.id'), primary_key=True),
+        sa.Column('last_message_id', sa.Integer(), sa.ForeignKey('message.id'), nullable=False),
+        sa.Column('last_sender_id', sa.Integer(), nullable=False),
+        sa.Column('last_content', sa.String(), nullable=True),
+    )
+    op.create_index('ix_conversation_summary_user_last', 'conversation_summary',
+                    ['user_id', sa.text('last_message_id DESC')])
+    op.execute(
+        "INSERT INTO conversation_summary (user_id, peer_id, last_message_id, last_sender_id, last_content) "
+        "SELECT DISTINCT ON (owner_id, peer_id) owner_id, peer_id, id, sender_id, content FROM ("
+        "  SELECT sender_id AS owner_id, recipient_id AS peer_id, id, sender_id, content FROM message"
+        "  UNION ALL"
+        "  SELECT recipient_id, sender_id, id, sender_id, content FROM message WHERE recipient_id <> sender_id"
+        ") AS owned ORDER BY owner_id, peer_id, id DESC"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_conversation_summary_user_last', table_name='conversation_summary')
+    op.drop_table('conversation_summary')
+    op.create_index('ix_message_sender_recipient', 'message', ['sender_id', 'recipient_id'])
+    op.drop_index('ix_message_conversation', table_name='message')
+    op.drop_column('message', 'user_high')
+    op.drop_column('message', 'user_low')
@@ -0,0 +1,27 @@
+"""drop booking start date index
+
+Revision ID: c7d2e91f4a36
+Revises: 8b4e6d2c1a05
+Create Date: 2026-10-17 14:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d2e91f4a36'
+down_revision: Union[str, None] = '8b4e6d2c1a05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Выборка за день идет диапазоном по start_time и обслуживается ix_booking_stadium_time
+    op.drop_index('ix_booking_stadium_start_date', table_name='booking')
+
+
+def downgrade() -> None:
+    op.create_index('ix_booking_stadium_start_date', 'booking', ['stadium_id', sa.text('date(start_time)')])
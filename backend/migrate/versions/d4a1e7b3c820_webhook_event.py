@@ -0,0 +1,39 @@
+"""webhook event queue
+
+Revision ID: d4a1e7b3c820
+Revises: b2f8a4c6d913
+Create Date: 2026-10-17 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a1e7b3c820'
+down_revision: Union[str, None] = 'b2f8a4c6d913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'webhook_event',
+        sa.Column('id', sa.String(), primary_key=True),
+        sa.Column('type', sa.String(), nullable=False),
+        sa.Column('payload', postgresql.JSONB(), nullable=False),
+        sa.Column('received_at', sa.DateTime(), nullable=False),
+        sa.Column('processed_at', sa.DateTime(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('last_error', sa.String(), nullable=True),
+    )
+    op.create_index('ix_webhook_event_unprocessed', 'webhook_event', ['received_at'],
+                    postgresql_where=sa.text('processed_at IS NULL'))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_webhook_event_unprocessed', table_name='webhook_event')
+    op.drop_table('webhook_event')
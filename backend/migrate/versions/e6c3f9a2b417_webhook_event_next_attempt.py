@@ -0,0 +1,27 @@
+"""webhook event retry backoff
+
+Revision ID: e6c3f9a2b417
+Revises: d4a1e7b3c820
+Create Date: 2026-10-17 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6c3f9a2b417'
+down_revision: Union[str, None] = 'd4a1e7b3c820'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('webhook_event', sa.Column('next_attempt_at', sa.DateTime(), nullable=False,
+                                             server_default=sa.text("(now() AT TIME ZONE 'utc')")))
+
+
+def downgrade() -> None:
+    op.drop_column('webhook_event', 'next_attempt_at')
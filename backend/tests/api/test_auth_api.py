@@ -56,7 +56,7 @@ class TestAuthUser:
         user = await service_factory.user_repo.create(
             db,
             schema=UserCreate(email=email, password=password),
-            hashed_password=service_factory.password_service.hash_password(password)
+            hashed_password=await service_factory.password_service.hash_password(password)
         )
 
         verification = await service_factory.verify_repo.create(db, schema=VerificationCreate(user_id=user.id))
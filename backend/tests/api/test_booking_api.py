@@ -23,6 +23,41 @@ class TestBookingApi:
         response = await client.post(f"{settings.API_V1_STR}/booking/create", headers=headers, json=data)
         assert response.status_code == 200
 
+    async def test_quote_prices(self, db, client):
+        data = {
+            "stadium_id": 2,
+            "slots": [
+                {"start_time": "2024-08-09T10:00:00", "end_time": "2024-08-09T11:00:00"},
+                {"start_time": "2024-08-09T10:00:00", "end_time": "2024-08-09T12:00:00"},
+            ]
+        }
+        response = await client.post(f"{settings.API_V1_STR}/booking/quote", json=data)
+        assert response.status_code == 200
+        assert [float(price) for price in response.json()["prices"]] == [600, 1200]
+
+    @pytest.mark.parametrize("selected_date, count", [
+        ("2024-09-03", 1),
+        ("2024-09-05", 0),
+    ])
+    async def test_booking_from_date(self, client, selected_date, count):
+        params = {"stadium_id": 1, "selected_date": selected_date}
+        response = await client.get(f"{settings.API_V1_STR}/booking/booking_from_date", params=params)
+        assert response.status_code == 200
+        assert len(response.json()) == count
+
+    async def test_bookings_vendor_cursor(self, client):
+        headers = get_token_header(user_id=1)
+        url = f"{settings.API_V1_STR}/booking/bookings-vendor"
+        first = (await client.get(url, headers=headers, params={"size": 2, "cursor": ""})).json()
+        assert len(first["items"]) == 2
+        assert first["next_cursor"] is not None
+
+        second = (await client.get(url, headers=headers, params={"size": 2, "cursor": first["next_cursor"]})).json()
+        assert len(second["items"]) == 1
+        assert second["next_cursor"] is None
+        ids = [booking["id"] for booking in first["items"] + second["items"]]
+        assert len(set(ids)) == 3
+
     async def test_delete_booking(self,db, client):
         headers = get_token_header(user_id=4)
         response = await client.delete(f"{settings.API_V1_STR}/booking/delete/{2}", headers=headers)
@@ -0,0 +1,29 @@
+import pytest
+from backend.core.config import settings
+from backend.tests.utils.utils import get_token_header
+
+
+@pytest.mark.anyio
+@pytest.mark.usefixtures("db", "client", "test_data")
+class TestMessageAPI:
+    async def test_history_pages_and_conversations(self, client):
+        sender, recipient = get_token_header(1), get_token_header(2)
+        for i in range(3):
+            response = await client.post(f"{settings.API_V1_STR}/messages", headers=sender,
+                                         json={"recipient_id": 2, "content": f"msg{i}"})
+            assert response.status_code == 200
+        await client.post(f"{settings.API_V1_STR}/messages", headers=recipient,
+                          json={"recipient_id": 1, "content": "reply"})
+
+        latest = await client.get(f"{settings.API_V1_STR}/messages/2", headers=sender, params={"limit": 2})
+        assert [message["content"] for message in latest.json()] == ["msg2", "reply"]
+
+        older = await client.get(f"{settings.API_V1_STR}/messages/1", headers=recipient,
+                                 params={"limit": 2, "before_id": latest.json()[0]["id"]})
+        assert [message["content"] for message in older.json()] == ["msg0", "msg1"]
+
+        conversations = await client.get(f"{settings.API_V1_STR}/conversations", headers=sender)
+        assert conversations.status_code == 200
+        conversation = next(item for item in conversations.json() if item["peer_id"] == 2)
+        assert conversation["last_content"] == "reply"
+        assert conversation["last_sender_id"] == 2
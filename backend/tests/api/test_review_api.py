@@ -47,3 +47,16 @@ class TestReviewAPI:
         assert response.status_code == status
         if response.status_code != 200:
             assert response.json() == detail
+
+    async def test_get_stadium_reviews(self, client):
+        first = await client.get(f"{settings.API_V1_STR}/reviews/1", params={"size": 1})
+        assert first.status_code == 200
+        assert len(first.json()["items"]) == 1
+        assert first.json()["next_cursor"] is not None
+
+        second = await client.get(f"{settings.API_V1_STR}/reviews/1",
+                                  params={"size": 1, "cursor": first.json()["next_cursor"]})
+        assert second.status_code == 200
+        assert second.json()["items"][0]["id"] != first.json()["items"][0]["id"]
+        assert first.json()["items"][0]["data"] >= second.json()["items"][0]["data"]
+
@@ -65,6 +65,28 @@ class TestStadiumApi:
         response = await client.get(f"{settings.API_V1_STR}/stadium/detail/{stadium_id}")
         assert response.status_code == status
 
+    async def test_get_stadium_not_modified(self, client, mock_redis):
+        url = f"{settings.API_V1_STR}/stadium/detail/1"
+        response = await client.get(url)
+        assert response.json()["id"] == 1
+        mock_redis.cache_entry.assert_awaited()
+        assert mock_redis.cache_entry.await_args.args[0] == "stadium:1:detail"
+
+        response = await client.get(url, headers={"If-None-Match": response.headers["ETag"]})
+        assert response.status_code == 304
+
+    @pytest.mark.parametrize("start_time, end_time, busy_stadium_id, free_stadium_id", [
+        ("2024-08-04T10:00:00", "2024-08-04T11:00:00", 2, 5),
+        ("2024-08-03T23:00:00", "2024-08-04T10:00:00", 2, 5),
+    ])
+    async def test_search_stadiums(self, client, start_time, end_time, busy_stadium_id, free_stadium_id):
+        params = {"city": "Москва", "start_time": start_time, "end_time": end_time}
+        response = await client.get(f"{settings.API_V1_STR}/stadium/search", params=params)
+        assert response.status_code == 200
+        stadium_ids = [stadium["id"] for stadium in response.json()]
+        assert busy_stadium_id not in stadium_ids
+        assert free_stadium_id in stadium_ids
+
     @pytest.mark.parametrize("user_id, stadium_id,status, detail", [
         (1, 4, 200, None),
 
@@ -0,0 +1,78 @@
+import asyncio
+import threading
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from backend.app.dependencies.service_factory import service_factory
+from backend.core.config import Settings, settings
+from backend.core.db import engine_options, pool_stats
+from backend.tests.utils.utils import get_token_header
+
+
+@pytest.mark.anyio
+@pytest.mark.usefixtures("db", "client", "test_data")
+class TestSystemApi:
+    async def test_db_pool_stats(self, client):
+        response = await client.get(f"{settings.API_V1_STR}/system/db-pool", headers=get_token_header(user_id=3))
+        assert response.status_code == 200
+        stats = response.json()
+        assert stats["size"] == settings.DB_POOL_SIZE
+        assert {"checked_out", "overflow", "checkouts", "avg_wait_ms", "max_wait_ms", "timeouts"} <= stats.keys()
+
+    async def test_cached_request_skips_pool(self, client):
+        url = f"{settings.API_V1_STR}/system/db-pool"
+        headers = get_token_header(user_id=3)
+        await client.get(url, headers=headers)
+        before = (await client.get(url, headers=headers)).json()
+        # Пользователь уже в кеше: предыдущий запрос обошелся без соединения из пула
+        after = (await client.get(url, headers=headers)).json()
+        assert after["requests_without_db"] == before["requests_without_db"] + 1
+        assert after["requests_with_db"] == before["requests_with_db"]
+        assert after["checkouts"] == before["checkouts"]
+
+    async def test_db_pool_stats_forbidden(self, client):
+        response = await client.get(f"{settings.API_V1_STR}/system/db-pool", headers=get_token_header(user_id=1))
+        assert response.status_code == 403
+
+    async def test_password_hashing_overload(self, client, monkeypatch):
+        url = f"{settings.API_V1_STR}/system/password-hashing"
+        headers = get_token_header(user_id=3)
+        password_service = service_factory.password_service
+        before = (await client.get(url, headers=headers)).json()
+
+        # Пул занят задачей, которая ждет сигнала: следующий логин упирается в max_pending
+        monkeypatch.setattr(password_service, "max_pending", 1)
+        release = threading.Event()
+        blocker = asyncio.create_task(password_service._run(release.wait, 5))
+        await asyncio.sleep(0.01)
+        try:
+            response = await client.post(f"{settings.API_V1_STR}/auth/login/access-token",
+                                         data={"username": "vendor1@gmail.com", "password": "mars03051972"})
+            assert response.status_code == 503
+
+            during = (await client.get(url, headers=headers)).json()
+            assert during["pending"] == 1
+            assert during["rejected"] == before["rejected"] + 1
+        finally:
+            release.set()
+            await blocker
+
+        after = (await client.get(url, headers=headers)).json()
+        assert after["pending"] == 0
+        assert after["completed"] == before["completed"] + 1
+        assert {"avg_wait_ms", "avg_run_ms"} <= after.keys()
+
+    async def test_password_hashing_stats_forbidden(self, client):
+        response = await client.get(f"{settings.API_V1_STR}/system/password-hashing",
+                                    headers=get_token_header(user_id=1))
+        assert response.status_code == 403
+
+    async def test_pgbouncer_mode(self):
+        options = engine_options(Settings(DB_PGBOUNCER=True))
+        assert options["connect_args"]["statement_cache_size"] == 0
+        assert options["connect_args"]["prepared_statement_cache_size"] == 0
+
+        pgbouncer_engine = create_async_engine(settings.database_url, **options)
+        assert pool_stats(pgbouncer_engine) == {"pool": "NullPool"}
+        await pgbouncer_engine.dispose()
@@ -2,6 +2,9 @@ import pytest
 import logging
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
+from backend.app.dependencies.service_factory import service_factory
+from backend.app.models import User
+from backend.app.services.image.image_storage import LocalImageStorage
 from backend.core.config import settings
 from backend.tests.utils.utils import get_token_header
 
@@ -74,6 +77,31 @@ class TestUserApi:
         response = await client.get(f"{settings.API_V1_STR}/user/all_user", headers=headers)
         assert response.status_code == 200
 
+    async def test_upload_avatar_local_storage(self, client, tmp_path, monkeypatch):
+        handler = service_factory.get_image_handler(User)
+        monkeypatch.setattr(handler, "storage", LocalImageStorage(str(tmp_path)))
+        headers = get_token_header(user_id=1)
+        png = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+
+        response = await client.patch(f"{settings.API_V1_STR}/user/upload-avatar", headers=headers,
+                                      files={"file": ("avatar.png", png, "image/png")})
+        assert response.status_code == 202
+        assert response.json()["status"] == "pending"
+
+        await handler.drain()
+        uploaded = list((tmp_path / "user" / "id-1").iterdir())
+        assert len(uploaded) == 1
+        assert uploaded[0].read_bytes() == png
+
+        response = await client.get(f"{settings.API_V1_STR}/user/me", headers=headers)
+        assert response.json()["image_url"].endswith(uploaded[0].name)
+
+    async def test_upload_avatar_not_image(self, client):
+        headers = get_token_header(user_id=1)
+        response = await client.patch(f"{settings.API_V1_STR}/user/upload-avatar", headers=headers,
+                                      files={"file": ("avatar.png", b"not an image", "image/png")})
+        assert response.status_code == 400
+
     # async def test_upload_avatar(self, client, db):
     #     token = security.create_access_token(1, expires_delta=timedelta(minutes=10))
     #     headers = {"Authorization": f"Bearer {str(token)}"}
@@ -0,0 +1,110 @@
+import hashlib
+import hmac
+import json
+import time
+from datetime import datetime
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from backend.app.dependencies.service_factory import service_factory
+from backend.app.models import Booking, WebhookEvent
+from backend.app.models.bookings import StatusBooking
+from backend.app.services.booking.webhook_worker import StripeWebhookWorker
+from backend.core.config import settings
+
+WEBHOOK_SECRET = "whsec_test"
+
+
+def checkout_completed(event_id: str, booking_id) -> dict:
+    return {
+        "id": event_id,
+        "type": "checkout.session.completed",
+        "data": {"object": {"id": "cs_test", "payment_intent": f"pi_{event_id}",
+                            "metadata": {"booking_id": str(booking_id)}}},
+    }
+
+
+def signed(event: dict, secret: str = WEBHOOK_SECRET) -> tuple[str, dict]:
+    payload = json.dumps(event)
+    timestamp = int(time.time())
+    signature = hmac.new(secret.encode(), f"{timestamp}.{payload}".encode(), hashlib.sha256).hexdigest()
+    return payload, {"stripe-signature": f"t={timestamp},v1={signature}", "Content-Type": "application/json"}
+
+
+@pytest.mark.anyio
+@pytest.mark.usefixtures("db", "client", "test_data")
+class TestStripeWebhook:
+    @pytest.fixture(autouse=True)
+    async def webhook_secret(self, db, monkeypatch):
+        monkeypatch.setattr(settings, "STRIPE_WEBHOOK_SECRET", WEBHOOK_SECRET)
+        yield
+        await db.execute(delete(WebhookEvent))
+        await db.commit()
+
+    async def post(self, client, event: dict, secret: str = WEBHOOK_SECRET):
+        payload, headers = signed(event, secret)
+        return await client.post(f"{settings.API_V1_STR}/webhook/stripe", content=payload, headers=headers)
+
+    async def test_redelivery_is_stored_once(self, db, client):
+        event = checkout_completed("evt_1", 1)
+        assert (await self.post(client, event)).status_code == 200
+        assert (await self.post(client, event)).status_code == 200
+
+        rows = (await db.execute(select(WebhookEvent))).scalars().all()
+        assert [(row.id, row.processed_at) for row in rows] == [("evt_1", None)]
+        # Вебхук бронь не трогает, это работа воркера
+        booking = await db.get(Booking, 1, populate_existing=True)
+        assert booking.status == StatusBooking.PENDING
+
+    async def test_invalid_signature(self, db, client):
+        response = await self.post(client, checkout_completed("evt_2", 1), secret="whsec_other")
+        assert response.status_code == 400
+        assert (await db.execute(select(WebhookEvent))).scalars().all() == []
+
+    async def test_worker_applies_batch_idempotently(self, db, client, test_engine):
+        for event in (checkout_completed("evt_3", 2), checkout_completed("evt_4", 2),
+                      checkout_completed("evt_5", "not-a-number"),
+                      {"id": "evt_6", "type": "payment_intent.created", "data": {"object": {}}}):
+            assert (await self.post(client, event)).status_code == 200
+
+        worker = StripeWebhookWorker(service_factory.webhook_event_repo, service_factory.booking_service,
+                                     session_maker=async_sessionmaker(test_engine, expire_on_commit=False))
+        assert await worker.process_batch() == 4
+        assert await worker.process_batch() == 0
+
+        booking = await db.get(Booking, 2, populate_existing=True)
+        assert booking.status == StatusBooking.COMPLETED
+        assert booking.stripe_payment_intent_id in {"pi_evt_3", "pi_evt_4"}
+        events = (await db.execute(select(WebhookEvent).execution_options(populate_existing=True))).scalars().all()
+        assert all(event.processed_at is not None for event in events)
+
+    async def test_failed_batch_retries_events_one_by_one(self, db, client, test_engine, monkeypatch):
+        for event in (checkout_completed("evt_7", 3), checkout_completed("evt_8", 1)):
+            assert (await self.post(client, event)).status_code == 200
+        repo = service_factory.booking_repo
+        complete_pending = repo.complete_pending
+
+        async def failing_for_booking_1(db, payments):
+            if 1 in payments:
+                raise RuntimeError("deadlock detected")
+            return await complete_pending(db, payments)
+
+        monkeypatch.setattr(repo, "complete_pending", AsyncMock(side_effect=failing_for_booking_1))
+        worker = StripeWebhookWorker(service_factory.webhook_event_repo, service_factory.booking_service,
+                                     session_maker=async_sessionmaker(test_engine, expire_on_commit=False))
+        # Сбой пачки: цикл должен подождать poll_interval, а не забрать события сразу
+        assert await worker.process_batch() == 0
+
+        booking = await db.get(Booking, 3, populate_existing=True)
+        assert booking.status == StatusBooking.COMPLETED
+        failed = await db.get(WebhookEvent, "evt_8", populate_existing=True)
+        assert failed.processed_at is None
+        assert failed.attempts == 1
+        assert "deadlock detected" in failed.last_error
+        assert failed.next_attempt_at > datetime.utcnow()
+        # Отложенное событие не забирается до next_attempt_at
+        assert await worker.process_batch() == 0
+        assert (await db.get(Booking, 1, populate_existing=True)).status == StatusBooking.PENDING
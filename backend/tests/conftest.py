@@ -8,11 +8,13 @@ from unittest.mock import AsyncMock
 import pytest
 
 from httpx import AsyncClient, ASGITransport
-from sqlalchemy import text
+from sqlalchemy import Integer, text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlmodel import SQLModel
 
 from backend.app.dependencies.service_factory import service_factory
+from backend.app.services.booking.stripe_checkout import StripeCheckout
+from backend.tests.utils.fake_stripe import FakeStripeServer
 from backend.tests.utils.utils import load_users, load_stadiums, load_reviews, load_bookings
 
 from backend.core.config import settings
@@ -104,6 +106,9 @@ async def test_data(db: AsyncSession):
 
         # Сбрасываем автоинкрементные последовательности
         for table in SQLModel.metadata.sorted_tables:
+            # Последовательность есть только у целочисленного id
+            if "id" not in table.c or not isinstance(table.c.id.type, Integer):
+                continue
             table_name = table.name
             sequence_name = f"{table_name}_id_seq"
             try:
@@ -133,13 +138,43 @@ def mock_redis(monkeypatch):
     async_mock.cache_data.return_value = None
     async_mock.delete_cache_by_prefix.return_value = None
     async_mock.invalidate_cache = AsyncMock(return_value=None)
+    async_mock.fetch_hash.return_value = None
+    async_mock.get_generation.return_value = None
 
     monkeypatch.setattr(redis, "get_client", AsyncMock(return_value=async_mock))
     monkeypatch.setattr(redis, "fetch_cached_data", async_mock.fetch_cached_data)
     monkeypatch.setattr(redis, "cache_data", async_mock.cache_data)
+    monkeypatch.setattr(redis, "delete_cache", async_mock.delete_cache)
     monkeypatch.setattr(redis, "delete_cache_by_prefix", async_mock.delete_cache_by_prefix)
     monkeypatch.setattr(redis, "invalidate_cache", async_mock.invalidate_cache)
+    monkeypatch.setattr(redis, "fetch_hash", async_mock.fetch_hash)
+    monkeypatch.setattr(redis, "cache_hash", async_mock.cache_hash)
+    monkeypatch.setattr(redis, "cache_entry", async_mock.cache_entry)
+    monkeypatch.setattr(redis, "get_generation", async_mock.get_generation)
+    monkeypatch.setattr(redis, "cache_hash_if_generation", async_mock.cache_hash_if_generation)
+    monkeypatch.setattr(redis, "bump_generation", async_mock.bump_generation)
 
     return async_mock  # Возвращаем мок для проверок
 
 
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    # Таблицы пересоздаются на каждый тест, локальный кеш пользователей не должен их пережить
+    service_factory.user_cache.clear()
+
+
+@pytest.fixture
+def fake_stripe():
+    """Локальная заглушка API Stripe на свободном порту."""
+    server = FakeStripeServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+async def stripe_checkout(fake_stripe, monkeypatch):
+    """Checkout-сессии BookingService создаются в fake_stripe."""
+    checkout = StripeCheckout(service_factory.redis_client, api_key="sk_test_fake", api_base=fake_stripe.url)
+    monkeypatch.setattr(service_factory.booking_service, "checkout", checkout)
+    yield checkout
+    await checkout.close()
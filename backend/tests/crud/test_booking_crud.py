@@ -1,10 +1,15 @@
 
+from datetime import datetime, time
+from decimal import Decimal
+
 import pytest
 from fastapi import HTTPException
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from backend.app.dependencies.service_factory import service_factory
 from backend.app.models.bookings import BookingCreate
+from backend.app.models.stadiums import PriceInterval, Stadium
+from backend.app.services.booking.price_schedule import PriceSchedule, PriceScheduleCache
 
 
 
@@ -14,7 +19,7 @@ from backend.app.models.bookings import BookingCreate
 class TestCrudBooking:
     @pytest.mark.parametrize("expected_exception, status_code, detail, user_id, start_time, end_time, stadium_id", [
         (None, 200, None, 1, "2024-12-08 14:00:00", "2024-12-08 16:00:00", 2),
-        (HTTPException, 400, {"detail": "Этот промежуток времени уже забронирован."}, 2, "2024-08-04T09:33:00", "2024-08-04T15:33:00", 2),
+        (HTTPException, 409, {"detail": "Этот промежуток времени уже забронирован."}, 2, "2024-08-04T09:33:00", "2024-08-04T15:33:00", 2),
         (HTTPException, 400, {"detail": "Этот стадион не активен для бронирования"}, 2, "2024-12-08 10:00:00", "2024-12-08 11:00:00", 1),
         (HTTPException, 400, {"detail": "Время окончания должно быть больше времени начала."}, 2, "2024-12-08 14:00:00", "2024-11-08 14:00:00",
          2),
@@ -46,3 +51,38 @@ class TestCrudBooking:
         with pytest.raises(HTTPException) as exc_info:
             await service_factory.booking_repo.get_or_404(db=db, object_id=3)
         assert exc_info.value.status_code == 404
+
+
+class TestPriceSchedule:
+    intervals = [
+        PriceInterval(id=1, stadium_id=1, start_time=time(10), end_time=time(12), price=Decimal(500)),
+        PriceInterval(id=2, stadium_id=1, start_time=time(10), end_time=time(12), price=Decimal(700), day_of_week=5),
+        PriceInterval(id=3, stadium_id=1, start_time=time(0), end_time=time(1), price=Decimal(50), day_of_week=0),
+    ]
+
+    @pytest.mark.parametrize("start_time, end_time, expected", [
+        ("2025-03-05 08:00:00", "2025-03-05 09:00:00", 600),  # только default_price
+        ("2025-03-05 09:30:00", "2025-03-05 11:00:00", 1300),  # ежедневный интервал
+        ("2025-03-08 10:00:00", "2025-03-08 11:00:00", 1400),  # интервал субботы приоритетнее ежедневного
+        ("2025-03-05 09:45:00", "2025-03-05 10:00:00", 300),  # неполный слот без пересечения
+        ("2025-03-09 23:00:00", "2025-03-10 01:00:00", 700),  # ночная бронь с переходом на понедельник
+        ("2025-03-03 00:00:00", "2025-03-10 00:00:00", 106700),  # ровно неделя
+    ])
+    def test_calculate(self, start_time, end_time, expected):
+        schedule = PriceSchedule(Decimal(300), self.intervals)
+        total = schedule.calculate(datetime.fromisoformat(start_time), datetime.fromisoformat(end_time))
+        assert total == Decimal(expected)
+
+    def test_cache_invalidation(self):
+        cache = PriceScheduleCache()
+        stadium = Stadium(id=1, name="name", slug="slug", address="address", country="country", city="city",
+                          default_price=Decimal(300))
+        stadium.price_intervals = []
+        assert cache.get(stadium) is cache.get(stadium)
+
+        stadium.price_intervals = self.intervals
+        schedule = cache.get(stadium)
+        assert schedule.calculate(datetime(2025, 3, 5, 10), datetime(2025, 3, 5, 11)) == Decimal(1000)
+
+        cache.invalidate(stadium.id)
+        assert cache.get(stadium) is not schedule
@@ -0,0 +1,50 @@
+import pytest
+
+from backend.app.dependencies.service_factory import service_factory
+from backend.app.models.stadiums import StadiumsRead
+from backend.app.services.redis import RedisClient, TAG_PREFIX
+
+VENDOR = "stadiums:vendor:1"
+
+
+@pytest.fixture
+async def redis_cache():
+    """Настоящий Redis в отдельной базе: теги и Lua-скрипты моком не проверить."""
+    cache = RedisClient(service_factory.redis_client.redis_url.rstrip("/") + "/15")
+    client = await cache.get_client()
+    await client.flushdb()
+    yield cache
+    await client.flushdb()
+    await cache.disconnect()
+
+
+@pytest.mark.anyio
+class TestCacheTags:
+    async def test_prefix_invalidation_deletes_tagged_keys(self, redis_cache):
+        await redis_cache.cache_data(f"{VENDOR}:page1:size2", [], StadiumsRead, tags=[VENDOR])
+        await redis_cache.cache_entry(f"{VENDOR}:cursorabc:size2:total0", {"value": "[]"}, tags=[VENDOR])
+        await redis_cache.cache_data("stadiums:vendor:2:page1:size2", [], StadiumsRead, tags=["stadiums:vendor:2"])
+        await redis_cache.cache_entry("stadium:1:detail", {"value": "{}"})
+
+        client = await redis_cache.get_client()
+        # Регистрируются только явно переданные теги, а не все префиксы ключа
+        assert set(await client.keys(TAG_PREFIX + "*")) == {TAG_PREFIX + VENDOR, TAG_PREFIX + "stadiums:vendor:2"}
+
+        await redis_cache.delete_cache_by_prefix(VENDOR)
+        assert not await client.exists(f"{VENDOR}:page1:size2", f"{VENDOR}:cursorabc:size2:total0",
+                                       TAG_PREFIX + VENDOR)
+        assert await client.exists("stadiums:vendor:2:page1:size2")
+
+        # Ключ без тегов сбрасывается по собственному имени
+        await redis_cache.delete_cache_by_prefix("stadium:1:detail")
+        assert not await client.exists("stadium:1:detail")
+
+    async def test_expired_keys_are_pruned_from_tag(self, redis_cache):
+        client = await redis_cache.get_client()
+        for page in range(5):
+            await redis_cache.cache_data(f"{VENDOR}:page{page}:size2", [], StadiumsRead, tags=[VENDOR])
+        await client.delete(*[f"{VENDOR}:page{page}:size2" for page in range(5)])
+
+        await redis_cache.cache_data(f"{VENDOR}:page9:size2", [], StadiumsRead, tags=[VENDOR])
+        assert await client.smembers(TAG_PREFIX + VENDOR) == {f"{VENDOR}:page9:size2"}
+        assert 0 < await client.ttl(TAG_PREFIX + VENDOR) <= 600
@@ -0,0 +1,160 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from starlette.websockets import WebSocketState
+
+from backend.app.services.chat.connection_hub import ConnectionHub, SLOW_CONSUMER_CLOSE_CODE, HEARTBEAT_CLOSE_CODE
+
+
+class FakeWebSocket:
+    def __init__(self, delay: float = 0):
+        self.delay = delay
+        self.sent = []
+        self.closed_with = None
+        self.application_state = WebSocketState.CONNECTED
+        self.incoming: asyncio.Queue = asyncio.Queue()
+
+    async def receive(self):
+        return await self.incoming.get()
+
+    async def send_text(self, message: str):
+        await asyncio.sleep(self.delay)
+        self.sent.append(json.loads(message))
+
+    async def close(self, code: int):
+        self.closed_with = code
+        self.application_state = WebSocketState.DISCONNECTED
+
+
+class FakePubSub:
+    """Pub/sub, который, как Redis, присылает ответ на отписку сообщением."""
+
+    def __init__(self):
+        self.channels = set()
+        self.messages: asyncio.Queue = asyncio.Queue()
+
+    @property
+    def subscribed(self) -> bool:
+        return bool(self.channels)
+
+    async def subscribe(self, channel: str):
+        self.channels.add(channel)
+
+    async def unsubscribe(self, channel: str):
+        self.channels.discard(channel)
+        await self.messages.put(None)
+
+    async def get_message(self, ignore_subscribe_messages: bool, timeout):
+        return await self.messages.get()
+
+    async def aclose(self):
+        pass
+
+
+@pytest.fixture
+def hub():
+    redis = MagicMock()
+    redis.pubsub = AsyncMock(return_value=AsyncMock(subscribed=False))
+    hub = ConnectionHub(redis, queue_size=2, ping_interval=0.05, pong_timeout=0.05)
+    # Публикация доставляется сразу в этот же воркер, как если бы ее вернул Redis
+    redis.publish = AsyncMock(side_effect=lambda channel, message: hub.deliver(
+        int(channel.removeprefix("ws:user:")), message))
+    return hub
+
+
+@pytest.mark.anyio
+class TestConnectionHub:
+    async def test_publish_reaches_every_socket_of_user(self, hub):
+        first, second, other = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+        await hub.connect(1, first)
+        await hub.connect(1, second)
+        await hub.connect(2, other)
+
+        await hub.publish(1, {"content": "hi"})
+        await asyncio.sleep(0.01)
+
+        assert first.sent == second.sent == [{"content": "hi"}]
+        assert other.sent == []
+        assert hub.stats() == {"users": 2, "connections": 3}
+        await hub.close()
+
+    async def test_slow_socket_is_dropped(self, hub):
+        slow, fast = FakeWebSocket(delay=1), FakeWebSocket()
+        slow_connection = await hub.connect(1, slow)
+        await hub.connect(1, fast)
+
+        for i in range(5):
+            await hub.publish(1, {"content": i})
+            await asyncio.sleep(0.001)
+        await asyncio.sleep(0.01)
+
+        assert slow.closed_with == SLOW_CONSUMER_CLOSE_CODE
+        assert slow_connection not in hub._connections[1]
+        assert [message["content"] for message in fast.sent] == list(range(5))
+        await hub.close()
+
+    async def test_serve_answers_ping_and_closes_silent_socket(self, hub):
+        websocket = FakeWebSocket()
+        connection = await hub.connect(1, websocket)
+        serving = asyncio.create_task(hub.serve(connection))
+
+        await websocket.incoming.put({"type": "websocket.receive", "text": '{"type": "ping"}'})
+        await asyncio.sleep(0.01)
+        assert websocket.sent == [{"type": "pong"}]
+
+        # Клиент молчит: ping после ping_interval, закрытие после pong_timeout
+        await asyncio.wait_for(serving, timeout=1)
+        assert websocket.sent[-1] == {"type": "ping"}
+        assert websocket.closed_with == HEARTBEAT_CLOSE_CODE
+        assert hub.stats()["connections"] == 0
+
+    async def test_serve_returns_on_disconnect(self, hub):
+        websocket = FakeWebSocket()
+        connection = await hub.connect(1, websocket)
+        await websocket.incoming.put({"type": "websocket.disconnect", "code": 1000})
+        await asyncio.wait_for(hub.serve(connection), timeout=1)
+        await hub.disconnect(connection)
+        assert hub.stats()["connections"] == 0
+
+    async def test_listener_stops_without_channels(self):
+        pubsub = FakePubSub()
+        redis = MagicMock()
+        redis.pubsub = AsyncMock(return_value=pubsub)
+        hub = ConnectionHub(redis)
+
+        connection = await hub.connect(1, FakeWebSocket())
+        listener = hub._listener
+        await asyncio.sleep(0.01)
+        assert not listener.done()
+
+        # Последний сокет ушел: слушатель завершается, а не просыпается впустую
+        await hub.disconnect(connection)
+        await asyncio.wait_for(listener, timeout=1)
+
+        websocket = FakeWebSocket()
+        await hub.connect(2, websocket)
+        assert hub._listener is not listener and not hub._listener.done()
+        await pubsub.messages.put({"type": "message", "channel": "ws:user:2", "data": json.dumps({"content": "hi"})})
+        await asyncio.sleep(0.01)
+        assert websocket.sent == [{"content": "hi"}]
+        await hub.close()
+
+    async def test_failed_subscribe_rolls_back_connection(self):
+        pubsub = FakePubSub()
+        pubsub.subscribe = AsyncMock(side_effect=[ConnectionError("redis down"), None])
+        redis = MagicMock()
+        redis.pubsub = AsyncMock(return_value=pubsub)
+        hub = ConnectionHub(redis)
+
+        with pytest.raises(ConnectionError):
+            await hub.connect(1, FakeWebSocket())
+        assert hub.stats() == {"users": 0, "connections": 0}
+
+        # Следующий сокет пользователя снова подписывает канал, а не считает его подписанным
+        connection = await hub.connect(1, FakeWebSocket())
+        assert pubsub.subscribe.await_count == 2
+        assert not connection.sender.done()
+        await hub.disconnect(connection)
+        await hub.close()
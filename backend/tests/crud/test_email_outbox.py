@@ -0,0 +1,148 @@
+import socket
+from datetime import datetime
+
+import pytest
+from aiosmtpd.controller import Controller
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from backend.app.models.email_outbox import EmailOutbox, EmailStatus
+from backend.app.repositories.email_outbox_repository import EmailOutboxRepository
+from backend.app.services.email.email import SmtpClient
+from backend.app.services.email.outbox_worker import EmailOutboxWorker
+
+
+class SinkHandler:
+    """SMTP-сервер в процессе теста: принимает письма, адреса из rejected отклоняет с заданным кодом."""
+
+    def __init__(self):
+        self.messages = []
+        self.peers = set()
+        self.rejected = {}
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address in self.rejected:
+            return self.rejected[address]
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        self.peers.add(session.peer)
+        return "250 Message accepted for delivery"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_sink():
+    handler = SinkHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    yield handler, controller.port
+    controller.stop()
+
+
+def make_worker(test_engine, port: int, **kwargs) -> EmailOutboxWorker:
+    smtp = SmtpClient(host="127.0.0.1", port=port, user=None, password=None, tls=False, ssl=False,
+                      mail_from=("Korobka", "noreply@korobka.test"))
+    options = {"poll_interval": 0.01, "batch_size": 10, "max_attempts": 3, "retry_delay": 30, **kwargs}
+    return EmailOutboxWorker(EmailOutboxRepository(), smtp,
+                             session_maker=async_sessionmaker(test_engine, expire_on_commit=False), **options)
+
+
+async def enqueue(db, *addresses: str) -> list:
+    repository = EmailOutboxRepository()
+    messages = [await repository.enqueue(db, email_to=address, subject="Тема", html="<b>Пароль: 123</b>")
+                for address in addresses]
+    await db.commit()
+    return messages
+
+
+async def reload(db, messages: list) -> list:
+    for message in messages:
+        await db.refresh(message)
+    return messages
+
+
+@pytest.mark.anyio
+class TestEmailOutbox:
+    @pytest.fixture(autouse=True)
+    async def clean_outbox(self, db):
+        yield
+        await db.execute(delete(EmailOutbox))
+        await db.commit()
+
+    async def test_batch_is_sent_over_one_connection(self, db, test_engine, smtp_sink):
+        handler, port = smtp_sink
+        messages = await enqueue(db, "a@korobka.test", "b@korobka.test", "c@korobka.test")
+        worker = make_worker(test_engine, port)
+
+        assert await worker.process_batch() == 3
+        await worker.stop()
+
+        assert sorted(envelope.rcpt_tos[0] for envelope in handler.messages) == \
+            ["a@korobka.test", "b@korobka.test", "c@korobka.test"]
+        assert len(handler.peers) == 1
+        for message in await reload(db, messages):
+            assert message.status == EmailStatus.SENT
+            assert message.html is None
+            assert message.attempts == 1
+
+    async def test_rejected_recipients(self, db, test_engine, smtp_sink):
+        handler, port = smtp_sink
+        handler.rejected = {"gone@korobka.test": "550 No such user", "busy@korobka.test": "451 Try again later"}
+        gone, busy, ok = await enqueue(db, "gone@korobka.test", "busy@korobka.test", "ok@korobka.test")
+        worker = make_worker(test_engine, port)
+
+        await worker.process_batch()
+        await worker.stop()
+
+        gone, busy, ok = await reload(db, [gone, busy, ok])
+        assert gone.status == EmailStatus.FAILED and gone.html is None
+        assert busy.status == EmailStatus.PENDING and busy.attempts == 1
+        assert busy.next_attempt_at > datetime.utcnow()
+        assert ok.status == EmailStatus.SENT
+        assert [envelope.rcpt_tos for envelope in handler.messages] == [["ok@korobka.test"]]
+
+    async def test_unreachable_server_does_not_spend_attempts(self, db, test_engine, smtp_sink):
+        handler, port = smtp_sink
+        first, second = await enqueue(db, "a@korobka.test", "b@korobka.test")
+        worker = make_worker(test_engine, free_port(), max_attempts=1)
+
+        # Сервер лежит: ни одно письмо не попробовано, воркер ждет с нарастающей задержкой
+        assert await worker.process_batch() == 0
+        assert await worker.process_batch() == 0
+        assert worker.connection_failures == 2
+        assert worker._next_poll_delay() == 60
+
+        first, second = await reload(db, [first, second])
+        assert first.status == second.status == EmailStatus.PENDING
+        assert first.attempts == second.attempts == 0
+        assert first.html is not None
+
+        # Сервер вернулся - письма уходят с первой попытки
+        worker.smtp.port = port
+        assert await worker.process_batch() == 2
+        await worker.stop()
+        assert worker.connection_failures == 0
+        first, second = await reload(db, [first, second])
+        assert first.status == second.status == EmailStatus.SENT
+
+    async def test_stats_report_queue_depth(self, db, test_engine, smtp_sink):
+        _, port = smtp_sink
+        await enqueue(db, "a@korobka.test", "b@korobka.test")
+        worker = make_worker(test_engine, port, batch_size=1)
+
+        assert (await worker.stats(db))["pending"] == 2
+        await worker.process_batch()
+        stats = await worker.stats(db)
+        await worker.stop()
+
+        assert stats["pending"] == 1
+        assert stats["due"] == 1
+        assert stats["sent_total"] == 1
@@ -0,0 +1,46 @@
+import os
+
+import pytest
+
+from backend.app.services.email.template_registry import EmailTemplateRegistry
+from backend.core.config import settings
+
+
+@pytest.fixture
+def template_dir(tmp_path):
+    (tmp_path / "hello.html").write_text("<p>Привет, {{ name }}</p>")
+    return tmp_path
+
+
+class TestEmailTemplateRegistry:
+    def test_project_templates_compile(self):
+        registry = EmailTemplateRegistry(settings.EMAIL_TEMPLATE_DIR)
+        registry.load()
+
+        html = registry.render("reset_password.html", project_name="KOROBKA", username="u@korobka.test",
+                               email="u@korobka.test", valid_hours=48, link="http://test/reset")
+        assert "http://test/reset" in html
+
+    def test_render_uses_compiled_template(self, template_dir):
+        registry = EmailTemplateRegistry(str(template_dir))
+        registry.load()
+        (template_dir / "hello.html").write_text("<p>Изменено</p>")
+
+        assert registry.render("hello.html", name="Korobka") == "<p>Привет, Korobka</p>"
+
+    def test_auto_reload_picks_up_changes(self, template_dir):
+        registry = EmailTemplateRegistry(str(template_dir), auto_reload=True)
+        assert registry.render("hello.html", name="Korobka") == "<p>Привет, Korobka</p>"
+
+        path = template_dir / "hello.html"
+        mtime = path.stat().st_mtime
+        path.write_text("<p>Пока, {{ name }}</p>")
+        # Jinja сравнивает mtime, в пределах одной отметки времени файловой системы он может совпасть
+        os.utime(path, (mtime + 10, mtime + 10))
+
+        assert registry.render("hello.html", name="Korobka") == "<p>Пока, Korobka</p>"
+
+    def test_unknown_template(self, template_dir):
+        registry = EmailTemplateRegistry(str(template_dir))
+        with pytest.raises(LookupError):
+            registry.render("missing.html")
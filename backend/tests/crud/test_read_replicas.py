@@ -0,0 +1,121 @@
+import time
+
+import pytest
+from sqlalchemy import delete, insert, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from starlette.requests import Request
+
+from backend.app.models import WebhookEvent
+from backend.core.config import settings
+from backend.core.db import DatabaseSessionManager, LAST_WRITE_SESSION_KEY, LAST_WRITE_USER_KEY
+from backend.core.security import create_access_token
+
+
+def make_request(session: dict = None, token: str = None) -> Request:
+    scope = {"type": "http", "headers": [(b"authorization", f"Bearer {token}".encode())] if token else []}
+    if session is not None:
+        scope["session"] = session
+    return Request(scope)
+
+
+class WriteMarks:
+    """Флаги записи в памяти вместо Redis."""
+
+    def __init__(self):
+        self.flags = {}
+
+    async def set_flag(self, key: str, ttl: float) -> None:
+        self.flags[key] = time.time() + ttl
+
+    async def has_flag(self, key: str) -> bool:
+        return self.flags.get(key, 0) > time.time()
+
+
+@pytest.fixture
+async def engines(test_engine):
+    """Вторая "реплика" - отдельный движок к той же тестовой БД, битая - к закрытому порту."""
+    replica = create_async_engine(settings.database_url)
+    broken = create_async_engine(settings.database_url.replace(f":{settings.POSTGRES_PORT}/", ":1/"))
+    yield test_engine, replica, broken
+    await replica.dispose()
+    await broken.dispose()
+
+
+def manager_for(primary, *replicas) -> DatabaseSessionManager:
+    maker = lambda engine: async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    return DatabaseSessionManager(maker(primary), replicas=[maker(replica) for replica in replicas],
+                                  read_your_writes_window=5, health_interval=1, max_lag=10)
+
+
+async def read_bind(manager: DatabaseSessionManager, request: Request):
+    sessions = manager.get_read_session(request)
+    session = await sessions.__anext__()
+    await session.execute(text("SELECT 1"))
+    bind = session.bind
+    await sessions.aclose()
+    return bind
+
+
+@pytest.mark.anyio
+class TestReadReplicas:
+    async def test_round_robin_over_replicas(self, engines):
+        primary, replica, _ = engines
+        manager = manager_for(primary, replica, primary)
+
+        binds = [await read_bind(manager, make_request()) for _ in range(4)]
+        assert binds == [replica, primary, replica, primary]
+
+    async def test_unhealthy_replica_leaves_rotation(self, engines):
+        primary, replica, broken = engines
+        manager = manager_for(primary, replica, broken)
+
+        await manager.check_replicas()
+        assert [r.healthy for r in manager.replicas] == [True, False]
+        assert manager.replicas[1].last_error
+        assert {await read_bind(manager, make_request()) for _ in range(3)} == {replica}
+
+    async def test_no_healthy_replicas_falls_back_to_primary(self, engines):
+        primary, _, broken = engines
+        manager = manager_for(primary, broken)
+
+        await manager.check_replicas()
+        assert await read_bind(manager, make_request()) is primary
+
+    async def test_read_your_writes(self, engines):
+        primary, replica, _ = engines
+        manager = manager_for(primary, replica)
+        request = make_request(session={})
+
+        writes = manager.get_transaction_session(request)
+        await writes.__anext__()
+        with pytest.raises(StopAsyncIteration):
+            await writes.__anext__()
+
+        assert LAST_WRITE_SESSION_KEY in request.session
+        assert await read_bind(manager, request) is primary
+        # Окно прошло - снова реплика
+        request.session[LAST_WRITE_SESSION_KEY] = time.time() - 10
+        assert await read_bind(manager, request) is replica
+
+    async def test_read_your_writes_by_token(self, engines):
+        """Клиент без cookie-сессии (мобильное приложение) узнается по пользователю из bearer-токена."""
+        primary, replica, _ = engines
+        manager = manager_for(primary, replica)
+        manager.write_marks = WriteMarks()
+        token = create_access_token(7)
+
+        # Запись в SessionDep, закоммиченная самим обработчиком или репозиторием
+        writes = manager.get_session(make_request(token=token))
+        session = await writes.__anext__()
+        await session.execute(insert(WebhookEvent).values(id="evt_ryw", type="test", payload={}))
+        await session.commit()
+        with pytest.raises(StopAsyncIteration):
+            await writes.__anext__()
+
+        assert LAST_WRITE_USER_KEY.format(user_id=7) in manager.write_marks.flags
+        assert await read_bind(manager, make_request(token=token)) is primary
+        assert await read_bind(manager, make_request(token=create_access_token(8))) is replica
+
+        async with manager.session_maker() as session:
+            await session.execute(delete(WebhookEvent).where(WebhookEvent.id == "evt_ryw"))
+            await session.commit()
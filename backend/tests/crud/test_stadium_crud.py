@@ -1,11 +1,19 @@
+import asyncio
+import time
+from typing import List
+from unittest.mock import AsyncMock
+
 import pytest
 from fastapi import HTTPException
+from pydantic import TypeAdapter
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from backend.app.dependencies.service_factory import service_factory
+from backend.app.services.cache_codec import items_codec
+from backend.core.db import run_after_commit
 from backend.app.models.stadium_reviews import CreateReview, UpdateReview
 from backend.app.models.stadiums import StadiumCreate, StadiumsUpdate, StadiumStatus, StadiumVerificationUpdate, \
-    StadiumCreateWithInterval
+    StadiumCreateWithInterval, StadiumsRead
 
 
 @pytest.mark.anyio
@@ -146,6 +154,48 @@ class TestCrudStadium:
             assert updated_stadium.is_active == True
 
 
+    async def test_get_stadiums_single_flight(self, db, mock_redis, monkeypatch):
+        repo = service_factory.stadium_repo
+        get_many = repo.get_many
+        calls = 0
+
+        async def slow_get_many(*args, **kwargs):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return await get_many(*args, **kwargs)
+
+        monkeypatch.setattr(repo, "get_many", slow_get_many)
+        results = await asyncio.gather(*[service_factory.stadium_service.get_stadiums(db=db) for _ in range(5)])
+        assert calls == 1
+        assert all(result == results[0] for result in results)
+        mock_redis.cache_entry.assert_awaited_once()
+        assert mock_redis.cache_entry.await_args.args[0] == "stadiums:all_active"
+
+    async def test_cache_codec_round_trip(self, db):
+        stadiums = [StadiumsRead.model_validate(stadium)
+                    for stadium in await service_factory.stadium_repo.get_many(db=db, is_active=True)]
+        stadiums[0] = stadiums[0].model_copy(update={"slug": "2024"})
+        codec = items_codec(StadiumsRead)
+        assert codec.decode(codec.encode(stadiums)) == stadiums
+
+    async def test_get_stadiums_serves_stale_entry(self, db, mock_redis, monkeypatch):
+        cached = [StadiumsRead.model_validate(stadium)
+                  for stadium in await service_factory.stadium_repo.get_many(db=db, is_active=True)]
+        mock_redis.fetch_hash.return_value = {
+            "value": TypeAdapter(List[StadiumsRead]).dump_json(cached).decode(),
+            "expires_at": time.time() - 1,
+            "delta": 0.01,
+        }
+        refreshes = []
+        monkeypatch.setattr(service_factory.stadium_repo, "get_many",
+                            AsyncMock(side_effect=lambda **kwargs: refreshes.append(kwargs) or []))
+
+        assert await service_factory.stadium_service.get_stadiums(db=db) == cached
+        await asyncio.sleep(0.05)
+        assert len(refreshes) == 1
+
+
 @pytest.mark.usefixtures("db", "test_data")
 @pytest.mark.anyio
 class TestCrudReview:
@@ -181,7 +231,7 @@ class TestCrudReview:
             assert created_review is not None
             assert created_review.review == create_schema.review
 
-    async def test_update_review(self, db: AsyncSession):
+    async def test_update_review(self, db: AsyncSession, mock_redis):
 
         user = await service_factory.user_repo.get_or_404(db=db, object_id=1)
         update_schema = UpdateReview(
@@ -190,6 +240,15 @@ class TestCrudReview:
         await service_factory.review_service.update_review(db, schema=update_schema, user=user, review_id=3)
         updated_review = await service_factory.review_repo.get_or_404(db=db, object_id=3)
         assert updated_review.review == update_schema.review
+        detail_key = f"stadium:{updated_review.stadium_id}:detail"
+        invalidated = [call.args[0] for call in mock_redis.invalidate_cache.await_args_list]
+        assert detail_key in invalidated
+
+        # Повторный сброс после коммита: промах до коммита мог вернуть в кеш старую деталь
+        await db.commit()
+        await run_after_commit(db)
+        invalidated_after = [call.args[0] for call in mock_redis.invalidate_cache.await_args_list]
+        assert invalidated_after.count(detail_key) > invalidated.count(detail_key)
 
     async def test_delete_review(self, db: AsyncSession):
         user = await service_factory.user_repo.get_or_404(db=db, object_id=1)
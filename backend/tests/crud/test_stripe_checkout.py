@@ -0,0 +1,53 @@
+import pytest
+from fastapi import HTTPException
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.app.dependencies.service_factory import service_factory
+from backend.app.services.booking.stripe_checkout import checkout_cache_key
+
+SUCCESS_URL = "http://test/success"
+CANCEL_URL = "http://test/cancel"
+
+
+@pytest.fixture
+def redis_hashes(mock_redis):
+    """Хеши Redis в памяти, чтобы кеш сессий работал между вызовами."""
+    store = {}
+    mock_redis.fetch_hash.side_effect = lambda key: store.get(key)
+    mock_redis.cache_hash.side_effect = lambda key, mapping, expire_time=600: store.__setitem__(key, mapping)
+    mock_redis.delete_cache.side_effect = lambda *keys: [store.pop(key, None) for key in keys]
+    return store
+
+
+async def pay(db: AsyncSession, booking_id: int) -> str:
+    return await service_factory.booking_service.create_payment_session(
+        db=db, booking_id=booking_id, success_url=SUCCESS_URL, cancel_url=CANCEL_URL)
+
+
+@pytest.mark.anyio
+@pytest.mark.usefixtures("db", "test_data")
+class TestStripeCheckout:
+    async def test_repeat_click_reuses_cached_session(self, db, fake_stripe, stripe_checkout, redis_hashes):
+        first = await pay(db, 1)
+        second = await pay(db, 1)
+
+        assert first == second == "https://checkout.stripe.test/pay/cs_test_1"
+        assert len(fake_stripe.requests) == 1
+        assert fake_stripe.requests[0]["form"]["metadata[booking_id]"] == "1"
+        assert redis_hashes[checkout_cache_key(1)]["session_id"] == "cs_test_1"
+
+    async def test_cache_miss_is_idempotent(self, db, fake_stripe, stripe_checkout, mock_redis):
+        # mock_redis ничего не хранит: оба запроса доходят до Stripe с одним ключом идемпотентности
+        first = await pay(db, 2)
+        second = await pay(db, 2)
+
+        assert first == second
+        assert len(fake_stripe.sessions) == 1
+        keys = {request["idempotency_key"] for request in fake_stripe.requests}
+        assert len(fake_stripe.requests) == 2 and len(keys) == 1
+
+    async def test_stripe_error(self, db, fake_stripe, stripe_checkout):
+        fake_stripe.fail_with = 400
+        with pytest.raises(HTTPException) as exc_info:
+            await pay(db, 3)
+        assert exc_info.value.status_code == 502
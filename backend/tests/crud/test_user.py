@@ -3,6 +3,7 @@ import uuid
 
 import pytest
 from datetime import timedelta
+from unittest.mock import call
 from fastapi import status, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -12,6 +13,7 @@ from backend.app.models.auth import VerificationOut, VerificationCreate
 from backend.app.models.users import UserUpdate, UpdatePassword, UserCreate, StatusEnum
 
 from backend.core import security
+from backend.core.db import run_after_commit
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -24,15 +26,34 @@ class TestPermissions:
     async def test_get_current_user(self, db,) -> None:
         user = await service_factory.user_repo.get_by_email(db, "vendor@gmail.com")
         token = security.create_access_token(user.id)
-        result_user = await get_current_user(db, token)
+        result_user = await get_current_user(token)
         assert result_user.id == user.id
 
+    async def test_get_current_user_cached(self, db, mock_redis) -> None:
+        token = security.create_access_token(1)
+        stats = service_factory.user_cache.stats()
+        await get_current_user(token)
+        user = await get_current_user(token)
+        assert service_factory.user_cache.stats()["misses"] == stats["misses"] + 1
+        assert service_factory.user_cache.stats()["local_hits"] == stats["local_hits"] + 1
+
+        update_schema = UserUpdate(email=user.email, first_name="Cached", last_name="User")
+        await service_factory.user_service.update_user(db=db, model=user, schema=update_schema)
+        mock_redis.delete_cache.assert_any_await("user:auth:1")
+        invalidations = mock_redis.delete_cache.await_args_list.count(call("user:auth:1"))
+        # Промах кеша читает пользователя в своей сессии и видит только закоммиченное,
+        # поэтому кеш сбрасывается еще раз после коммита
+        await db.commit()
+        await run_after_commit(db)
+        assert mock_redis.delete_cache.await_args_list.count(call("user:auth:1")) == invalidations + 1
+        assert (await get_current_user(token)).first_name == "Cached"
+
     async def test_get_current_user_invalid_token(self, db: AsyncSession) -> None:
         """Тест с недействительным токеном """
         invalid_token = "invalid.token.here"
 
         with pytest.raises(HTTPException) as exc_info:
-            await get_current_user(db, invalid_token)
+            await get_current_user(invalid_token)
         assert exc_info.value.status_code == status.HTTP_403_FORBIDDEN
         assert exc_info.value.detail == "Could not validate credentials"
 
@@ -42,7 +63,7 @@ class TestPermissions:
         token = security.create_access_token(invalid_user_id)
 
         with pytest.raises(HTTPException) as exc_info:
-            await get_current_user(db, token)
+            await get_current_user(token)
 
         assert exc_info.value.status_code == status.HTTP_404_NOT_FOUND
         assert exc_info.value.detail == "Объект не найден"
@@ -0,0 +1,76 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+
+class FakeStripeServer:
+    """
+    Локальная заглушка API Stripe для тестов: создает checkout-сессии и, как настоящий Stripe,
+    на повторный Idempotency-Key возвращает сохраненный ответ вместо новой сессии.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.sessions = {}
+        self.idempotent_responses = {}
+        self.fail_with = None
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeStripeServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def create_session(self, path: str, form: dict, idempotency_key: str | None) -> tuple[int, dict]:
+        with self._lock:
+            self.requests.append({"path": path, "form": form, "idempotency_key": idempotency_key})
+            if self.fail_with:
+                return self.fail_with, {"error": {"type": "api_error", "message": "Fake Stripe failure"}}
+            if idempotency_key in self.idempotent_responses:
+                return 200, self.idempotent_responses[idempotency_key]
+            session_id = f"cs_test_{len(self.sessions) + 1}"
+            session = {
+                "id": session_id,
+                "object": "checkout.session",
+                "url": f"https://checkout.stripe.test/pay/{session_id}",
+                "mode": form.get("mode"),
+                "metadata": {"booking_id": form.get("metadata[booking_id]")},
+            }
+            self.sessions[session_id] = session
+            if idempotency_key:
+                self.idempotent_responses[idempotency_key] = session
+            return 200, session
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode()
+                form = {key: values[-1] for key, values in parse_qs(body).items()}
+                if self.path == "/v1/checkout/sessions":
+                    status, payload = fake.create_session(self.path, form, self.headers.get("Idempotency-Key"))
+                else:
+                    status, payload = 404, {"error": {"type": "invalid_request_error", "message": self.path}}
+                raw = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(raw)))
+                self.end_headers()
+                self.wfile.write(raw)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,98 @@
+"""
+Сравнение сериализации кеша: json + deserialize_datetime против кодека схемы (backend.app.services.cache_codec).
+
+Для --items стадионов (по умолчанию 10 000, как в списке stadiums:all_active) замеряется запись и чтение
+значения, которое хранится в Redis. Redis не нужен: сравнивается только сериализация.
+Прежний путь угадывал Decimal по строкам, поэтому на стадионах с числовым slug ("2024") он ломается;
+такие стадионы считаются отдельно.
+
+Запуск: python cache_codec_benchmark.py --items 10000 --rounds 5
+"""
+import argparse
+import json
+import statistics
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from backend.app.models.stadiums import StadiumsRead
+from backend.app.services.cache_codec import items_codec
+from backend.app.services.serialize import serialize_datetime
+
+
+def make_stadiums(count: int) -> list:
+    created = datetime(2024, 1, 1, 12, 0)
+    return [
+        StadiumsRead(
+            id=i, created_at=created + timedelta(minutes=i), updated_at=created + timedelta(minutes=i, seconds=30),
+            status="verified", is_active=True, user_id=i % 100 + 1, name=f"Стадион {i}",
+            slug=str(2000 + i) if i % 50 == 0 else f"stadium-{i}", address=f"ул. Спортивная, {i}",
+            description="Крытое поле с искусственным покрытием", additional_info=None,
+            default_price=Decimal("1500.50") + i, country="Россия", city="Москва", image_url=None,
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def legacy_deserialize(data: dict) -> dict:
+    """Прежний deserialize_datetime."""
+    for item in data["items"]:
+        if "created_at" in item:
+            item["created_at"] = datetime.fromisoformat(item["created_at"])
+        if "updated_at" in item:
+            item["updated_at"] = datetime.fromisoformat(item["updated_at"])
+        for key, value in item.items():
+            if isinstance(value, str) and value.replace(".", "", 1).isdigit():
+                item[key] = Decimal(value)
+    return data
+
+
+def legacy_encode(stadiums: list) -> str:
+    return json.dumps({"items": [stadium.model_dump() for stadium in stadiums]}, default=serialize_datetime)
+
+
+def legacy_decode(raw: str) -> tuple:
+    items, broken = [], 0
+    for item in legacy_deserialize(json.loads(raw))["items"]:
+        try:
+            items.append(StadiumsRead(**item))
+        except ValueError:
+            broken += 1
+    return items, broken
+
+
+def measure(rounds: int, func) -> float:
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main(args) -> None:
+    stadiums = make_stadiums(args.items)
+    codec = items_codec(StadiumsRead)
+
+    legacy_raw = legacy_encode(stadiums)
+    codec_raw = codec.encode(stadiums)
+    _, broken = legacy_decode(legacy_raw)
+    assert codec.decode(codec_raw) == stadiums
+
+    rows = [
+        ("json + serialize_datetime", measure(args.rounds, lambda: legacy_encode(stadiums)),
+         measure(args.rounds, lambda: legacy_decode(legacy_raw)), len(legacy_raw.encode())),
+        ("кодек схемы", measure(args.rounds, lambda: codec.encode(stadiums)),
+         measure(args.rounds, lambda: codec.decode(codec_raw)), len(codec_raw)),
+    ]
+    print(f"{args.items} стадионов, медиана из {args.rounds}")
+    for name, encode_ms, decode_ms, size in rows:
+        print(f"{name:<28} запись {encode_ms:8.2f} мс  чтение {decode_ms:8.2f} мс  {size / 1024:8.1f} КБ")
+    print(f"Прежний путь потерял стадионов с числовым slug: {broken}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=10_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    main(parser.parse_args())
@@ -0,0 +1,91 @@
+"""
+Сравнение инвалидации кеша: SCAN по префиксу против тегов RedisClient.
+
+В отдельной базе Redis создается --keys фоновых ключей и --pages закешированных страниц стадионов вендора,
+затем замеряется удаление stadiums:vendor:{id} прежним способом (SCAN MATCH по всему keyspace)
+и через тег (RedisClient.delete_cache_by_prefix).
+
+Запуск: python cache_invalidation_benchmark.py --redis-url redis://localhost:6379/15 --keys 1000000
+База очищается (FLUSHDB) до и после замера, поэтому база 0 требует явного --force.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import redis.asyncio as redis
+
+from backend.app.models.stadiums import StadiumsRead
+from backend.app.services.redis import RedisClient
+
+VENDOR_ID = 1
+PREFIX = f"stadiums:vendor:{VENDOR_ID}"
+
+
+async def fill_background(client: redis.Redis, count: int, batch: int = 10000) -> None:
+    for start in range(0, count, batch):
+        async with client.pipeline(transaction=False) as pipe:
+            for i in range(start, min(start + batch, count)):
+                pipe.set(f"stadiums:vendor:{VENDOR_ID + 1 + i % 1000}:page{i}", "x")
+            await pipe.execute()
+
+
+async def fill_vendor(cache: RedisClient, pages: int) -> None:
+    for page in range(1, pages + 1):
+        await cache.cache_data(f"{PREFIX}:page{page}:size2", [], StadiumsRead, tags=[PREFIX])
+
+
+async def scan_delete(client: redis.Redis, prefix: str) -> None:
+    """Прежняя реализация delete_cache_by_prefix."""
+    cursor = 0
+    while True:
+        cursor, keys = await client.scan(cursor=cursor, match=f"{prefix}*")
+        if keys:
+            await client.delete(*keys)
+        if cursor == 0:
+            break
+
+
+async def measure(rounds: int, prepare, invalidate) -> float:
+    timings = []
+    for _ in range(rounds):
+        await prepare()
+        started = time.perf_counter()
+        await invalidate()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+async def main(args) -> None:
+    client = redis.Redis.from_url(args.redis_url, decode_responses=True)
+    if client.connection_pool.connection_kwargs.get("db", 0) == 0 and not args.force:
+        raise SystemExit("Бенчмарк очищает базу Redis: укажите отдельную базу в --redis-url или --force")
+
+    cache = RedisClient(args.redis_url)
+    await client.flushdb()
+    try:
+        started = time.perf_counter()
+        await fill_background(client, args.keys)
+        print(f"Фоновые ключи: {args.keys} за {time.perf_counter() - started:.1f} с")
+
+        prepare = lambda: fill_vendor(cache, args.pages)
+        scan_ms = await measure(args.rounds, prepare, lambda: scan_delete(client, PREFIX + ":"))
+        tag_ms = await measure(args.rounds, prepare, lambda: cache.delete_cache_by_prefix(PREFIX))
+        assert not await client.exists(f"{PREFIX}:page1:size2")
+
+        print(f"SCAN по префиксу: {scan_ms:.2f} мс (медиана из {args.rounds})")
+        print(f"Тег:              {tag_ms:.2f} мс (медиана из {args.rounds})")
+    finally:
+        await client.flushdb()
+        await client.aclose()
+        await cache.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--redis-url", default="redis://localhost:6379/15")
+    parser.add_argument("--keys", type=int, default=1_000_000)
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--force", action="store_true")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,124 @@
+"""
+Проверка горячих запросов репозиториев на последовательное сканирование.
+
+Скрипт создает таблицы в тестовой базе, загружает данные из backend/tests/data, выполняет запросы
+репозиториев и для каждого перехваченного SELECT запускает EXPLAIN ANALYZE с выключенным enable_seqscan.
+Seq Scan, оставшийся в плане, означает, что подходящего индекса нет.
+
+Запуск: ENVIRONMENT=test python index_advisor.py
+"""
+import asyncio
+import json
+import logging
+from datetime import datetime, date
+from typing import Awaitable, Callable, Iterator, List, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlmodel import SQLModel
+
+from backend.app.dependencies.service_factory import service_factory
+from backend.core.config import settings
+from backend.tests.utils.utils import load_users, load_stadiums, load_reviews, load_bookings
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Запросы репозиториев, которые должны обслуживаться индексами
+CHECKS: List[Tuple[str, Callable[[AsyncSession], Awaitable]]] = [
+    ("BookingRepository.overlapping_booking", lambda db: service_factory.booking_repo.overlapping_booking(
+        db, 1, datetime(2024, 9, 3, 10), datetime(2024, 9, 3, 11))),
+    ("BookingRepository.get_booking_from_date", lambda db: service_factory.booking_repo.get_booking_from_date(
+        db, 1, date(2024, 9, 3))),
+    ("BookingRepository.get_city_bookings", lambda db: service_factory.booking_repo.get_city_bookings(
+        db, "Москва", datetime(2024, 8, 4), datetime(2024, 8, 5))),
+    ("BookingRepository.get_stadium_bookings", lambda db: service_factory.booking_repo.get_stadium_bookings(
+        db, 2, datetime(2024, 8, 4), datetime(2024, 8, 5))),
+    ("StadiumRepository.get_many(is_active=True)", lambda db: service_factory.stadium_repo.get_many(
+        db, is_active=True)),
+    ("StadiumRepository.get_active_in_city", lambda db: service_factory.stadium_repo.get_active_in_city(
+        db, "Москва")),
+    ("StadiumRepository.is_slug_unique", lambda db: service_factory.stadium_repo.is_slug_unique(db, "donbass")),
+    ("MessageRepositories.get_messages_between_users",
+     lambda db: service_factory.message_repo.get_messages_between_users(db, user_id_1=1, user_id_2=2)),
+    ("MessageRepositories.get_conversations",
+     lambda db: service_factory.message_repo.get_conversations(db, user_id=1)),
+    ("ReviewRepository.check_duplicate_review", lambda db: service_factory.review_repo.check_duplicate_review(
+        db, user_id=1, stadium_id=1)),
+    ("ReviewRepository.paginate_stadium_reviews",
+     lambda db: service_factory.review_repo.paginate_stadium_reviews(db, stadium_id=1, size=10)),
+    ("UserRepository.get_by_email", lambda db: service_factory.user_repo.get_by_email(db, email="admin@admin.com")),
+]
+
+
+def walk_plan(plan: dict) -> Iterator[dict]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from walk_plan(child)
+
+
+async def explain(db: AsyncSession, statement: str, parameters) -> dict:
+    connection = await db.connection()
+    result = await connection.exec_driver_sql(f"EXPLAIN (ANALYZE, FORMAT JSON) {statement}", parameters)
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+async def seed(db: AsyncSession):
+    await load_users(db)
+    await load_stadiums(db)
+    await load_reviews(db)
+    await load_bookings(db)
+
+
+async def run_checks(db: AsyncSession, captured: List[tuple]) -> int:
+    await db.execute(text("SET enable_seqscan = off"))
+    problems = 0
+    for name, check in CHECKS:
+        captured.clear()
+        await check(db)
+        for statement, parameters in list(captured):
+            nodes = list(walk_plan(await explain(db, statement, parameters)))
+            seq_scans = [node for node in nodes if node["Node Type"] == "Seq Scan"]
+            if seq_scans:
+                problems += len(seq_scans)
+                for node in seq_scans:
+                    logger.warning(f"{name}: Seq Scan по {node['Relation Name']} (filter: {node.get('Filter')})")
+            else:
+                indexes = sorted({node["Index Name"] for node in nodes if "Index Name" in node})
+                logger.info(f"{name}: OK, индексы {', '.join(indexes)}")
+    return problems
+
+
+async def main() -> None:
+    if settings.ENVIRONMENT != "test":
+        logger.error("Скрипт создает и удаляет таблицы, запускайте его только с ENVIRONMENT=test")
+        return
+
+    engine = create_async_engine(settings.database_url, echo=False)
+    captured: List[tuple] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        async with AsyncSession(engine, expire_on_commit=False) as db:
+            await seed(db)
+            problems = await run_checks(db, captured)
+            await db.rollback()
+        logger.info(f"Найдено последовательных сканирований: {problems}")
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.drop_all)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,104 @@
+"""
+Нагрузочный тест простаивающих WebSocket-соединений на одном воркере.
+
+Открывает --connections сокетов к /api/v1/ws, держит их --hold секунд, отвечая на ping сервера,
+и сообщает прирост RSS процесса сервера в расчете на соединение. Сервер запускается отдельно
+в один воркер, его pid передается в --server-pid (RSS читается из /proc, поэтому только Linux):
+
+    uvicorn backend.main:app --workers 1 &
+    python websocket_load_test.py --server-pid $! --connections 10000 --users 1
+
+Токены выпускаются локально тем же SECRET_KEY, пользователи 1..--users должны существовать.
+Для 10 000 сокетов лимит открытых файлов поднимается до жесткого предела; у сервера он должен быть не ниже.
+"""
+import argparse
+import asyncio
+import json
+import resource
+import time
+from typing import List, Optional
+
+import websockets
+
+from backend.core.security import create_access_token
+
+
+def rss_kb(pid: int) -> int:
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    raise RuntimeError(f"Нет VmRSS для процесса {pid}")
+
+
+def raise_nofile_limit() -> int:
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    return hard
+
+
+async def hold(url: str, opened: asyncio.Event, stop: asyncio.Event, stats: dict) -> None:
+    try:
+        async with websockets.connect(url, open_timeout=60, ping_interval=None) as websocket:
+            stats["open"] += 1
+            if stats["open"] == stats["target"]:
+                opened.set()
+            receiver = asyncio.create_task(answer_pings(websocket, stats))
+            await stop.wait()
+            receiver.cancel()
+    except Exception as e:
+        stats["failed"] += 1
+        stats["last_error"] = repr(e)
+        if stats["open"] + stats["failed"] == stats["target"]:
+            opened.set()
+
+
+async def answer_pings(websocket, stats: dict) -> None:
+    async for message in websocket:
+        if json.loads(message).get("type") == "ping":
+            stats["pings"] += 1
+            await websocket.send(json.dumps({"type": "pong"}))
+
+
+async def main(args) -> None:
+    limit = raise_nofile_limit()
+    if limit < args.connections + 100:
+        raise SystemExit(f"Лимит открытых файлов {limit} меньше {args.connections} соединений")
+
+    tokens: List[str] = [create_access_token(user_id) for user_id in range(1, args.users + 1)]
+    urls = [f"{args.url}?token={tokens[i % len(tokens)]}" for i in range(args.connections)]
+
+    baseline: Optional[int] = rss_kb(args.server_pid) if args.server_pid else None
+    stats = {"target": args.connections, "open": 0, "failed": 0, "pings": 0, "last_error": None}
+    opened, stop = asyncio.Event(), asyncio.Event()
+
+    started = time.perf_counter()
+    tasks = []
+    for start in range(0, len(urls), args.batch):
+        tasks += [asyncio.create_task(hold(url, opened, stop, stats)) for url in urls[start:start + args.batch]]
+        await asyncio.sleep(args.batch_pause)
+    await opened.wait()
+    print(f"Открыто {stats['open']} сокетов за {time.perf_counter() - started:.1f} с, ошибок {stats['failed']}"
+          + (f" (последняя: {stats['last_error']})" if stats["last_error"] else ""))
+
+    await asyncio.sleep(args.hold)
+    if baseline is not None and stats["open"]:
+        loaded = rss_kb(args.server_pid)
+        print(f"RSS сервера: {baseline / 1024:.1f} МБ -> {loaded / 1024:.1f} МБ, "
+              f"{(loaded - baseline) / stats['open']:.1f} КБ на соединение")
+    print(f"Ping от сервера за {args.hold} с: {stats['pings']}")
+
+    stop.set()
+    await asyncio.gather(*tasks)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="ws://127.0.0.1:8000/api/v1/ws")
+    parser.add_argument("--server-pid", type=int)
+    parser.add_argument("--connections", type=int, default=10_000)
+    parser.add_argument("--users", type=int, default=1)
+    parser.add_argument("--hold", type=float, default=60)
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--batch-pause", type=float, default=0.2)
+    asyncio.run(main(parser.parse_args()))